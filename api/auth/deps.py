@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException, Request, status
+import hmac
+import os
+
+from fastapi import Depends, HTTPException, Request, WebSocket, WebSocketException, status
+from starlette.requests import HTTPConnection
 from pydantic import BaseModel
 
 from api.auth.discord import decode_access_token
 
+# Shared secret for operator endpoints (/metrics). Unset = endpoint disabled.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 
 class CurrentUser(BaseModel):
     discord_id: int
@@ -20,13 +27,13 @@ class CurrentUser(BaseModel):
         return self.global_name or self.username or str(self.discord_id)
 
 
-def _extract_token(request: Request) -> str | None:
+def _extract_token(request: HTTPConnection) -> str | None:
     auth_header = request.headers.get("Authorization") or request.headers.get("authorization")
     if auth_header and auth_header.lower().startswith("bearer "):
         return auth_header[7:].strip()
 
-    # EventSource (SSE) cannot set custom headers, so also accept the token
-    # as a query param for the /events stream.
+    # EventSource (SSE) and browser WebSockets cannot set custom headers, so
+    # also accept the token as a query param for /events and /ws.
     return request.query_params.get("token") or request.query_params.get("access_token")
 
 
@@ -46,22 +53,69 @@ def get_current_user(request: Request) -> CurrentUser:
             detail="Invalid or expired session.",
         ) from exc
 
-    raw_id = payload.get("sub") or payload.get("discord_id")
-    if not raw_id:
+    discord_id = _discord_id(payload)
+    if discord_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Malformed session token.",
         )
 
+    return _user_from_payload(payload, discord_id)
+
+
+def get_ws_user(websocket: WebSocket) -> CurrentUser:
+    """get_current_user() for WebSocket routes; rejects the handshake (1008) instead of 401."""
+    token = _extract_token(websocket)
+    if not token:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Missing bearer token."
+        )
+    try:
+        payload = decode_access_token(token)
+    except Exception as exc:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Invalid or expired session."
+        ) from exc
+    discord_id = _discord_id(payload)
+    if discord_id is None:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Malformed session token."
+        )
+    return _user_from_payload(payload, discord_id)
+
+
+def _discord_id(payload: dict) -> int | None:
+    """The token's Discord user id, or None when missing or not numeric."""
+    raw_id = payload.get("sub") or payload.get("discord_id")
+    try:
+        return int(raw_id) if raw_id else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _user_from_payload(payload: dict, discord_id: int) -> CurrentUser:
     return CurrentUser(
-        discord_id=int(raw_id),
-        username=payload.get("username") or str(raw_id),
+        discord_id=discord_id,
+        username=payload.get("username") or str(discord_id),
         discriminator=payload.get("discriminator"),
         global_name=payload.get("global_name"),
         avatar=payload.get("avatar"),
     )
 
 
+def require_metrics_token(request: Request) -> None:
+    """Gate for /metrics: `Authorization: Bearer <METRICS_TOKEN>`; 404 when no token is configured."""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    auth_header = request.headers.get("Authorization") or ""
+    token = auth_header[7:].strip() if auth_header.lower().startswith("bearer ") else ""
+    if not hmac.compare_digest(token.encode("utf-8"), METRICS_TOKEN.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token.",
+        )
+
+
 async def require_linked_fc(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Gate for queue actions: the user must have a linked Wii friend code."""
     from utils.player_links import resolve_friend_code
@@ -10,6 +10,7 @@ inside api/, or a container WORKDIR that differs from the repo root).
 
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
 from contextlib import asynccontextmanager
@@ -22,10 +23,11 @@ from dotenv import load_dotenv  # noqa: E402
 
 load_dotenv(os.path.join(_REPO_ROOT, ".env.local"))
 
-from fastapi import FastAPI, Request  # noqa: E402
+from fastapi import Depends, FastAPI, Request  # noqa: E402
 from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
 from fastapi.responses import JSONResponse  # noqa: E402
 
+from api.auth.deps import require_metrics_token  # noqa: E402
 from api.auth.discord import router as auth_router  # noqa: E402
 from api.routers import events as events_router  # noqa: E402
 from api.routers import matches as matches_router  # noqa: E402
@@ -63,11 +65,23 @@ async def lifespan(app: FastAPI):
     except Exception as exc:
         print(f"⚠️ init_db() failed during API startup — continuing degraded: {exc}")
 
+    from api.services.event_hub import event_hub
+    from utils.event_bus import event_listener
+
+    # One LISTEN connection + one event_bus tailer feed every open /events stream.
+    await event_hub().start()
+
     yield
 
+    await event_hub().stop()
+    await event_listener().stop()
+    from utils.event_bus import flush_coalesced
+
+    await asyncio.to_thread(flush_coalesced)
     try:
-        from utils.db import close_db
+        from utils.db import aclose_db, close_db
 
+        await aclose_db()
         close_db()
     except Exception as exc:
         print(f"⚠️ close_db() failed during API shutdown: {exc}")
@@ -97,11 +111,39 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
     return JSONResponse(status_code=500, content={"detail": "Internal server error."})
 
 
+@app.middleware("http")
+async def db_round_trip_scope(request: Request, call_next):
+    """Attribute every DB statement a request makes to its route template."""
+    from utils.db_metrics import db_scope
+
+    # Never the raw path: 404s and scanner probes would each add a scope entry.
+    with db_scope(f"{request.method} <unmatched>") as scope:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None and getattr(route, "path", None):
+            scope.label = f"{request.method} {route.path}"
+        return response
+
+
 @app.get("/health", tags=["meta"])
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["meta"], dependencies=[Depends(require_metrics_token)])
+def metrics() -> dict:
+    """Per-statement latency, per-route round trips, slow queries, pool stats (METRICS_TOKEN only)."""
+    from api.services.event_hub import hub_stats
+    from utils.db_metrics import metrics_snapshot
+    from utils.event_bus import publish_stats
+
+    return {
+        **metrics_snapshot(),
+        "event_hub": hub_stats(),
+        "event_publish": publish_stats(),
+    }
+
+
 app.include_router(auth_router)
 app.include_router(queue_router.router)
 app.include_router(profile_router.router)
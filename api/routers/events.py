@@ -1,127 +1,99 @@
 """
 Server-Sent Events stream for the web client.
 
-When Postgres is active, tails the `event_bus` table (populated by
-utils.match_message_store for chat, and usable by other stores later).
-Always also "bumps" the client whenever the caller's own active party
-changes, and sends periodic heartbeats — this covers the JSON-store /
-no-`event_bus` fallback case.
+Each stream is a subscriber of the process-wide hub in api.services.event_hub,
+which tails the `event_bus` table (populated by utils.match_message_store for
+chat, queue and match events) once for all clients, routes each event to
+the streams in its audience and pushes party changes to the users they touch. Streams only drain their queue and send
+periodic heartbeats — the JSON-store / no-`event_bus` case degrades to
+heartbeats plus party bumps.
+
+Bus events carry `id:` (their event_bus id). A reconnect with Last-Event-ID
+(sent by EventSource itself, or `?last_event_id=` for fetch-based clients)
+replays what was missed. A `resync` event means the gap was too large to
+replay, and the client should refetch its group and boards.
+
+`/ws` is the same subscription over a WebSocket, plus the way back: the
+client sends match/group chat (`chat.send`) on the socket it reads from.
+Frames that pile up within WS_BATCH_WINDOW_MS go out as one `events`
+message. A client that stops reading loses its oldest frames (the hub
+queue is bounded) and gets a `resync`. One that cannot take a single
+message within WS_SEND_TIMEOUT_SECONDS is closed (1013) and should
+reconnect with `last_event_id`.
 """
 
 from __future__ import annotations
 
 import asyncio
 import json
+import os
+import time
+from collections import deque
 from typing import Any
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Header, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
 
-from api.auth.deps import CurrentUser, get_current_user
-from domain.queue import get_active_party_for_user
-from utils.db import get_conn, use_json_stores
+from api.auth.deps import CurrentUser, get_current_user, get_ws_user
+from api.services.event_hub import Subscriber, event_hub
 
 router = APIRouter(tags=["events"])
 
-POLL_INTERVAL_SECONDS = 2.5
-HEARTBEAT_EVERY_N_POLLS = 6  # ~15s at the default poll interval
-
+HEARTBEAT_SECONDS = 15.0
 
-def _sse(event: str, data: Any) -> str:
-    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+WS_BATCH_WINDOW_MS = float(os.getenv("WS_BATCH_WINDOW_MS", "15"))
+WS_BATCH_MAX_FRAMES = int(os.getenv("WS_BATCH_MAX_FRAMES", "50"))
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+WS_CHAT_RATE_PER_10S = int(os.getenv("WS_CHAT_RATE_PER_10S", "20"))
+WS_CHAT_MAX_LENGTH = 2000
 
 
-def _latest_event_id() -> int:
-    if use_json_stores():
-        return 0
-    try:
-        with get_conn() as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM event_bus")
-                row = cursor.fetchone()
-            finally:
-                cursor.close()
-        return int(row[0]) if row else 0
-    except Exception as exc:
-        print(f"⚠️ event_bus unavailable, falling back to heartbeat-only SSE: {exc}")
-        return 0
-
-
-def _poll_event_bus(after_id: int) -> list[dict[str, Any]]:
-    if use_json_stores():
-        return []
-    try:
-        with get_conn() as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute(
-                    """
-                    SELECT id, event_type, payload FROM event_bus
-                    WHERE id > %s ORDER BY id ASC LIMIT 200
-                    """,
-                    (after_id,),
-                )
-                rows = cursor.fetchall()
-            finally:
-                cursor.close()
-    except Exception:
-        return []
-
-    events = []
-    for row_id, event_type, payload in rows:
-        events.append(
-            {
-                "id": int(row_id),
-                "event_type": event_type,
-                "payload": payload if isinstance(payload, dict) else json.loads(payload),
-            }
-        )
-    return events
+def _sse(event: str, data: Any, event_id: int | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
 
-@router.get("/events")
-async def stream_events(request: Request, user: CurrentUser = Depends(get_current_user)):
-    async def event_generator():
-        last_event_id = _latest_event_id()
-        last_party_snapshot: str | None = None
-        polls_since_heartbeat = 0
+def _resume_id(*values: str | None) -> int | None:
+    for value in values:
+        try:
+            return int(str(value).strip())
+        except (TypeError, ValueError):
+            continue
+    return None
 
-        yield _sse("connected", {"discord_id": user.discord_id})
 
-        while True:
-            if await request.is_disconnected():
-                break
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    boards: str | None = Query(None, description="Comma-separated boards; default all."),
+    last_event_id: str | None = Query(None),
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+    user: CurrentUser = Depends(get_current_user),
+):
+    watched = _parse_boards(boards)
+    resume_after = _resume_id(last_event_id_header, last_event_id)
 
-            try:
-                for event in _poll_event_bus(last_event_id):
-                    last_event_id = event["id"]
-                    event_type = str(event["event_type"] or "message")
-                    payload = event["payload"]
-                    yield _sse(event_type, payload)
-                    # Also fan out a generic queue bump so the web board refreshes
-                    # even when the client only listens for `queue`.
-                    if event_type in ("party_sync", "queue", "hub", "match_confirmed"):
-                        yield _sse("queue", {"source": event_type, "payload": payload})
-            except Exception as exc:
-                print(f"⚠️ event_bus poll failed: {exc}")
+    async def event_generator():
+        hub = event_hub()
+        subscriber = await hub.subscribe(
+            user.discord_id, boards=watched or None, last_event_id=resume_after
+        )
+        try:
+            yield _sse("connected", {"discord_id": user.discord_id})
 
-            try:
-                party = get_active_party_for_user(user.discord_id)
-                snapshot = (party or {}).get("last_updated")
-                if snapshot != last_party_snapshot:
-                    last_party_snapshot = snapshot
-                    yield _sse("party", party)
-                    yield _sse("queue", {"source": "party", "party_id": (party or {}).get("party_id")})
-            except Exception as exc:
-                print(f"⚠️ party bump poll failed: {exc}")
-
-            polls_since_heartbeat += 1
-            if polls_since_heartbeat >= HEARTBEAT_EVERY_N_POLLS:
-                polls_since_heartbeat = 0
-                yield ": heartbeat\n\n"
-
-            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event, data, event_id = await asyncio.wait_for(
+                        subscriber.queue.get(), HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield _sse(event, data, event_id)
+        finally:
+            hub.unsubscribe(subscriber)
 
     return StreamingResponse(
         event_generator(),
@@ -132,3 +104,184 @@ async def stream_events(request: Request, user: CurrentUser = Depends(get_curren
             "X-Accel-Buffering": "no",
         },
     )
+
+
+def _parse_boards(boards: str | None) -> list[str]:
+    return [b.strip() for b in (boards or "").split(",") if b.strip()]
+
+
+class _WsConnection:
+    """One /ws socket: a sender task draining the hub queue, the handler reading."""
+
+    def __init__(self, websocket: WebSocket, user: CurrentUser, subscriber: Subscriber):
+        self.websocket = websocket
+        self.user = user
+        self.subscriber = subscriber
+        self._send_lock = asyncio.Lock()
+        self._dropped_seen = 0
+        self._chat_times: deque[float] = deque()
+
+    async def send(self, message: dict[str, Any]) -> None:
+        """Raises asyncio.TimeoutError when the client is not reading."""
+        text = json.dumps(message, default=str)
+        async with self._send_lock:
+            await asyncio.wait_for(self.websocket.send_text(text), WS_SEND_TIMEOUT_SECONDS)
+
+    async def _next_batch(self) -> list[dict[str, Any]]:
+        """Block for one frame, then take whatever else arrives within the window."""
+        queue = self.subscriber.queue
+        first = await queue.get()
+        frames = [first]
+        deadline = time.monotonic() + WS_BATCH_WINDOW_MS / 1000.0
+        while len(frames) < WS_BATCH_MAX_FRAMES:
+            if queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    frames.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+                continue
+            frames.append(queue.get_nowait())
+        batch = [{"id": event_id, "event": event, "data": data} for event, data, event_id in frames]
+        if self.subscriber.dropped > self._dropped_seen:
+            # The hub shed frames while we were behind; the client must refetch.
+            self._dropped_seen = self.subscriber.dropped
+            batch.append({"id": None, "event": "resync", "data": {"reason": "overflow"}})
+        return batch
+
+    async def sender(self) -> None:
+        try:
+            while True:
+                try:
+                    batch = await asyncio.wait_for(self._next_batch(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    await self.send({"type": "ping"})
+                    continue
+                await self.send({"type": "events", "events": batch})
+        except asyncio.TimeoutError:
+            print(f"⚠️ /ws: closing slow consumer {self.user.discord_id}")
+            await self.close(1013, "Client too slow; reconnect with last_event_id.")
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+
+    async def close(self, code: int, reason: str) -> None:
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except RuntimeError:
+            pass
+
+    def _rate_limited(self) -> bool:
+        now = time.monotonic()
+        while self._chat_times and now - self._chat_times[0] > 10.0:
+            self._chat_times.popleft()
+        if len(self._chat_times) >= WS_CHAT_RATE_PER_10S:
+            return True
+        self._chat_times.append(now)
+        return False
+
+    async def handle_chat(self, message: dict[str, Any]) -> dict[str, Any]:
+        from domain.match import aget_session
+        from utils.db_metrics import db_scope
+        from utils.match_message_store import append_message
+        from utils.match_session_store import session_roster_ids
+
+        client_id = message.get("client_id")
+
+        def error(detail: str) -> dict[str, Any]:
+            return {"type": "error", "for": "chat.send", "client_id": client_id, "detail": detail}
+
+        session_id = str(message.get("session_id") or "")
+        channel = message.get("channel") or "match"
+        text = str(message.get("body") or "").strip()
+        if channel not in ("match", "group"):
+            return error("channel must be match or group.")
+        if not text:
+            return error("Message cannot be empty.")
+        if len(text) > WS_CHAT_MAX_LENGTH:
+            return error(f"Message is longer than {WS_CHAT_MAX_LENGTH} characters.")
+        if self._rate_limited():
+            return error("Slow down.")
+        with db_scope("WS /ws chat.send"):
+            # Fresh per send (like POST /matches/{id}/messages): roster changes
+            # and closed sessions apply without a reconnect.
+            session = await aget_session(session_id) if session_id else None
+            if not session:
+                return error("Match session not found.")
+            if self.user.discord_id not in session_roster_ids(session):
+                return error("You are not part of this match.")
+            msg = await asyncio.to_thread(
+                append_message,
+                session_id,
+                channel,
+                text,
+                author_discord_id=self.user.discord_id,
+                author_name=self.user.display_name,
+                source="web",
+                session=session,
+            )
+        # The chat event itself reaches every socket (this one included) via the bus.
+        return {"type": "chat.ack", "client_id": client_id, "message": msg}
+
+    async def receiver(self) -> None:
+        while True:
+            raw = await self.websocket.receive_text()
+            try:
+                message = json.loads(raw)
+                kind = message.get("type") if isinstance(message, dict) else None
+            except ValueError:
+                kind, message = None, {}
+            if kind == "chat.send":
+                try:
+                    reply = await self.handle_chat(message)
+                except Exception as exc:
+                    print(f"⚠️ /ws chat.send failed for {self.user.discord_id}: {exc}")
+                    reply = {
+                        "type": "error",
+                        "for": "chat.send",
+                        "client_id": message.get("client_id"),
+                        "detail": "Could not send message.",
+                    }
+            elif kind == "ping":
+                reply = {"type": "pong"}
+            elif kind == "pong":
+                continue
+            else:
+                reply = {"type": "error", "detail": "Unknown or malformed message."}
+            await self.send(reply)
+
+
+@router.websocket("/ws")
+async def events_socket(
+    websocket: WebSocket,
+    boards: str | None = Query(None, description="Comma-separated boards; default all."),
+    last_event_id: str | None = Query(None),
+    user: CurrentUser = Depends(get_ws_user),
+):
+    await websocket.accept()
+    hub = event_hub()
+    subscriber = await hub.subscribe(
+        user.discord_id,
+        boards=_parse_boards(boards) or None,
+        last_event_id=_resume_id(last_event_id),
+    )
+    connection = _WsConnection(websocket, user, subscriber)
+    sender = None
+    try:
+        await connection.send({"type": "connected", "discord_id": user.discord_id})
+        sender = asyncio.create_task(connection.sender())
+        receiver = asyncio.create_task(connection.receiver())
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        receiver.cancel()
+        for task in done:
+            if not task.cancelled() and isinstance(task.exception(), Exception):
+                exc = task.exception()
+                if not isinstance(exc, (WebSocketDisconnect, asyncio.TimeoutError, RuntimeError)):
+                    print(f"⚠️ /ws {user.discord_id}: {exc}")
+    except (WebSocketDisconnect, asyncio.TimeoutError):
+        pass
+    finally:
+        if sender is not None:
+            sender.cancel()
+        hub.unsubscribe(subscriber)
@@ -2,42 +2,25 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
 from api.auth.deps import CurrentUser, get_current_user
-from domain.match import get_session, upsert_session
-from utils import match_session_store
-from utils.db import get_conn, use_json_stores
+from domain.match import get_session, list_sessions, upsert_session
 from utils.match_message_store import append_message, list_messages
 
 router = APIRouter(prefix="/matches", tags=["matches"])
 
 
 def _all_sessions() -> list[dict[str, Any]]:
-    if use_json_stores():
-        return list(match_session_store._load_all()["sessions"].values())  # noqa: SLF001
-
     try:
-        with get_conn() as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("SELECT data FROM match_sessions")
-                rows = cursor.fetchall()
-            finally:
-                cursor.close()
+        return list_sessions()
     except Exception as exc:
         print(f"⚠️ Could not list match_sessions: {exc}")
         return []
 
-    sessions = []
-    for (data,) in rows:
-        sessions.append(data if isinstance(data, dict) else json.loads(data))
-    return sessions
-
 
 def _participant_ids(session: dict[str, Any]) -> set[int]:
     return {
@@ -213,6 +196,7 @@ def post_message(
         author_discord_id=user.discord_id,
         author_name=user.display_name,
         source="web",
+        session=session,
     )
 
 
@@ -77,6 +77,7 @@ from utils.billboard_store import (
     upsert_war,
 )
 from utils.boards import ALL_BOARD_KEYS
+from utils.db import unit_of_work
 from utils.lineup_lock import find_blocking_lineup, lineup_lock_message
 
 router = APIRouter(tags=["queue"])
@@ -539,8 +540,9 @@ def update_party(
                 break
         party["lineup"] = lineup
 
-    upsert_party(party)
-    _resync_billboard_from_party(party)
+    with unit_of_work():
+        upsert_party(party)
+        _resync_billboard_from_party(party)
     return _enrich_party(get_party(party_id))
 
 
@@ -601,9 +603,10 @@ def leave_party(
         party["lineup"] = new_lineup
         was_hidden = bool(party.get("queue_hidden"))
         party = touch_roster_change(party)
-        upsert_party(party)
-        party = finalize_roster_change(party, was_hidden=was_hidden)
-        _resync_billboard_from_party(party)
+        with unit_of_work():
+            upsert_party(party)
+            party = finalize_roster_change(party, was_hidden=was_hidden)
+            _resync_billboard_from_party(party)
 
     # Clear any leftover party still tied to this user (stale solo / desynced captain).
     for _ in range(8):
@@ -624,8 +627,9 @@ def leave_party(
                     leftover["captain_discord_id"] = others[0].get("discord_id")
             except (TypeError, ValueError):
                 pass
-            upsert_party(leftover)
-            _resync_billboard_from_party(leftover)
+            with unit_of_work():
+                upsert_party(leftover)
+                _resync_billboard_from_party(leftover)
             continue
         cancel_party(leftover_id)
 
@@ -715,8 +719,20 @@ def post_party(party_id: str, user: CurrentUser = Depends(require_linked_fc)) ->
     if not _is_captain(party, user.discord_id):
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Only the captain can post to the hub.")
 
+    from utils.party_sync import publish_party_sync
+
     try:
-        post, message = post_party_to_billboard(party)
+        # The hub post, party update and "post" event commit together.
+        with unit_of_work():
+            post, message = post_party_to_billboard(party)
+            updated = get_party(party_id) or party
+            if post:
+                publish_party_sync(
+                    "post",
+                    party=updated,
+                    board=board_for_party(updated),
+                    war_id=post.get("war_id"),
+                )
     except Exception as exc:
         print(f"❌ post_party_to_billboard failed for {party_id}: {exc}")
         raise HTTPException(
@@ -727,16 +743,6 @@ def post_party(party_id: str, user: CurrentUser = Depends(require_linked_fc)) ->
     if not post:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, message or "Could not post to the hub.")
 
-    from utils.party_sync import publish_party_sync
-
-    updated = get_party(party_id) or party
-    publish_party_sync(
-        "post",
-        party=updated,
-        board=board_for_party(updated),
-        war_id=post.get("war_id"),
-    )
-
     return {
         "party": _enrich_party(updated),
         "post": post,
@@ -796,19 +802,23 @@ def invite_to_party(
     if _player_in_lineup(party.get("lineup", []), body.target_discord_id):
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "That player is already in this party.")
 
-    invite = create_party_invite(party_id, user.discord_id, body.target_discord_id)
-    from utils.event_bus import publish_event
-
-    publish_event(
-        "queue",
-        {
-            "action": "invite_created",
-            "invite_id": invite.get("invite_id"),
-            "party_id": party_id,
-            "from_discord_id": user.discord_id,
-            "target_discord_id": int(body.target_discord_id),
-        },
-    )
+    from utils.event_bus import event_audience, publish_event
+
+    with unit_of_work():
+        invite = create_party_invite(party_id, user.discord_id, body.target_discord_id)
+        publish_event(
+            "queue",
+            {
+                "action": "invite_created",
+                "invite_id": invite.get("invite_id"),
+                "party_id": party_id,
+                "from_discord_id": user.discord_id,
+                "target_discord_id": int(body.target_discord_id),
+            },
+            audience=event_audience(
+                discord_ids=(user.discord_id, body.target_discord_id), party_id=party_id
+            ),
+        )
     return invite
 
 
@@ -1107,32 +1117,36 @@ def create_ally_request_endpoint(
             "That role isn't available for this roster right now.",
         )
     role_name = "Bagger" if is_bagger else "Runner"
-    request = create_ally_request(
-        board,
-        war_id,
-        user.discord_id,
-        user.display_name,
-        role_name,
-        requester_party_id=viewer_party_id,
-    )
-
-    from utils.event_bus import publish_event
-
-    publish_event(
-        "ally_request",
-        {
-            "request_id": request["request_id"],
-            "board": board,
-            "war_id": war_id,
-            "origin_guild_id": war.get("origin_guild_id"),
-            "captain_discord_id": war.get("author_discord_id"),
-            "team_name": war.get("team_name"),
-            "requester_discord_id": user.discord_id,
-            "requester_name": user.display_name,
-            "requester_party_id": viewer_party_id,
-            "role": role_name,
-        },
-    )
+    from utils.event_bus import event_audience, publish_event
+
+    with unit_of_work():
+        request = create_ally_request(
+            board,
+            war_id,
+            user.discord_id,
+            user.display_name,
+            role_name,
+            requester_party_id=viewer_party_id,
+        )
+        publish_event(
+            "ally_request",
+            {
+                "request_id": request["request_id"],
+                "board": board,
+                "war_id": war_id,
+                "origin_guild_id": war.get("origin_guild_id"),
+                "captain_discord_id": war.get("author_discord_id"),
+                "team_name": war.get("team_name"),
+                "requester_discord_id": user.discord_id,
+                "requester_name": user.display_name,
+                "requester_party_id": viewer_party_id,
+                "role": role_name,
+            },
+            audience=event_audience(
+                discord_ids=(user.discord_id, war.get("author_discord_id")),
+                party_id=war.get("party_id"),
+            ),
+        )
     return request
 
 
@@ -1189,24 +1203,28 @@ def create_match_request_endpoint(
         party["team_name"] = web_label
         upsert_party(party)
 
-    request, error = start_match_request(board, target_war["war_id"], requester_war["war_id"])
-    if error:
-        raise HTTPException(status.HTTP_409_CONFLICT, error)
-
-    from utils.event_bus import publish_event
-
-    publish_event(
-        "match_request",
-        {
-            "request_id": request["request_id"],
-            "board": board,
-            "target_war_id": target_war.get("war_id"),
-            "requester_war_id": requester_war.get("war_id"),
-            "origin_guild_id": target_war.get("origin_guild_id"),
-            "captain_discord_id": target_war.get("author_discord_id"),
-            "team_name": target_war.get("team_name"),
-        },
-    )
+    from utils.event_bus import event_audience, publish_event
+
+    with unit_of_work():
+        request, error = start_match_request(board, target_war["war_id"], requester_war["war_id"])
+        if error:
+            raise HTTPException(status.HTTP_409_CONFLICT, error)
+        publish_event(
+            "match_request",
+            {
+                "request_id": request["request_id"],
+                "board": board,
+                "target_war_id": target_war.get("war_id"),
+                "requester_war_id": requester_war.get("war_id"),
+                "origin_guild_id": target_war.get("origin_guild_id"),
+                "captain_discord_id": target_war.get("author_discord_id"),
+                "team_name": target_war.get("team_name"),
+            },
+            audience=event_audience(
+                discord_ids=(user.discord_id, target_war.get("author_discord_id")),
+                party_id=target_war.get("party_id"),
+            ),
+        )
     return request
 
 
@@ -1263,49 +1281,50 @@ def _accept_ally_request(request: dict[str, Any], user: CurrentUser) -> dict[str
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
 
     # Free the requester from their web/party lineup before joining this war.
-    remove_player_from_party(int(requester_id), party_id=requester_party_id)
+    with unit_of_work():
+        remove_player_from_party(int(requester_id), party_id=requester_party_id)
 
-    lineup.append(
-        Player(
-            player=request.get("requester_name") or str(requester_id),
-            role="Bagger" if is_bagger else "Runner",
-            ally=True,
-            bagger=is_bagger,
-            discord_id=requester_id,
-        ).to_dict()
-    )
-    war["lineup"] = lineup
-    war["search_mode"] = reconcile_search_mode(
-        war.get("search_mode", SEARCH_ALLIES),
-        lineup,
-        search_time=war.get("start_time", "ASAP"),
-        created_at=war.get("created_at") or war.get("last_updated"),
-    )
-    war = _touch_war(war)
-    upsert_war(board, war)
-
-    party_id = war.get("party_id")
-    if party_id:
-        party = get_party(party_id)
-        if party:
-            synced = sync_party_lineup_from_post(party, war)
-            was_hidden = bool(synced.get("queue_hidden"))
-            touch_roster_change(synced)
-            upsert_party(synced)
-            finalize_roster_change(synced, was_hidden=was_hidden)
+        lineup.append(
+            Player(
+                player=request.get("requester_name") or str(requester_id),
+                role="Bagger" if is_bagger else "Runner",
+                ally=True,
+                bagger=is_bagger,
+                discord_id=requester_id,
+            ).to_dict()
+        )
+        war["lineup"] = lineup
+        war["search_mode"] = reconcile_search_mode(
+            war.get("search_mode", SEARCH_ALLIES),
+            lineup,
+            search_time=war.get("start_time", "ASAP"),
+            created_at=war.get("created_at") or war.get("last_updated"),
+        )
+        war = _touch_war(war)
+        upsert_war(board, war)
 
-    request["status"] = "accepted"
-    upsert_ally_request(request)
-    delete_ally_request(request["request_id"])
+        party_id = war.get("party_id")
+        if party_id:
+            party = get_party(party_id)
+            if party:
+                synced = sync_party_lineup_from_post(party, war)
+                was_hidden = bool(synced.get("queue_hidden"))
+                touch_roster_change(synced)
+                upsert_party(synced)
+                finalize_roster_change(synced, was_hidden=was_hidden)
+
+        request["status"] = "accepted"
+        upsert_ally_request(request)
+        delete_ally_request(request["request_id"])
 
-    from utils.pending_outbound import (
-        clear_outbound_pending_for_party,
-        clear_outbound_pending_for_user,
-    )
+        from utils.pending_outbound import (
+            clear_outbound_pending_for_party,
+            clear_outbound_pending_for_user,
+        )
 
-    clear_outbound_pending_for_user(int(requester_id))
-    if party_id:
-        clear_outbound_pending_for_party(str(party_id))
+        clear_outbound_pending_for_user(int(requester_id))
+        if party_id:
+            clear_outbound_pending_for_party(str(party_id))
 
     return {"kind": "ally", "war": war}
 
@@ -1445,36 +1464,41 @@ def _accept_party_invite(invite: dict[str, Any], user: CurrentUser) -> dict[str,
                 discord_id=user.discord_id,
             ).to_dict()
         )
-        party_a["lineup"] = lineup
-        was_hidden = bool(party_a.get("queue_hidden"))
-        touch_roster_change(party_a)
-        upsert_party(party_a)
-        finalize_roster_change(party_a, was_hidden=was_hidden)
-        _resync_billboard_from_party(party_a)
-
-        from utils.pending_outbound import (
-            clear_outbound_pending_for_party,
-            clear_outbound_pending_for_user,
-        )
+        with unit_of_work():
+            party_a["lineup"] = lineup
+            was_hidden = bool(party_a.get("queue_hidden"))
+            touch_roster_change(party_a)
+            upsert_party(party_a)
+            finalize_roster_change(party_a, was_hidden=was_hidden)
+            _resync_billboard_from_party(party_a)
+
+            from utils.pending_outbound import (
+                clear_outbound_pending_for_party,
+                clear_outbound_pending_for_user,
+            )
 
-        clear_outbound_pending_for_party(party_a.get("party_id"))
-        clear_outbound_pending_for_user(user.discord_id)
+            clear_outbound_pending_for_party(party_a.get("party_id"))
+            clear_outbound_pending_for_user(user.discord_id)
 
-        invite["status"] = "accepted"
-        upsert_party_invite(invite)
-        delete_party_invite(invite["invite_id"])
-        from utils.event_bus import publish_event
+            invite["status"] = "accepted"
+            upsert_party_invite(invite)
+            delete_party_invite(invite["invite_id"])
+            from utils.event_bus import event_audience, publish_event
 
-        publish_event(
-            "queue",
-            {
-                "action": "invite_accepted",
-                "invite_id": invite.get("invite_id"),
-                "party_id": party_a.get("party_id"),
-                "from_discord_id": invite.get("from_discord_id"),
-                "target_discord_id": invite.get("target_discord_id"),
-            },
-        )
+            publish_event(
+                "queue",
+                {
+                    "action": "invite_accepted",
+                    "invite_id": invite.get("invite_id"),
+                    "party_id": party_a.get("party_id"),
+                    "from_discord_id": invite.get("from_discord_id"),
+                    "target_discord_id": invite.get("target_discord_id"),
+                },
+                audience=event_audience(
+                    discord_ids=(invite.get("from_discord_id"), invite.get("target_discord_id")),
+                    party_id=party_a.get("party_id"),
+                ),
+            )
         return {"kind": "invite", "party": party_a}
 
     # Inviter's party always absorbs the invitee's party.
@@ -1500,42 +1524,47 @@ def _accept_party_invite(invite: dict[str, Any], user: CurrentUser) -> dict[str,
             f"Combining these rosters would exceed {ROSTER_SIZE} players.",
         )
 
-    survivor["lineup"] = combined_lineup
-    was_hidden = bool(survivor.get("queue_hidden"))
-    touch_roster_change(survivor)
-    upsert_party(survivor)
-    finalize_roster_change(survivor, was_hidden=was_hidden)
-    cancel_party(absorbed["party_id"])
-    _resync_billboard_from_party(survivor)
-
-    from utils.pending_outbound import (
-        clear_outbound_pending_for_party,
-        clear_outbound_pending_for_user,
-    )
+    with unit_of_work():
+        survivor["lineup"] = combined_lineup
+        was_hidden = bool(survivor.get("queue_hidden"))
+        touch_roster_change(survivor)
+        upsert_party(survivor)
+        finalize_roster_change(survivor, was_hidden=was_hidden)
+        cancel_party(absorbed["party_id"])
+        _resync_billboard_from_party(survivor)
 
-    clear_outbound_pending_for_party(survivor.get("party_id"))
-    clear_outbound_pending_for_party(absorbed.get("party_id"))
-    for player in absorbed.get("lineup", []):
-        try:
-            clear_outbound_pending_for_user(int(player.get("discord_id")))
-        except (TypeError, ValueError):
-            pass
+        from utils.pending_outbound import (
+            clear_outbound_pending_for_party,
+            clear_outbound_pending_for_user,
+        )
 
-    invite["status"] = "accepted"
-    upsert_party_invite(invite)
-    delete_party_invite(invite["invite_id"])
-    from utils.event_bus import publish_event
-
-    publish_event(
-        "queue",
-        {
-            "action": "invite_accepted",
-            "invite_id": invite.get("invite_id"),
-            "party_id": survivor.get("party_id"),
-            "from_discord_id": invite.get("from_discord_id"),
-            "target_discord_id": invite.get("target_discord_id"),
-        },
-    )
+        clear_outbound_pending_for_party(survivor.get("party_id"))
+        clear_outbound_pending_for_party(absorbed.get("party_id"))
+        for player in absorbed.get("lineup", []):
+            try:
+                clear_outbound_pending_for_user(int(player.get("discord_id")))
+            except (TypeError, ValueError):
+                pass
+
+        invite["status"] = "accepted"
+        upsert_party_invite(invite)
+        delete_party_invite(invite["invite_id"])
+        from utils.event_bus import event_audience, publish_event
+
+        publish_event(
+            "queue",
+            {
+                "action": "invite_accepted",
+                "invite_id": invite.get("invite_id"),
+                "party_id": survivor.get("party_id"),
+                "from_discord_id": invite.get("from_discord_id"),
+                "target_discord_id": invite.get("target_discord_id"),
+            },
+            audience=event_audience(
+                discord_ids=(invite.get("from_discord_id"), invite.get("target_discord_id")),
+                party_id=survivor.get("party_id"),
+            ),
+        )
     return {"kind": "invite", "party": survivor}
 
 
@@ -1545,19 +1574,24 @@ def _deny_party_invite(invite: dict[str, Any], user: CurrentUser) -> dict[str, A
     if user.discord_id not in (int(invite.get("target_discord_id")), int(invite.get("from_discord_id"))):
         raise HTTPException(status.HTTP_403_FORBIDDEN, "This invite does not belong to you.")
 
-    delete_party_invite(invite["invite_id"])
-    from utils.event_bus import publish_event
-
-    publish_event(
-        "queue",
-        {
-            "action": "invite_denied",
-            "invite_id": invite.get("invite_id"),
-            "party_id": invite.get("party_id"),
-            "from_discord_id": invite.get("from_discord_id"),
-            "target_discord_id": invite.get("target_discord_id"),
-        },
-    )
+    from utils.event_bus import event_audience, publish_event
+
+    with unit_of_work():
+        delete_party_invite(invite["invite_id"])
+        publish_event(
+            "queue",
+            {
+                "action": "invite_denied",
+                "invite_id": invite.get("invite_id"),
+                "party_id": invite.get("party_id"),
+                "from_discord_id": invite.get("from_discord_id"),
+                "target_discord_id": invite.get("target_discord_id"),
+            },
+            audience=event_audience(
+                discord_ids=(invite.get("from_discord_id"), invite.get("target_discord_id")),
+                party_id=invite.get("party_id"),
+            ),
+        )
     return {"kind": "invite", "status": "denied"}
 
 
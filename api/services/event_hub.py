@@ -0,0 +1,409 @@
+"""
+Process-wide fan-out for the /events SSE stream.
+
+One tailer per API process reads `event_bus` (woken by the LISTEN connection
+in utils.event_bus) and copies each row into every subscriber's bounded
+queue. Party writes announce themselves with a "party" notification, so the
+hub re-resolves the active party only for subscribers that party touches.
+DB load therefore depends on write volume, not on how many tabs are open.
+
+Rows carrying an `audience` (utils.event_bus.event_audience) are copied only
+to the streams it names — by user, active party or watched board — through
+indexes kept on the hub, so a chat line costs O(recipients) rather than
+O(open streams). Rows without one still go to everybody.
+
+Without a listener (Cloud SQL connector, or while it reconnects) the tailer
+polls instead: one event_bus read plus one `queue_parties.updated_at` scan
+per tick for the whole process.
+
+Bus events keep their event_bus id, and the last REPLAY_BUFFER_SIZE of them
+stay in a ring buffer. A reconnecting stream that sends Last-Event-ID gets
+the events it missed (filtered by audience) from the ring, or from
+event_bus when the ring no longer reaches back that far. If the gap is too
+big to replay it gets a single `resync` event, and only then should the
+client refetch everything.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from domain.queue import achanged_party_ids, aget_active_party_for_user, aget_party
+from utils.db import use_json_stores
+from utils.db_metrics import db_scope
+from utils.event_bus import alatest_event_id, apoll_events, event_listener
+
+POLL_INTERVAL_SECONDS = 2.5  # only while the event_bus listener is down
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SSE_SUBSCRIBER_QUEUE_SIZE", "100"))
+# Event types that also get a generic `queue` bump so the web board refreshes
+# even when the client only listens for `queue`.
+QUEUE_BUMP_TYPES = ("party_sync", "queue", "hub", "match_confirmed")
+REPLAY_BUFFER_SIZE = int(os.getenv("SSE_REPLAY_BUFFER_SIZE", "2000"))
+# Past this many missed bus rows a resume is answered with `resync` instead.
+REPLAY_MAX_SCAN = int(os.getenv("SSE_REPLAY_MAX_SCAN", "5000"))
+# Replays must fit the subscriber queue with room to spare for live events.
+REPLAY_MAX_EVENTS = SUBSCRIBER_QUEUE_SIZE // 2
+
+
+class Subscriber:
+    """One open /events stream; the generator drains `queue`."""
+
+    def __init__(self, discord_id: int, boards: Optional[Iterable[str]] = None):
+        self.discord_id = int(discord_id)
+        # None = every board (the default web client).
+        self.boards: Optional[FrozenSet[str]] = frozenset(boards) if boards else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.party_id: Optional[str] = None
+        self.party_snapshot: Optional[str] = None
+        self.dropped = 0
+        # Bus ids at or below this were already delivered (Last-Event-ID).
+        self.resume_after = 0
+        # While a resume replays, live frames wait here so order is kept.
+        self._held: Optional[List[tuple]] = None
+
+    def push(self, event: str, data: Any, event_id: Optional[int] = None) -> None:
+        """Never blocks the tailer: a stalled client loses its oldest frames."""
+        if event_id is not None and event_id <= self.resume_after:
+            return
+        if self._held is not None:
+            self._held.append((event, data, event_id))
+            return
+        self._put((event, data, event_id))
+
+    def _put(self, frame: tuple) -> None:
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(frame)
+
+    def hold(self) -> None:
+        self._held = []
+
+    def release(self, replay: List[tuple]) -> None:
+        """Queue replayed frames, then whatever arrived live meanwhile."""
+        held, self._held = self._held or [], None
+        for frame in replay + held:
+            self._put(frame)
+
+    def push_party(self, party: Optional[Dict[str, Any]]) -> None:
+        """Call through EventHub._push_party so the party index follows along."""
+        snapshot = (party or {}).get("last_updated")
+        if snapshot == self.party_snapshot:
+            return
+        self.party_snapshot = snapshot
+        self.party_id = (party or {}).get("party_id")
+        self.push("party", party)
+        self.push("queue", {"source": "party", "party_id": self.party_id})
+
+
+def _party_member_ids(party: Optional[Dict[str, Any]]) -> Set[int]:
+    ids: Set[int] = set()
+    if not party:
+        return ids
+    for value in [party.get("captain_discord_id")] + [
+        player.get("discord_id") for player in party.get("lineup") or []
+    ]:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def _event_frames(event: Dict[str, Any]) -> List[tuple]:
+    """(event, data, id) frames one bus row turns into for a stream."""
+    event_type = str(event["event_type"] or "message")
+    payload = event["payload"]
+    frames = [(event_type, payload, event["id"])]
+    if event_type in QUEUE_BUMP_TYPES:
+        frames.append(("queue", {"source": event_type, "payload": payload}, event["id"]))
+    return frames
+
+
+def _resync_frame(reason: str, upto: int) -> tuple:
+    # Carries the id so the client's next resume starts after the gap.
+    return ("resync", {"reason": reason}, upto)
+
+
+def _discard(index: Dict[Any, Set[Subscriber]], key: Any, subscriber: Subscriber) -> None:
+    bucket = index.get(key)
+    if bucket is None:
+        return
+    bucket.discard(subscriber)
+    if not bucket:
+        del index[key]
+
+
+class EventHub:
+    def __init__(self) -> None:
+        self._subscribers: Set[Subscriber] = set()
+        self._by_user: Dict[int, Set[Subscriber]] = {}
+        self._by_party: Dict[str, Set[Subscriber]] = {}
+        self._by_board: Dict[str, Set[Subscriber]] = {}
+        self._all_boards: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._dirty_parties: Set[str] = set()
+        self._rescan = True
+        self._last_event_id = 0
+        self._cursor_stale = True
+        self._party_watermark = None
+        self._last_polled = 0.0
+        self.events_fanned_out = 0
+        self.deliveries = 0
+        # Recent bus rows; complete for every id above _ring_from.
+        self._ring: deque = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._ring_from = 0
+        self.replays = {"ring": 0, "bus": 0, "resync": 0}
+
+    async def start(self) -> None:
+        listener = event_listener()
+        listener.observe(self._on_notify)
+        listener.start()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def subscribe(
+        self,
+        discord_id: int,
+        *,
+        boards: Optional[Iterable[str]] = None,
+        last_event_id: Optional[int] = None,
+    ) -> Subscriber:
+        if self._cursor_stale:
+            # Nobody was listening: start new streams at the head, like before.
+            try:
+                self._last_event_id = await alatest_event_id()
+            except Exception as exc:
+                print(f"⚠️ event_bus unavailable, falling back to heartbeat-only SSE: {exc}")
+            self._cursor_stale = False
+            # The ring has a hole where nobody was tailing.
+            self._ring.clear()
+            self._ring_from = self._last_event_id
+        subscriber = Subscriber(discord_id, boards)
+        resume = last_event_id is not None and last_event_id >= 0
+        if resume:
+            subscriber.resume_after = int(last_event_id)
+            subscriber.hold()
+        replay_upto = self._last_event_id
+        self._subscribers.add(subscriber)
+        self._by_user.setdefault(subscriber.discord_id, set()).add(subscriber)
+        if subscriber.boards is None:
+            self._all_boards.add(subscriber)
+        else:
+            for board in subscriber.boards:
+                self._by_board.setdefault(board, set()).add(subscriber)
+        try:
+            self._push_party(subscriber, await aget_active_party_for_user(subscriber.discord_id))
+        except Exception as exc:
+            print(f"⚠️ party lookup for SSE subscribe failed: {exc}")
+        if resume:
+            replay: List[tuple] = []
+            try:
+                replay = await self._replay(subscriber, int(last_event_id), replay_upto)
+            except Exception as exc:
+                print(f"⚠️ SSE replay failed, asking client to resync: {exc}")
+                replay = [_resync_frame("error", replay_upto)]
+            subscriber.release(replay)
+        return subscriber
+
+    async def _replay(self, subscriber: Subscriber, after_id: int, upto: int) -> List[tuple]:
+        """Frames for bus events in (after_id, upto] that concern `subscriber`."""
+        if after_id >= upto:
+            return []
+        if after_id >= self._ring_from:
+            events = [event for event in self._ring if after_id < event["id"] <= upto]
+            source = "ring"
+        elif upto - after_id <= REPLAY_MAX_SCAN:
+            events = []
+            cursor = after_id
+            while cursor < upto:
+                batch = await apoll_events(cursor, limit=500)
+                events.extend(event for event in batch if event["id"] <= upto)
+                if len(batch) < 500:
+                    break
+                cursor = batch[-1]["id"]
+            source = "bus"
+        else:
+            self.replays["resync"] += 1
+            return [_resync_frame("gap", upto)]
+        frames: List[tuple] = []
+        for event in events:
+            if self._concerns(subscriber, event.get("audience")):
+                frames.extend(_event_frames(event))
+        if len(frames) > REPLAY_MAX_EVENTS:
+            self.replays["resync"] += 1
+            return [_resync_frame("gap", upto)]
+        self.replays[source] += 1
+        return frames
+
+    def _concerns(self, subscriber: Subscriber, audience: Optional[Dict[str, Any]]) -> bool:
+        """_recipients() for a single stream."""
+        if not audience:
+            return True
+        if subscriber.discord_id in {int(x) for x in audience.get("discord_ids") or ()}:
+            return True
+        if audience.get("party_id") and str(audience["party_id"]) == subscriber.party_id:
+            return True
+        board = audience.get("board")
+        return bool(board) and (subscriber.boards is None or str(board) in subscriber.boards)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        self._all_boards.discard(subscriber)
+        _discard(self._by_user, subscriber.discord_id, subscriber)
+        _discard(self._by_party, subscriber.party_id, subscriber)
+        for board in subscriber.boards or ():
+            _discard(self._by_board, board, subscriber)
+
+    def _push_party(self, subscriber: Subscriber, party: Optional[Dict[str, Any]]) -> None:
+        previous = subscriber.party_id
+        subscriber.push_party(party)
+        if subscriber.party_id != previous and subscriber in self._subscribers:
+            _discard(self._by_party, previous, subscriber)
+            if subscriber.party_id:
+                self._by_party.setdefault(subscriber.party_id, set()).add(subscriber)
+
+    def _recipients(self, audience: Optional[Dict[str, Any]]) -> Iterable[Subscriber]:
+        """Streams an event is for; None (or an empty audience) means all of them."""
+        if not audience:
+            return list(self._subscribers)
+        out: Set[Subscriber] = set()
+        for discord_id in audience.get("discord_ids") or ():
+            out.update(self._by_user.get(int(discord_id), ()))
+        if audience.get("party_id"):
+            out.update(self._by_party.get(str(audience["party_id"]), ()))
+        if audience.get("board"):
+            out.update(self._by_board.get(str(audience["board"]), ()))
+            out.update(self._all_boards)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "last_event_id": self._last_event_id,
+            "events_fanned_out": self.events_fanned_out,
+            "deliveries": self.deliveries,
+            "replays": dict(self.replays),
+            "replay_buffer": len(self._ring),
+            "users": len(self._by_user),
+            "parties": len(self._by_party),
+            "queued": sum(sub.queue.qsize() for sub in self._subscribers),
+            "dropped": sum(sub.dropped for sub in self._subscribers),
+        }
+
+    def _on_notify(self, event_type: str, key: str) -> None:
+        if event_type == "party" and key:
+            self._dirty_parties.add(key)
+        elif not event_type:
+            self._rescan = True
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            # Short timeout so a dropped listener falls back to polling quickly;
+            # _tick() itself skips the DB while the listener is healthy.
+            try:
+                await asyncio.wait_for(self._wake.wait(), POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                with db_scope("task sse_hub"):
+                    await self._tick()
+            except Exception as exc:
+                print(f"⚠️ SSE hub tick failed: {exc}")
+
+    async def _tick(self) -> None:
+        listener = event_listener()
+        if not self._subscribers:
+            self._cursor_stale = True
+            self._dirty_parties.clear()
+            return
+        fallback = self._rescan or listener.fallback_due(self._last_polled)
+        self._rescan = False
+        if fallback or listener.last_event_id > self._last_event_id:
+            await self._fan_out_events()
+        if fallback:
+            self._last_polled = time.monotonic()
+            await self._scan_parties()
+        dirty, self._dirty_parties = self._dirty_parties, set()
+        if dirty:
+            await self._refresh_parties(dirty)
+
+    async def _fan_out_events(self) -> None:
+        while True:
+            events = await apoll_events(self._last_event_id, limit=200)
+            for event in events:
+                self._last_event_id = event["id"]
+                if len(self._ring) == self._ring.maxlen:
+                    self._ring_from = self._ring[0]["id"]
+                self._ring.append(event)
+                frames = _event_frames(event)
+                for subscriber in self._recipients(event.get("audience")):
+                    for frame in frames:
+                        subscriber.push(*frame)
+                    self.deliveries += 1
+                self.events_fanned_out += 1
+            if len(events) < 200:
+                return
+
+    async def _scan_parties(self) -> None:
+        if use_json_stores():
+            # No updated_at to scan locally; re-resolve everyone (dev only).
+            await self._refresh_subscribers(list(self._subscribers))
+            return
+        watched = {sub.party_id for sub in self._subscribers if sub.party_id}
+        changed, self._party_watermark = await achanged_party_ids(self._party_watermark, watched)
+        self._dirty_parties.update(changed)
+
+    async def _refresh_parties(self, party_ids: Set[str]) -> None:
+        affected: Set[Subscriber] = set()
+        for party_id in party_ids:
+            affected.update(self._by_party.get(party_id, ()))
+            for discord_id in _party_member_ids(await aget_party(party_id)):
+                affected.update(self._by_user.get(discord_id, ()))
+        await self._refresh_subscribers(list(affected))
+
+    async def _refresh_subscribers(self, subscribers: List[Subscriber]) -> None:
+        """One active-party lookup per distinct user, however many tabs they have open."""
+        by_user: Dict[int, List[Subscriber]] = {}
+        for subscriber in subscribers:
+            by_user.setdefault(subscriber.discord_id, []).append(subscriber)
+        for discord_id, tabs in by_user.items():
+            party = await aget_active_party_for_user(discord_id)
+            for subscriber in tabs:
+                self._push_party(subscriber, party)
+
+
+_hub: Optional[EventHub] = None
+_hub_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def event_hub() -> EventHub:
+    """The hub for the running event loop (one per API process)."""
+    global _hub, _hub_loop
+    loop = asyncio.get_running_loop()
+    if _hub is None or _hub_loop is not loop:
+        _hub, _hub_loop = EventHub(), loop
+    return _hub
+
+
+def hub_stats() -> Dict[str, Any]:
+    return _hub.stats() if _hub is not None else {}
@@ -2,16 +2,16 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any
 
 import interactions
-from interactions import Extension, IntervalTrigger, Task, listen
+from interactions import Extension
 
-from domain.match import get_ally_request, upsert_ally_request
-from utils.billboard_store import find_war_across_boards
+from domain.match import aget_ally_request, upsert_ally_request
+from utils import discord_outbound as outbound
+from utils.billboard_store import afind_war_across_boards
 from utils.colors import COLORS
-from utils.db import get_conn, use_json_stores
+from utils.event_dispatch import register_event_handler
 from utils.guild_config import get_queue_channel_id
 from interactions import ActionRow, Button, ButtonStyle
 
@@ -49,73 +49,20 @@ def _ally_request_buttons(request_id: str) -> list:
 class AllyRequestBridge(Extension):
     def __init__(self, bot: interactions.Client):
         self.bot = bot
-        self._last_event_id = 0
-        self._ready = False
-
-    @listen()
-    async def on_startup(self):
-        if use_json_stores():
-            print("⏭️ AllyRequestBridge skipped (JSON stores / no event_bus)")
-            return
-        self._last_event_id = self._latest_event_id()
-        if not self.poll_ally_requests.running:
-            self.poll_ally_requests.start()
-            print("✅ AllyRequestBridge web→Discord task running")
-        self._ready = True
-
-    def _latest_event_id(self) -> int:
-        try:
-            with get_conn() as conn:
-                cursor = conn.cursor()
-                try:
-                    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM event_bus")
-                    row = cursor.fetchone()
-                finally:
-                    cursor.close()
-            return int(row[0]) if row else 0
-        except Exception:
-            return 0
-
-    def _poll_events(self) -> list[dict[str, Any]]:
-        if use_json_stores():
-            return []
-        try:
-            with get_conn() as conn:
-                cursor = conn.cursor()
-                try:
-                    cursor.execute(
-                        """
-                        SELECT id, event_type, payload FROM event_bus
-                        WHERE id > %s AND event_type = 'ally_request'
-                        ORDER BY id ASC LIMIT 50
-                        """,
-                        (self._last_event_id,),
-                    )
-                    rows = cursor.fetchall()
-                finally:
-                    cursor.close()
-        except Exception as exc:
-            print(f"⚠️ AllyRequestBridge event_bus poll failed: {exc}")
-            return []
-
-        events = []
-        for row_id, _event_type, payload in rows:
-            data = payload if isinstance(payload, dict) else json.loads(payload)
-            events.append({"id": int(row_id), "payload": data})
-        return events
+        register_event_handler("ally_request", self._deliver, name="ally_request_bridge")
 
     async def _deliver(self, payload: dict[str, Any]) -> None:
         request_id = payload.get("request_id")
         if not request_id:
             return
-        request = get_ally_request(str(request_id))
+        request = await aget_ally_request(str(request_id))
         if not request or request.get("status") != "pending":
             return
         if request.get("notification_message_id"):
             return  # already delivered
 
         war_id = request.get("war_id") or payload.get("war_id")
-        found = find_war_across_boards(war_id) if war_id else None
+        found = await afind_war_across_boards(war_id) if war_id else None
         if not found:
             print(f"⚠️ AllyRequestBridge: war {war_id} missing for request {request_id}")
             return
@@ -134,7 +81,9 @@ class AllyRequestBridge(Extension):
         if queue_channel_id:
             try:
                 channel = await self.bot.fetch_channel(int(queue_channel_id))
-                message = await channel.send(
+                message = await outbound.send(
+                    channel,
+                    priority=outbound.PRIORITY_MATCH,
                     content=roster_mentions or None,
                     embeds=embed,
                     components=buttons,
@@ -149,7 +98,9 @@ class AllyRequestBridge(Extension):
                 return
             try:
                 user = await self.bot.fetch_user(int(captain_id))
-                message = await user.send(embeds=embed, components=buttons)
+                message = await outbound.send(
+                    user, priority=outbound.PRIORITY_MATCH, embeds=embed, components=buttons
+                )
             except Exception as exc:
                 print(f"❌ AllyRequestBridge captain DM failed: {exc}")
                 return
@@ -158,17 +109,6 @@ class AllyRequestBridge(Extension):
         request["notification_message_id"] = message.id
         upsert_ally_request(request)
 
-    @Task.create(IntervalTrigger(seconds=2))
-    async def poll_ally_requests(self):
-        if use_json_stores() or not self._ready:
-            return
-        for event in self._poll_events():
-            self._last_event_id = event["id"]
-            try:
-                await self._deliver(event["payload"])
-            except Exception as exc:
-                print(f"⚠️ AllyRequestBridge handle failed: {exc}")
-
 
 def setup(bot: interactions.Client):
     AllyRequestBridge(bot)
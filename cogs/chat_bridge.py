@@ -2,74 +2,21 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any
 
 import interactions
-from interactions import Extension, Task, IntervalTrigger, listen
+from interactions import Extension
 
+from utils import discord_outbound as outbound
 from utils.colors import COLORS
-from utils.db import get_conn, use_json_stores
-from utils.match_session_store import get_session
+from utils.event_dispatch import register_event_handler
+from utils.match_session_store import aget_session
 
 
 class ChatBridge(Extension):
     def __init__(self, bot: interactions.Client):
         self.bot = bot
-        self._last_event_id = 0
-        self._ready = False
-
-    @listen()
-    async def on_startup(self):
-        if use_json_stores():
-            print("⏭️ ChatBridge skipped (JSON stores / no event_bus)")
-            return
-        self._last_event_id = self._latest_event_id()
-        if not self.poll_web_chat.running:
-            self.poll_web_chat.start()
-            print("✅ ChatBridge web→Discord task running")
-        self._ready = True
-
-    def _latest_event_id(self) -> int:
-        try:
-            with get_conn() as conn:
-                cursor = conn.cursor()
-                try:
-                    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM event_bus")
-                    row = cursor.fetchone()
-                finally:
-                    cursor.close()
-            return int(row[0]) if row else 0
-        except Exception:
-            return 0
-
-    def _poll_chat_events(self) -> list[dict[str, Any]]:
-        if use_json_stores():
-            return []
-        try:
-            with get_conn() as conn:
-                cursor = conn.cursor()
-                try:
-                    cursor.execute(
-                        """
-                        SELECT id, event_type, payload FROM event_bus
-                        WHERE id > %s AND event_type = 'chat'
-                        ORDER BY id ASC LIMIT 100
-                        """,
-                        (self._last_event_id,),
-                    )
-                    rows = cursor.fetchall()
-                finally:
-                    cursor.close()
-        except Exception as exc:
-            print(f"⚠️ ChatBridge event_bus poll failed: {exc}")
-            return []
-
-        events = []
-        for row_id, _event_type, payload in rows:
-            data = payload if isinstance(payload, dict) else json.loads(payload)
-            events.append({"id": int(row_id), "payload": data})
-        return events
+        register_event_handler("chat", self._handle_payload, name="chat_bridge")
 
     async def _post_embed(
         self,
@@ -86,7 +33,7 @@ class ChatBridge(Extension):
         embed.set_footer(text=footer or author_name or "Web")
         try:
             channel = await self.bot.fetch_channel(int(channel_id))
-            await channel.send(embeds=embed)
+            await outbound.send(channel, priority=outbound.PRIORITY_CHAT, embeds=embed)
         except Exception as exc:
             print(f"❌ ChatBridge failed to post to {channel_id}: {exc}")
 
@@ -98,7 +45,7 @@ class ChatBridge(Extension):
         session_id = payload.get("session_id")
         if not session_id:
             return
-        session = get_session(str(session_id))
+        session = await aget_session(str(session_id))
         if not session:
             return
 
@@ -137,17 +84,6 @@ class ChatBridge(Extension):
                 channel_id, body=body, author_name=author_name, color=color
             )
 
-    @Task.create(IntervalTrigger(seconds=2))
-    async def poll_web_chat(self):
-        if use_json_stores() or not self._ready:
-            return
-        for event in self._poll_chat_events():
-            self._last_event_id = event["id"]
-            try:
-                await self._handle_payload(event["payload"])
-            except Exception as exc:
-                print(f"⚠️ ChatBridge handle failed: {exc}")
-
 
 def setup(bot: interactions.Client):
     ChatBridge(bot)
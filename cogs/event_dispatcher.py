@@ -0,0 +1,121 @@
+"""Single event_bus tail for the bot; routes rows to handlers from utils.event_dispatch."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+import interactions
+from interactions import Extension, IntervalTrigger, Task, listen
+
+from utils.db import use_json_stores
+from utils.db_metrics import db_scoped
+from utils.event_bus import alatest_event_id, apoll_events, event_listener
+from utils.event_bus_retention import amaintain_event_bus
+from utils.event_dispatch import dispatch, event_types, flush_cursors, load_cursors, start_handlers
+
+BATCH_SIZE = 50
+# Pause between full batches so a post-deploy catch-up trickles into Discord.
+CATCHUP_PAUSE_SECONDS = float(os.getenv("EVENT_CATCHUP_PAUSE_SECONDS", "1.0"))
+
+
+class EventDispatcher(Extension):
+    def __init__(self, bot: interactions.Client):
+        self.bot = bot
+        self._last_event_id = 0
+        self._last_polled = 0.0
+        self._drain_lock = asyncio.Lock()
+        self._ready = False
+
+    @listen()
+    async def on_startup(self):
+        if use_json_stores():
+            print("⏭️ EventDispatcher skipped (JSON stores / no event_bus)")
+            return
+        try:
+            head_id = await alatest_event_id()
+        except Exception:
+            head_id = 0
+        try:
+            self._last_event_id = await load_cursors(head_id)
+        except Exception as exc:
+            print(f"⚠️ EventDispatcher cursors unavailable, starting at head: {exc}")
+            self._last_event_id = head_id
+        if head_id > self._last_event_id:
+            backlog = head_id - self._last_event_id
+            print(f"⏪ EventDispatcher catching up on up to {backlog} event(s)")
+        start_handlers()
+        self._ready = True
+        listener = event_listener()
+        listener.subscribe(self._drain_on_notify, event_types=event_types())
+        listener.start()
+        if not self.poll_event_bus.running:
+            self.poll_event_bus.start()
+            print(f"✅ EventDispatcher routing {', '.join(sorted(event_types()))}")
+        if not self.maintain_event_bus.running:
+            self.maintain_event_bus.start()
+            # The task's first tick is an hour out; partitions are needed now.
+            await self._maintain()
+
+    async def _drain(self) -> None:
+        async with self._drain_lock:
+            self._last_polled = time.monotonic()
+            types = event_types()
+            if not types:
+                return
+            while True:
+                try:
+                    events = await apoll_events(
+                        self._last_event_id, event_types=types, limit=BATCH_SIZE
+                    )
+                except Exception as exc:
+                    print(f"⚠️ EventDispatcher event_bus poll failed: {exc}")
+                    return
+                for event in events:
+                    await dispatch(event)
+                    self._last_event_id = event["id"]
+                if len(events) < BATCH_SIZE:
+                    return
+                await asyncio.sleep(CATCHUP_PAUSE_SECONDS)
+
+    @db_scoped("notify event_dispatcher")
+    async def _drain_on_notify(self) -> None:
+        await self._drain()
+
+    @Task.create(IntervalTrigger(seconds=2))
+    @db_scoped("task event_dispatcher")
+    async def poll_event_bus(self):
+        """Gap-filling fallback + batched cursor commits; notifications drain immediately."""
+        if use_json_stores() or not self._ready:
+            return
+        if event_listener().fallback_due(self._last_polled):
+            await self._drain()
+        try:
+            await flush_cursors()
+        except Exception as exc:
+            print(f"⚠️ EventDispatcher cursor flush failed: {exc}")
+
+    @Task.create(IntervalTrigger(hours=1))
+    @db_scoped("task event_bus_retention")
+    async def maintain_event_bus(self):
+        """Create upcoming event_bus partitions and drop the ones every consumer has read."""
+        if use_json_stores():
+            return
+        await self._maintain()
+
+    async def _maintain(self) -> None:
+        try:
+            result = await amaintain_event_bus()
+        except Exception as exc:
+            print(f"⚠️ event_bus maintenance failed: {exc}")
+            return
+        if result.get("created") or result.get("dropped"):
+            print(
+                f"🧹 event_bus partitions: +{len(result['created'])} "
+                f"-{len(result['dropped'])} (cutoff {result['cutoff']})"
+            )
+
+
+def setup(bot: interactions.Client):
+    EventDispatcher(bot)
@@ -106,7 +106,8 @@ class MatchInteractions(Extension):
                 except Exception:
                     pass
 
-            from utils.event_bus import publish_event
+            from utils.event_bus import event_audience, publish_event
+            from utils.match_session_store import session_roster_ids
 
             publish_event(
                 "match_confirmed",
@@ -116,6 +117,11 @@ class MatchInteractions(Extension):
                     "requester_war_id": requester_war.get("war_id"),
                     "target_war_id": target_war.get("war_id"),
                 },
+                audience=event_audience(
+                    discord_ids=session_roster_ids(session),
+                    session_id=session.get("session_id"),
+                    board=board,
+                ),
             )
 
             target_channel_note = (
@@ -2,6 +2,7 @@ import interactions
 from interactions import Extension, listen
 from interactions.api.events import MessageCreate
 
+from utils import discord_outbound as outbound
 from utils.colors import COLORS
 from utils.match_message_store import append_message
 from utils.match_session_store import get_session_by_channel
@@ -75,7 +76,7 @@ class MatchRelay(Extension):
                 )
             )
             try:
-                await channel.send(embeds=embed)
+                await outbound.send(channel, priority=outbound.PRIORITY_CHAT, embeds=embed)
             except Exception as exc:
                 print(f"❌ Failed to post group chat embed: {exc}")
 
@@ -88,12 +89,13 @@ class MatchRelay(Extension):
                         author_discord_id=int(message.author.id),
                         author_name=author_name,
                         source="discord",
+                        session=session,
                     )
                 except Exception:
                     pass
 
             try:
-                await message.delete()
+                await outbound.delete(message, priority=outbound.PRIORITY_CHAT)
             except Exception:
                 pass
             return
@@ -108,7 +110,7 @@ class MatchRelay(Extension):
 
         try:
             peer = await self.bot.fetch_channel(peer_channel_id)
-            await peer.send(embeds=embed)
+            await outbound.send(peer, priority=outbound.PRIORITY_CHAT, embeds=embed)
         except Exception as exc:
             print(f"❌ Failed to relay war message: {exc}")
 
@@ -121,6 +123,7 @@ class MatchRelay(Extension):
                     author_discord_id=int(message.author.id),
                     author_name=author_name,
                     source="discord",
+                    session=session,
                 )
             except Exception:
                 pass
@@ -2,15 +2,15 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any
 
 import interactions
-from interactions import ActionRow, Button, ButtonStyle, Extension, IntervalTrigger, Task, listen
+from interactions import ActionRow, Button, ButtonStyle, Extension
 
-from domain.match import get_match_request, upsert_match_request
-from utils.billboard_store import find_war
-from utils.db import get_conn, use_json_stores
+from domain.match import aget_match_request, upsert_match_request
+from utils import discord_outbound as outbound
+from utils.billboard_store import afind_war
+from utils.event_dispatch import register_event_handler
 from utils.embeds import build_match_request_embed
 from utils.guild_config import get_queue_channel_id
 
@@ -35,66 +35,13 @@ def _match_request_buttons(request_id: str) -> list:
 class MatchRequestBridge(Extension):
     def __init__(self, bot: interactions.Client):
         self.bot = bot
-        self._last_event_id = 0
-        self._ready = False
-
-    @listen()
-    async def on_startup(self):
-        if use_json_stores():
-            print("⏭️ MatchRequestBridge skipped (JSON stores / no event_bus)")
-            return
-        self._last_event_id = self._latest_event_id()
-        if not self.poll_match_requests.running:
-            self.poll_match_requests.start()
-            print("✅ MatchRequestBridge web→Discord task running")
-        self._ready = True
-
-    def _latest_event_id(self) -> int:
-        try:
-            with get_conn() as conn:
-                cursor = conn.cursor()
-                try:
-                    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM event_bus")
-                    row = cursor.fetchone()
-                finally:
-                    cursor.close()
-            return int(row[0]) if row else 0
-        except Exception:
-            return 0
-
-    def _poll_events(self) -> list[dict[str, Any]]:
-        if use_json_stores():
-            return []
-        try:
-            with get_conn() as conn:
-                cursor = conn.cursor()
-                try:
-                    cursor.execute(
-                        """
-                        SELECT id, event_type, payload FROM event_bus
-                        WHERE id > %s AND event_type = 'match_request'
-                        ORDER BY id ASC LIMIT 50
-                        """,
-                        (self._last_event_id,),
-                    )
-                    rows = cursor.fetchall()
-                finally:
-                    cursor.close()
-        except Exception as exc:
-            print(f"⚠️ MatchRequestBridge event_bus poll failed: {exc}")
-            return []
-
-        events = []
-        for row_id, _event_type, payload in rows:
-            data = payload if isinstance(payload, dict) else json.loads(payload)
-            events.append({"id": int(row_id), "payload": data})
-        return events
+        register_event_handler("match_request", self._deliver, name="match_request_bridge")
 
     async def _deliver(self, payload: dict[str, Any]) -> None:
         request_id = payload.get("request_id")
         if not request_id:
             return
-        request = get_match_request(str(request_id))
+        request = await aget_match_request(str(request_id))
         if not request or request.get("status") != "pending":
             return
         if request.get("notification_message_id"):
@@ -103,8 +50,8 @@ class MatchRequestBridge(Extension):
         board = request.get("board") or payload.get("board")
         target_war_id = request.get("target_war_id") or payload.get("target_war_id")
         requester_war_id = request.get("requester_war_id") or payload.get("requester_war_id")
-        target_war = find_war(board, target_war_id) if board and target_war_id else None
-        requester_war = find_war(board, requester_war_id) if board and requester_war_id else None
+        target_war = await afind_war(board, target_war_id) if board and target_war_id else None
+        requester_war = await afind_war(board, requester_war_id) if board and requester_war_id else None
         if not target_war or not requester_war:
             print(f"⚠️ MatchRequestBridge: war missing for request {request_id}")
             return
@@ -121,7 +68,9 @@ class MatchRequestBridge(Extension):
         if queue_channel_id:
             try:
                 channel = await self.bot.fetch_channel(int(queue_channel_id))
-                message = await channel.send(
+                message = await outbound.send(
+                    channel,
+                    priority=outbound.PRIORITY_MATCH,
                     content=mentions or None,
                     embeds=embed,
                     components=buttons,
@@ -136,7 +85,9 @@ class MatchRequestBridge(Extension):
                 return
             try:
                 user = await self.bot.fetch_user(int(captain_id))
-                message = await user.send(embeds=embed, components=buttons)
+                message = await outbound.send(
+                    user, priority=outbound.PRIORITY_MATCH, embeds=embed, components=buttons
+                )
             except Exception as exc:
                 print(f"❌ MatchRequestBridge captain DM failed: {exc}")
                 return
@@ -145,17 +96,6 @@ class MatchRequestBridge(Extension):
         request["notification_message_id"] = message.id
         upsert_match_request(request)
 
-    @Task.create(IntervalTrigger(seconds=2))
-    async def poll_match_requests(self):
-        if use_json_stores() or not self._ready:
-            return
-        for event in self._poll_events():
-            self._last_event_id = event["id"]
-            try:
-                await self._deliver(event["payload"])
-            except Exception as exc:
-                print(f"⚠️ MatchRequestBridge handle failed: {exc}")
-
 
 def setup(bot: interactions.Client):
     MatchRequestBridge(bot)
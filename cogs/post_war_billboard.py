@@ -1,52 +1,204 @@
+import asyncio
+import os
+import time
+
 import interactions
 from dotenv import load_dotenv
 from interactions import Extension, Client, listen, Task, IntervalTrigger
+from interactions.client.errors import NotFound
 
-from domain.queue import get_party, promote_due_opponent_searches, sweep_idle_queue_parties
-from utils.billboard_store import load_wars
+from domain.queue import aget_party, get_party, promote_due_opponent_searches, sweep_idle_queue_parties
+from utils import discord_outbound as outbound
+from utils.billboard_message_store import delete_message, load_board_messages, save_message
+from utils.billboard_store import afind_war, list_war_versions, load_wars, war_content_hash
 from utils.boards import ALL_BOARD_KEYS
 from utils.channel_access import can_access_guild, fetch_accessible_channel
-from utils.embeds import build_war_embed
+from utils.db import use_json_stores
+from utils.db_metrics import db_scoped
+from utils.embeds import prefetch_war_ratings, render_war_message
+from utils.event_dispatch import register_event_handler
 from utils.guild_config import list_billboard_channel_targets
 from utils.queue_service import is_queue_hidden
-from utils.war_buttons import build_war_buttons
 
 load_dotenv(".env.local")
 
+# hub_post events drive edits; the full pass is only a safety net (and the
+# only driver for JSON stores, which have no event bus).
+RECONCILE_SECONDS = float(os.getenv("BILLBOARD_RECONCILE_SECONDS", "300"))
+# Hub channels synced at once, overall and within one guild. Writes to one
+# channel share a rate-limit route anyway (utils.discord_outbound).
+FANOUT_CONCURRENCY = int(os.getenv("BILLBOARD_FANOUT_CONCURRENCY", "16"))
+GUILD_CONCURRENCY = int(os.getenv("BILLBOARD_GUILD_CONCURRENCY", "2"))
+
+# label -> timing of billboard fan-outs (startup, reconcile, refresh, remove).
+_fanout_stats: dict[str, dict] = {}
+
+
+def _record_fanout(label: str, channels: int, failures: int, elapsed_ms: float) -> None:
+    stats = _fanout_stats.setdefault(
+        label, {"runs": 0, "channels": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+    )
+    stats["runs"] += 1
+    stats["channels"] += channels
+    stats["failures"] += failures
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    stats["last_ms"] = elapsed_ms
+
+
+def fanout_stats() -> dict:
+    """Billboard fan-out timings for the bot /metrics endpoint."""
+    return {
+        label: {
+            "runs": stats["runs"],
+            "channels": stats["channels"],
+            "failures": stats["failures"],
+            "avg_ms": round(stats["total_ms"] / stats["runs"], 2) if stats["runs"] else 0.0,
+            "max_ms": round(stats["max_ms"], 2),
+            "last_ms": round(stats["last_ms"], 2),
+        }
+        for label, stats in list(_fanout_stats.items())
+    }
+
 
 class PostWarBillboard(Extension):
     def __init__(self, bot: Client):
         self.bot = bot
         self.board_caches: dict[str, dict] = {}
         self.ready = False
+        self._ready_event = asyncio.Event()
         self._skipped_guilds: set[int] = set()
+        # Per board: hub_posts versions and hub channel ids the billboard
+        # last fully matched. A reconcile pass skips boards where both agree.
+        self._versions: dict[str, dict[str, str]] = {}
+        self._targets: dict[str, tuple] = {}
+        self._last_reconcile = 0.0
+        # One war's message in one channel is only touched by one coroutine
+        # at a time, so an event and a direct refresh cannot both post it.
+        self._war_locks: dict[tuple, asyncio.Lock] = {}
+        self._fanout_slots = asyncio.Semaphore(FANOUT_CONCURRENCY)
+        self._guild_slots: dict[int, asyncio.Semaphore] = {}
+        register_event_handler("hub_post", self._on_hub_post, name="billboard_sync")
 
     def _cache_for(self, board: str) -> dict:
         if board not in self.board_caches:
             self.board_caches[board] = {}
         return self.board_caches[board]
 
+    def _lock_for(self, war_id: str, channel_id: int) -> asyncio.Lock:
+        key = (war_id, channel_id)
+        lock = self._war_locks.get(key)
+        if lock is None:
+            lock = self._war_locks[key] = asyncio.Lock()
+        return lock
+
+    def _guild_slot(self, guild_id: int) -> asyncio.Semaphore:
+        slot = self._guild_slots.get(guild_id)
+        if slot is None:
+            slot = self._guild_slots[guild_id] = asyncio.Semaphore(GUILD_CONCURRENCY)
+        return slot
+
+    @staticmethod
+    def _listed(war: dict, party: dict | None) -> bool:
+        return war.get("status") in ("open", "matched") and not is_queue_hidden(party)
+
     def load_json(self, board: str):
         wars = []
         for war in load_wars(board):
-            if war.get("status") not in ("open", "matched"):
-                continue
             party_id = war.get("party_id")
-            if party_id and is_queue_hidden(get_party(str(party_id))):
-                continue
-            wars.append(war)
+            if war.get("status") in ("open", "matched") and party_id:
+                party = get_party(str(party_id))
+            else:
+                party = None
+            if self._listed(war, party):
+                wars.append(war)
         return wars
 
+    @staticmethod
+    def _renderer(wars: list):
+        """render(war) for one pass: ratings for all `wars` are fetched once, on the first cache miss."""
+        prefetched: list = []
+
+        def ratings():
+            if not prefetched:
+                prefetched.append(prefetch_war_ratings(wars))
+            return prefetched[0]
+
+        return lambda war: render_war_message(war, ratings=ratings)
+
+    # Store calls below are blocking (pg8000 / SQLite) and run in a worker
+    # thread, so the fan-out tasks are not serialized on the event loop.
+
+    async def _load_index(self, board: str, cache: dict) -> None:
+        """Seed the cache from billboard_messages (message ids survive restarts)."""
+        try:
+            rows = await asyncio.to_thread(load_board_messages, board)
+        except Exception as exc:
+            print(f"⚠️ Could not load {board} billboard message index: {exc}")
+            return
+        for row in rows:
+            entry = cache.setdefault(row["war_id"], {"data": None, "messages": {}, "hashes": {}})
+            entry["messages"][row["channel_id"]] = row["message_id"]
+            entry["hashes"][row["channel_id"]] = row["content_hash"]
+
+    async def _remember(self, board: str, cache: dict, war: dict, channel_id: int, message_id: int) -> None:
+        war_id = war["war_id"]
+        content_hash = war_content_hash(war)
+        entry = cache.setdefault(war_id, {"data": war, "messages": {}, "hashes": {}})
+        entry["data"] = war
+        entry["messages"][channel_id] = message_id
+        entry["hashes"][channel_id] = content_hash
+        try:
+            await asyncio.to_thread(save_message, board, war_id, channel_id, message_id, content_hash)
+        except Exception as exc:
+            print(f"⚠️ Could not index {board} war {war_id} message in channel {channel_id}: {exc}")
+
+    async def _forget(self, cache: dict, war_id: str, channel_id: int) -> None:
+        entry = cache.get(war_id)
+        if entry:
+            entry["messages"].pop(channel_id, None)
+            entry["hashes"].pop(channel_id, None)
+            if not entry["messages"]:
+                del cache[war_id]
+        try:
+            await asyncio.to_thread(delete_message, war_id, channel_id)
+        except Exception as exc:
+            print(f"⚠️ Could not unindex war {war_id} message in channel {channel_id}: {exc}")
+
+    async def _snapshot(self, board: str) -> tuple[dict[str, str], tuple]:
+        """Current hub_posts versions and hub channel ids for `board`."""
+        versions = await asyncio.to_thread(list_war_versions, board)
+        targets = await asyncio.to_thread(list_billboard_channel_targets, board)
+        return versions, tuple(sorted(int(t["channel_id"]) for t in targets))
+
+    def _mark_synced(self, board: str, versions: dict[str, str], targets: tuple) -> None:
+        self._versions[board] = dict(versions)
+        self._targets[board] = targets
+
     @listen()
     async def on_startup(self):
         print("✅ Billboard system starting...")
 
-        for board in ALL_BOARD_KEYS:
+        async def start_board(board: str) -> None:
             cache = self._cache_for(board)
-            async for channel_id, channel in self._iter_accessible_channels(board):
-                await self.initial_sync(board, channel_id, channel, cache)
+            await self._load_index(board, cache)
+            # Snapshot before loading: a change in between only makes the next
+            # reconcile look again.
+            versions, targets = await self._snapshot(board)
+            wars = await asyncio.to_thread(self.load_json, board)
+            render = self._renderer(wars)
+
+            async def sync(channel_id, channel):
+                return await self.initial_sync(board, channel_id, channel, cache, wars=wars, render=render)
+
+            if not await self._fan_out("startup", board, sync):
+                self._mark_synced(board, versions, targets)
+
+        await asyncio.gather(*(start_board(board) for board in ALL_BOARD_KEYS))
 
         self.ready = True
+        self._ready_event.set()
+        self._last_reconcile = time.monotonic()
 
         if not self.sync_billboards.running:
             self.sync_billboards.start()
@@ -61,121 +213,241 @@ class PostWarBillboard(Extension):
             print(f"⏭️ Skipping billboard sync for **{label}** — bot is not in that server.")
         return False
 
-    async def _iter_accessible_channels(self, board: str):
-        for target in list_billboard_channel_targets(board):
+    async def _fan_out(self, label: str, board: str, work, *, only: set | None = None) -> int:
+        """
+        Run `work(channel_id, channel)` for every reachable hub channel of
+        `board` (or just the channel ids in `only`) concurrently, at most
+        FANOUT_CONCURRENCY at once and GUILD_CONCURRENCY per guild. `work`
+        returns a failure count; the total is returned and the run's timing
+        recorded under `label`.
+        """
+        targets = [
+            t
+            for t in await asyncio.to_thread(list_billboard_channel_targets, board)
+            if only is None or int(t["channel_id"]) in only
+        ]
+        if not targets:
+            return 0
+        started = time.monotonic()
+
+        async def run(target) -> int:
             guild_id = target["guild_id"]
             channel_id = target["channel_id"]
-            if not await self._can_reach_guild(guild_id, target.get("guild_name", "")):
-                continue
-            channel = await fetch_accessible_channel(self.bot, channel_id)
-            if not channel:
-                print(f"⏭️ Skipping billboard channel {channel_id} — bot cannot access it.")
-                continue
-            yield channel_id, channel
-
-    async def initial_sync(self, board: str, channel_id: int, channel, cache: dict):
-
-        wars = self.load_json(board)
-
-        for war in wars:
-            war_id = war["war_id"]
-            embed = build_war_embed(war)
-            components = build_war_buttons(war)
+            # Guild slot first: waiting on a busy guild must not hold an overall slot.
+            async with self._guild_slot(guild_id), self._fanout_slots:
+                if not await self._can_reach_guild(guild_id, target.get("guild_name", "")):
+                    return 0
+                channel = await fetch_accessible_channel(self.bot, channel_id)
+                if not channel:
+                    print(f"⏭️ Skipping billboard channel {channel_id} — bot cannot access it.")
+                    return 0
+                return await work(channel_id, channel)
+
+        failures = 0
+        for target, result in zip(targets, await asyncio.gather(*(run(t) for t in targets), return_exceptions=True)):
+            if isinstance(result, BaseException):
+                print(f"❌ {board} billboard {label} failed in channel {target['channel_id']}: {result}")
+                failures += 1
+            else:
+                failures += result
+        elapsed_ms = (time.monotonic() - started) * 1000.0
+        _record_fanout(label, len(targets), failures, elapsed_ms)
+        if label in ("startup", "reconcile"):
+            print(f"⏱️ {board} billboard {label}: {len(targets)} channel(s) in {elapsed_ms:.0f} ms, {failures} failed")
+        return failures
+
+    async def _sync_war_in_channel(
+        self, board: str, cache: dict, channel_id: int, channel, war: dict, render
+    ) -> str:
+        """
+        Bring one war's message in one channel up to date (call under the war
+        lock). Returns "kept", "edited", "posted" or "failed".
+        """
+        war_id = war["war_id"]
+        entry = cache.get(war_id) or {}
+        message_id = entry.get("messages", {}).get(channel_id)
+        if message_id and entry["hashes"].get(channel_id) == war_content_hash(war):
+            entry["data"] = war
+            return "kept"
+
+        embed, components = render(war)
+        if message_id:
             try:
-                msg = await channel.send(embeds=embed, components=components)
+                await outbound.edit_by_id(
+                    self.bot,
+                    channel_id,
+                    message_id,
+                    priority=outbound.PRIORITY_BILLBOARD,
+                    embeds=embed,
+                    components=components,
+                )
+                await self._remember(board, cache, war, channel_id, message_id)
+                return "edited"
+            except NotFound:
+                print(f"⚠️ Missing {board} war {war_id} message in channel {channel_id}; will repost")
             except Exception as exc:
-                print(f"❌ Cannot post {board} war {war_id} to channel {channel_id}: {exc}")
-                continue
-
-            if war_id not in cache:
-                cache[war_id] = {"data": war, "messages": {}}
-            cache[war_id]["data"] = war
-            cache[war_id]["messages"][channel_id] = msg.id
+                print(f"❌ Failed to edit {board} war {war_id} in channel {channel_id}: {exc}")
+                return "failed"
+            await self._forget(cache, war_id, channel_id)
 
-        print(f"✅ Initial {board} billboard synced for channel {channel_id}")
+        try:
+            msg = await outbound.send(
+                channel, priority=outbound.PRIORITY_BILLBOARD, embeds=embed, components=components
+            )
+        except Exception as exc:
+            print(f"❌ Cannot post {board} war {war_id} to channel {channel_id}: {exc}")
+            return "failed"
+        await self._remember(board, cache, war, channel_id, msg.id)
+        return "posted"
+
+    async def _delete_in_channel(self, board: str, cache: dict, channel_id: int, war_id: str) -> bool:
+        message_id = cache.get(war_id, {}).get("messages", {}).get(channel_id)
+        if not message_id:
+            return True
+        try:
+            await outbound.delete_by_id(self.bot, channel_id, message_id, priority=outbound.PRIORITY_BILLBOARD)
+        except NotFound:
+            pass  # Already gone.
+        except Exception as exc:
+            print(f"❌ Failed to remove {board} war {war_id} from channel {channel_id}: {exc}")
+            return False
+        await self._forget(cache, war_id, channel_id)
+        return True
+
+    async def initial_sync(
+        self, board: str, channel_id: int, channel, cache: dict, *, wars=None, render=None
+    ) -> int:
+        """
+        Reconcile one channel with the message index: unchanged posts are left
+        alone, changed ones edited in place, missing ones posted and posts of
+        wars that are gone deleted. Returns how many operations failed.
+        """
+        if wars is None:
+            wars = await asyncio.to_thread(self.load_json, board)
+        render = render or self._renderer(wars)
+        war_ids = {war["war_id"] for war in wars}
+
+        if not any(channel_id in entry["messages"] for entry in cache.values()):
+            # Nothing indexed for this channel yet (first run with the index):
+            # adopt the billboard messages already in it instead of reposting.
+            for war_id, message_id in (await self._scan_war_messages(channel)).items():
+                if war_id in war_ids:
+                    entry = cache.setdefault(war_id, {"data": None, "messages": {}, "hashes": {}})
+                    entry["messages"][channel_id] = message_id
+
+        counts = {"kept": 0, "edited": 0, "posted": 0, "failed": 0, "removed": 0}
+        for war in wars:
+            async with self._lock_for(war["war_id"], channel_id):
+                outcome = await self._sync_war_in_channel(board, cache, channel_id, channel, war, render)
+            counts[outcome] += 1
 
-    async def refresh_war(self, board: str, war: dict) -> None:
-        """Immediately update this war's billboard messages across all hub channels."""
+        for war_id in [w for w, entry in cache.items() if channel_id in entry["messages"]]:
+            if war_id in war_ids:
+                continue
+            async with self._lock_for(war_id, channel_id):
+                removed = await self._delete_in_channel(board, cache, channel_id, war_id)
+            counts["removed" if removed else "failed"] += 1
+
+        print(
+            f"✅ Initial {board} billboard synced for channel {channel_id} "
+            f"({counts['kept']} kept, {counts['edited']} edited, {counts['posted']} posted, "
+            f"{counts['removed']} removed, {counts['failed']} failed)"
+        )
+        return counts["failed"]
+
+    async def refresh_war(self, board: str, war: dict) -> bool:
+        """
+        Immediately update this war's billboard messages across all hub
+        channels (channels already showing this content are skipped).
+        Returns False if any channel failed.
+        """
         war_id = war.get("war_id")
         if not war_id:
-            return
+            return True
 
         cache = self._cache_for(board)
-        embed = build_war_embed(war)
-        components = build_war_buttons(war)
-
-        async for channel_id, channel in self._iter_accessible_channels(board):
-            message_id = cache.get(war_id, {}).get("messages", {}).get(channel_id)
-            if not message_id:
-                message_id = await self._find_war_message(channel, war_id)
-
-            if not message_id:
-                try:
-                    msg = await channel.send(embeds=embed, components=components)
-                except Exception as exc:
-                    print(f"❌ Cannot post {board} war {war_id} to channel {channel_id}: {exc}")
-                    continue
-                message_id = msg.id
+        # Rendered once, shared by every channel.
+        rendered: list = []
+
+        def render(war: dict):
+            if not rendered:
+                rendered.append(render_war_message(war))
+            return rendered[0]
+
+        async def sync(channel_id, channel) -> int:
+            async with self._lock_for(war_id, channel_id):
+                outcome = await self._sync_war_in_channel(board, cache, channel_id, channel, war, render)
+            if outcome == "posted":
                 print(f"🆕 Posted {board} war {war_id} to channel {channel_id}")
-
-            try:
-                message = await channel.fetch_message(message_id)
-                if message is None:
-                    print(f"⚠️ Missing {board} war {war_id} message in channel {channel_id}; will repost")
-                    cache.get(war_id, {}).get("messages", {}).pop(channel_id, None)
-                    try:
-                        msg = await channel.send(embeds=embed, components=components)
-                    except Exception as exc:
-                        print(f"❌ Cannot post {board} war {war_id} to channel {channel_id}: {exc}")
-                        continue
-                    if war_id not in cache:
-                        cache[war_id] = {"data": war, "messages": {}}
-                    cache[war_id]["data"] = war
-                    cache[war_id]["messages"][channel_id] = msg.id
-                    print(f"🆕 Reposted {board} war {war_id} in channel {channel_id}")
-                    continue
-                await message.edit(embeds=embed, components=components)
-                if war_id not in cache:
-                    cache[war_id] = {"data": war, "messages": {}}
-                cache[war_id]["data"] = war
-                cache[war_id]["messages"][channel_id] = message_id
+            elif outcome == "edited":
                 print(f"🔁 Refreshed {board} war {war_id} in channel {channel_id}")
-            except Exception as exc:
-                print(f"❌ Failed to refresh war {war_id} in channel {channel_id}: {exc}")
+            return int(outcome == "failed")
+
+        return not await self._fan_out("refresh", board, sync)
 
-    async def remove_war(self, board: str, war_id: str) -> None:
+    async def remove_war(self, board: str, war_id: str) -> bool:
         """Delete this war's billboard messages across all hub channels."""
         cache = self._cache_for(board)
-        async for channel_id, channel in self._iter_accessible_channels(board):
-            message_id = cache.get(war_id, {}).get("messages", {}).get(channel_id)
-            if not message_id:
-                message_id = await self._find_war_message(channel, war_id)
-            if not message_id:
-                continue
-            try:
-                message = await channel.fetch_message(message_id)
-                await message.delete()
+        channel_ids = set(cache.get(war_id, {}).get("messages", {}))
+        if not channel_ids:
+            return True
+
+        async def remove(channel_id, channel) -> int:
+            async with self._lock_for(war_id, channel_id):
+                removed = await self._delete_in_channel(board, cache, channel_id, war_id)
+            if removed:
                 print(f"🗑️ Removed {board} war {war_id} from channel {channel_id}")
-            except Exception as exc:
-                print(f"❌ Failed to remove war {war_id} from channel {channel_id}: {exc}")
+            return int(not removed)
 
-        if war_id in cache:
-            del cache[war_id]
+        return not await self._fan_out("remove", board, remove, only=channel_ids)
 
-    async def _find_war_message(self, channel, war_id: str) -> int | None:
+    async def _on_hub_post(self, payload: dict) -> None:
+        """hub_post event (utils.billboard_store): sync only the war that changed."""
+        board = payload.get("board")
+        war_id = payload.get("war_id")
+        if not board or not war_id:
+            return
+        # Startup reconciles from a snapshot; edits wait until it is done.
+        await self._ready_event.wait()
+
+        versions = self._versions.setdefault(board, {})
+        version = payload.get("version")
+        if payload.get("action") == "delete":
+            if await self.remove_war(board, war_id):
+                versions.pop(war_id, None)
+            return
+        try:
+            if version is not None and int(versions.get(war_id) or 0) >= int(version):
+                return  # Already showing this version (replayed or duplicate event).
+        except (TypeError, ValueError):
+            pass
+
+        war = await afind_war(board, war_id)
+        party = await aget_party(str(war["party_id"])) if war and war.get("party_id") else None
+        if war and self._listed(war, party):
+            ok = await self.refresh_war(board, war)
+        else:
+            ok = await self.remove_war(board, war_id)
+        if ok and version is not None:
+            versions[war_id] = str(version)
+
+    async def _scan_war_messages(self, channel) -> dict[str, int]:
+        """war_id → message id for billboard posts among the channel's recent messages."""
+        found: dict[str, int] = {}
         try:
             messages = await channel.fetch_messages(limit=50)
             for message in messages:
                 for row in message.components or []:
                     for component in row.children:
                         custom_id = getattr(component, "custom_id", None) or ""
-                        if custom_id.endswith(f":{war_id}"):
-                            return message.id
+                        if ":" in custom_id:
+                            found.setdefault(custom_id.rsplit(":", 1)[1], message.id)
         except Exception:
             pass
-        return None
+        return found
 
     @Task.create(IntervalTrigger(seconds=30))
+    @db_scoped("task sync_billboards")
     async def sync_billboards(self):
         try:
             notes = sweep_idle_queue_parties()
@@ -184,10 +456,38 @@ class PostWarBillboard(Extension):
         except Exception as exc:
             print(f"⚠️ queue idle sweep failed: {exc}")
         await self._promote_scheduled_opponent_searches()
-        for board in ALL_BOARD_KEYS:
+        if use_json_stores() or time.monotonic() - self._last_reconcile >= RECONCILE_SECONDS:
+            self._last_reconcile = time.monotonic()
+            await self.reconcile()
+
+    async def reconcile(self, *, force: bool = False) -> None:
+        """
+        Safety pass behind the hub_post events: a board whose post versions
+        and hub channels match the last full sync is skipped without loading
+        a single post.
+        """
+        async def reconcile_board(board: str) -> None:
+            versions, targets = await self._snapshot(board)
+            if not force and self._versions.get(board) == versions and self._targets.get(board) == targets:
+                return
             cache = self._cache_for(board)
-            async for channel_id, channel in self._iter_accessible_channels(board):
-                await self.sync_one(board, channel_id, channel, cache)
+            wars = await asyncio.to_thread(self.load_json, board)
+            render = self._renderer(wars)
+
+            async def sync(channel_id, channel):
+                return await self.sync_one(board, channel_id, channel, cache, wars=wars, render=render)
+
+            if not await self._fan_out("reconcile", board, sync):
+                self._mark_synced(board, versions, targets)
+
+        await asyncio.gather(*(reconcile_board(board) for board in ALL_BOARD_KEYS))
+
+        live = {war_id for cache in self.board_caches.values() for war_id in cache}
+        self._war_locks = {
+            key: lock
+            for key, lock in self._war_locks.items()
+            if lock.locked() or key[0] in live
+        }
 
     async def _promote_scheduled_opponent_searches(self):
         from utils.queue_lobby import refresh_queue_lobby_message
@@ -207,61 +507,37 @@ class PostWarBillboard(Extension):
                 except Exception:
                     pass
 
-    async def sync_one(self, board: str, channel_id: int, channel, cache: dict):
-        latest_wars = self.load_json(board)
+    async def sync_one(
+        self, board: str, channel_id: int, channel, cache: dict, *, wars=None, render=None
+    ) -> int:
+        """Diff one channel against `wars`; returns how many operations failed."""
+        latest_wars = await asyncio.to_thread(self.load_json, board) if wars is None else wars
+        render = render or self._renderer(latest_wars)
         latest_by_id = {w["war_id"]: w for w in latest_wars}
+        failures = 0
 
         for war_id, war in latest_by_id.items():
-            entry = cache.get(war_id)
-            message_id = entry["messages"].get(channel_id) if entry else None
-
-            if not message_id:
-                try:
-                    msg = await channel.send(
-                        embeds=build_war_embed(war),
-                        components=build_war_buttons(war),
-                    )
-                except Exception as exc:
-                    print(f"❌ Cannot post {board} war {war_id} to channel {channel_id}: {exc}")
-                    continue
-
-                if war_id not in cache:
-                    cache[war_id] = {"data": war, "messages": {}}
-                cache[war_id]["data"] = war
-                cache[war_id]["messages"][channel_id] = msg.id
+            async with self._lock_for(war_id, channel_id):
+                outcome = await self._sync_war_in_channel(board, cache, channel_id, channel, war, render)
+            if outcome == "posted":
                 print(f"🆕 New {board} war {war_id} in channel {channel_id}")
-                continue
-
-            if entry and war != entry["data"]:
-                try:
-                    msg = await channel.fetch_message(message_id)
-                    if msg is None:
-                        cache[war_id]["messages"].pop(channel_id, None)
-                        print(f"⚠️ Missing {board} war {war_id} message in channel {channel_id}; will repost")
-                        continue
-                    await msg.edit(
-                        embeds=build_war_embed(war),
-                        components=build_war_buttons(war),
-                    )
-                    cache[war_id]["data"] = war
-                    print(f"🔁 Updated {board} war {war_id} in channel {channel_id}")
-                except Exception as exc:
-                    print(f"❌ Failed to edit war {war_id}: {exc}")
+            elif outcome == "edited":
+                print(f"🔁 Updated {board} war {war_id} in channel {channel_id}")
+            elif outcome == "failed":
+                failures += 1
 
         if self.ready:
             for war_id in list(cache.keys()):
-                if war_id not in latest_by_id:
-                    message_id = cache[war_id]["messages"].get(channel_id)
-                    if message_id:
-                        try:
-                            msg = await channel.fetch_message(message_id)
-                            await msg.delete()
-                            print(f"❌ Deleted {board} war {war_id} from channel {channel_id}")
-                        except Exception:
-                            pass
-                    cache[war_id]["messages"].pop(channel_id, None)
-                    if not cache[war_id]["messages"]:
-                        del cache[war_id]
+                # Other channels' tasks may drop entries while this one awaits.
+                if war_id in latest_by_id or channel_id not in cache.get(war_id, {}).get("messages", {}):
+                    continue
+                async with self._lock_for(war_id, channel_id):
+                    removed = await self._delete_in_channel(board, cache, channel_id, war_id)
+                if removed:
+                    print(f"❌ Deleted {board} war {war_id} from channel {channel_id}")
+                else:
+                    failures += 1
+        return failures
 
 
 def setup(bot: Client):
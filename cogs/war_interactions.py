@@ -44,7 +44,7 @@ from utils.billboard_store import delete_war, find_war_across_boards, find_war_b
 from utils.billboard_refresh import refresh_war_billboard_posts
 from utils.colors import COLORS
 from utils.discord_defer import defer_ephemeral
-from utils.embeds import build_match_request_embed, build_war_embed
+from utils.embeds import build_match_request_embed, render_war_message
 from utils.guild_config import get_queue_channel_id
 from utils.lineup_lock import find_blocking_lineup, lineup_lock_message
 from utils.modal_labels import (
@@ -56,7 +56,6 @@ from utils.modal_labels import (
 from utils.player_links import require_linked_fc
 from utils.queue_lobby import refresh_queue_lobby_message
 from utils.search_time import format_search_time, opponent_search_unlocked
-from utils.war_buttons import build_war_buttons
 
 patch_modal_context()
 
@@ -158,8 +157,7 @@ class WarInteractions(Extension):
         war: Dict[str, Any],
         clicked_message=None,
     ) -> None:
-        embed = build_war_embed(war)
-        components = build_war_buttons(war)
+        embed, components = render_war_message(war)
 
         if clicked_message is not None:
             try:
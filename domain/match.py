@@ -1,6 +1,7 @@
 """Match request / finalize domain API (Discord channel creation stays in utils.match_service)."""
 
 from utils.ally_request_store import (
+    aget_ally_request,
     create_ally_request,
     delete_ally_request,
     get_ally_request,
@@ -10,6 +11,7 @@ from utils.ally_request_store import (
     upsert_ally_request,
 )
 from utils.match_request_store import (
+    aget_request as aget_match_request,
     create_request as create_match_request,
     delete_request as delete_match_request,
     get_request as get_match_request,
@@ -23,12 +25,14 @@ from utils.match_service import (
     start_match_request,
 )
 from utils.match_session_store import (
+    aget_session,
     create_session,
     delete_session,
     get_session,
     get_session_by_channel,
     get_session_by_war_id,
     get_session_for_user,
+    list_sessions,
     upsert_session,
 )
 from utils.party_invite_store import (
@@ -41,6 +45,9 @@ from utils.party_invite_store import (
 )
 
 __all__ = [
+    "aget_ally_request",
+    "aget_match_request",
+    "aget_session",
     "board_for_party",
     "create_ally_request",
     "create_match_request",
@@ -60,6 +67,7 @@ __all__ = [
     "get_session_for_user",
     "list_inbound_invites",
     "list_outbound_invites",
+    "list_sessions",
     "pending_ally_for_user",
     "pending_ally_for_war",
     "pending_ally_for_war_and_user",
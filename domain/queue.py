@@ -25,6 +25,9 @@ from utils.queue_service import (
     unhide_party_queue,
 )
 from utils.queue_store import (
+    achanged_party_ids,
+    aget_active_party_for_user,
+    aget_party,
     delete_party,
     get_active_party_for_guild,
     get_active_party_for_user,
@@ -35,6 +38,9 @@ from utils.queue_store import (
 )
 
 __all__ = [
+    "achanged_party_ids",
+    "aget_active_party_for_user",
+    "aget_party",
     "cancel_party",
     "create_match_post_from_party",
     "delete_party",
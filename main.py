@@ -34,6 +34,31 @@ def _load_lounge_api_key() -> None:
 token = get_secret("discord_key_local" if DEV else "discord_key_prod")
 
 
+# ---------------------------
+# DB round-trip scopes
+# ---------------------------
+def _interaction_label(ctx) -> str:
+    target = getattr(ctx, "invoke_target", None)
+    if target:
+        return f"cmd {target}"
+    custom_id = str(getattr(ctx, "custom_id", "") or "")
+    return f"component {custom_id.split(':', 1)[0] or '?'}"
+
+
+async def _begin_db_scope(ctx, *args, **kwargs) -> None:
+    """Runs in the interaction's task, so every store call in the callback is counted."""
+    from utils.db_metrics import begin_scope
+
+    begin_scope(_interaction_label(ctx))
+
+
+async def _record_db_scope(ctx, *args, **kwargs) -> None:
+    """post_run tasks copy the interaction's context, scope included."""
+    from utils.db_metrics import end_scope
+
+    end_scope()
+
+
 # ---------------------------
 # interactions.py Client
 # ---------------------------
@@ -41,9 +66,28 @@ bot = interactions.Client(
     token=token,
     intents=interactions.Intents.DEFAULT | interactions.Intents.MESSAGE_CONTENT,
     send_command_tracebacks=False,
+    global_pre_run_callback=_begin_db_scope,
+    global_post_run_callback=_record_db_scope,
 )
 
 
+# post_run is skipped when the callback raises; the error event is dispatched
+# from the interaction's task too (defaults still log it), so close it there.
+@interactions.listen(interactions.events.CommandError)
+async def _record_db_scope_on_command_error(event) -> None:
+    await _record_db_scope(event.ctx)
+
+
+@interactions.listen(interactions.events.ComponentError)
+async def _record_db_scope_on_component_error(event) -> None:
+    await _record_db_scope(event.ctx)
+
+
+@interactions.listen(interactions.events.ModalError)
+async def _record_db_scope_on_modal_error(event) -> None:
+    await _record_db_scope(event.ctx)
+
+
 # ---------------------------
 # Slash Commands
 # ---------------------------
@@ -125,6 +169,40 @@ def _start_cloud_run_health_server() -> None:
 
     class _HealthHandler(BaseHTTPRequestHandler):
         def do_GET(self):  # noqa: N802
+            if self.path.split("?", 1)[0] == "/metrics":
+                import hmac
+                import json
+
+                # Same gate as the API's /metrics: Bearer METRICS_TOKEN, 404 when unset.
+                metrics_token = os.getenv("METRICS_TOKEN", "")
+                auth_header = self.headers.get("Authorization") or ""
+                given = auth_header[7:].strip() if auth_header.lower().startswith("bearer ") else ""
+                if not metrics_token or not hmac.compare_digest(given.encode("utf-8"), metrics_token.encode("utf-8")):
+                    self.send_response(404 if not metrics_token else 401)
+                    self.end_headers()
+                    return
+
+                from cogs.post_war_billboard import fanout_stats
+                from utils.db_metrics import metrics_snapshot
+                from utils.discord_outbound import outbound_stats
+                from utils.embeds import render_cache_stats
+                from utils.event_bus import publish_stats
+                from utils.event_dispatch import handler_stats
+
+                snapshot = {
+                    **metrics_snapshot(),
+                    "event_handlers": handler_stats(),
+                    "event_publish": publish_stats(),
+                    "war_render": render_cache_stats(),
+                    "discord_outbound": outbound_stats(),
+                    "billboard_fanout": fanout_stats(),
+                }
+                body = json.dumps(snapshot, default=str).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+                return
             self.send_response(200)
             self.send_header("Content-Type", "text/plain")
             self.end_headers()
@@ -164,6 +242,7 @@ if __name__ == "__main__":
     bot.load_extension("cogs.ally_request_bridge")
     bot.load_extension("cogs.match_request_bridge")
     bot.load_extension("cogs.party_sync_bridge")
+    bot.load_extension("cogs.event_dispatcher")
     bot.load_extension("cogs.ally_join")
     bot.load_extension("cogs.submit_pen")
     bot.load_extension("cogs.post_war_billboard")
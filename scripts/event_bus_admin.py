@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Show event_bus size, partitions and consumer lag; optionally run retention.
+
+    python scripts/event_bus_admin.py             # status only
+    python scripts/event_bus_admin.py --maintain  # create upcoming partitions, drop expired ones
+    python scripts/event_bus_admin.py --json      # status as JSON
+
+The bot runs the same maintenance hourly (cogs.event_dispatcher).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+
+load_dotenv(ROOT / ".env.local")
+
+from utils.db import init_db, use_json_stores  # noqa: E402
+from utils.event_bus_retention import aevent_bus_status, amaintain_event_bus  # noqa: E402
+
+
+def _mb(num_bytes: int) -> str:
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+
+def _print_status(status: dict) -> None:
+    print(
+        f"event_bus: head id {status['head_id']}, ~{status['rows_estimate']} rows, "
+        f"{_mb(status['total_bytes'])}"
+    )
+    print(f"retention cutoff: {status['retention_cutoff']}")
+    print("partitions:")
+    for partition in status["partitions"]:
+        until = partition["until"].isoformat() if partition["until"] else "DEFAULT"
+        print(
+            f"  {partition['name']}\tuntil {until}\t~{partition['rows_estimate']} rows"
+            f"\t{_mb(partition['bytes'])}"
+        )
+    print("consumers:")
+    if not status["consumers"]:
+        print("  (none)")
+    for consumer in status["consumers"]:
+        print(
+            f"  {consumer['name']}\tlast_id {consumer['last_id']}\t"
+            f"lag {consumer['lag_events']} event(s) / {consumer['lag_seconds']}s\t"
+            f"updated {consumer['updated_at']}"
+        )
+
+
+async def _main(args: argparse.Namespace) -> int:
+    if args.maintain:
+        result = await amaintain_event_bus()
+        print(f"Created: {', '.join(result['created']) or '-'}")
+        print(f"Dropped: {', '.join(result['dropped']) or '-'} (cutoff {result['cutoff']})")
+    status = await aevent_bus_status()
+    if args.json:
+        print(json.dumps(status, indent=2, default=str))
+    else:
+        _print_status(status)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--maintain", action="store_true", help="Run partition upkeep first.")
+    parser.add_argument("--json", action="store_true", help="Print status as JSON.")
+    args = parser.parse_args()
+
+    init_db()
+    if use_json_stores():
+        print("Database not available (JSON stores active). Fix secrets/IAM and retry.")
+        return 1
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
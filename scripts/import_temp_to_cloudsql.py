@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""One-shot import of temp/*.json durable data into Cloud SQL."""
+"""One-shot import of local durable data (temp/*.json / local store) into Cloud SQL."""
 
 from __future__ import annotations
 
@@ -19,6 +19,7 @@ load_dotenv(ROOT / ".env.local")
 from utils.boards import ALL_BOARD_KEYS  # noqa: E402
 from utils.config import DATA_DIR  # noqa: E402
 from utils.db import get_conn, init_db, use_json_stores  # noqa: E402
+from utils.local_store import LOCAL_STORE_PATH, read_legacy_shape  # noqa: E402
 from utils.player_store import (  # noqa: E402
     DEFAULT_PLAYER_MMR,
     _blank_player,
@@ -27,8 +28,23 @@ from utils.player_store import (  # noqa: E402
     _ensure_player_shape,
 )
 
+# Imported for their local-store registrations (see _read_json).
+import utils.ally_request_store  # noqa: E402,F401
+import utils.match_request_store  # noqa: E402,F401
+import utils.match_session_store  # noqa: E402,F401
+import utils.queue_store  # noqa: E402,F401
+import utils.war_results_store  # noqa: E402,F401
+
+
+def _has_source(path: Path) -> bool:
+    return path.exists() or Path(LOCAL_STORE_PATH).exists()
+
 
 def _read_json(path: Path, fallback: Any) -> Any:
+    # Stores moved to utils.local_store read from SQLite (legacy file imported).
+    local = read_legacy_shape(str(path))
+    if local is not None:
+        return local
     if not path.exists():
         return fallback
     try:
@@ -175,36 +191,17 @@ def _import_war_results() -> int:
     results = _read_json(Path(DATA_DIR) / "war-results.json", {"results": []}).get(
         "results", []
     )
-    count = 0
-    with get_conn() as conn:
-        cursor = conn.cursor()
-        try:
-            for result in results:
-                result_id = result.get("result_id")
-                completed_at = result.get("completed_at")
-                cursor.execute(
-                    """
-                    INSERT INTO war_results (result_id, completed_at, payload)
-                    VALUES (%s, %s::timestamptz, %s::jsonb)
-                    ON CONFLICT (result_id) DO UPDATE SET
-                      completed_at = EXCLUDED.completed_at,
-                      payload = EXCLUDED.payload
-                    """,
-                    (
-                        result_id,
-                        completed_at,
-                        json.dumps(result),
-                    ),
-                )
-                count += 1
-        finally:
-            cursor.close()
-    return count
+    # append_result keeps the typed columns and war_result_players in sync.
+    from utils.war_results_store import append_result
+
+    for result in results:
+        append_result(result)
+    return len(results)
 
 
 def _import_queue_parties() -> int:
     path = Path(DATA_DIR) / "queue-parties.json"
-    if not path.exists():
+    if not _has_source(path):
         print("  skip queue_parties (no queue-parties.json)")
         return 0
     parties: Dict[str, Any] = _read_json(path, {"parties": {}}).get("parties", {})
@@ -329,7 +326,7 @@ def _import_hub_posts() -> int:
 
 def _import_ally_requests() -> int:
     path = Path(DATA_DIR) / "ally-requests.json"
-    if not path.exists():
+    if not _has_source(path):
         print("  skip ally_requests (no ally-requests.json)")
         return 0
     requests: Dict[str, Any] = _read_json(path, {"requests": {}}).get("requests", {})
@@ -375,7 +372,7 @@ def _import_ally_requests() -> int:
 
 def _import_match_requests() -> int:
     path = Path(DATA_DIR) / "match-requests.json"
-    if not path.exists():
+    if not _has_source(path):
         print("  skip match_requests (no match-requests.json)")
         return 0
     requests: Dict[str, Any] = _read_json(path, {"requests": {}}).get("requests", {})
@@ -421,7 +418,7 @@ def _import_match_requests() -> int:
 
 def _import_match_sessions() -> int:
     path = Path(DATA_DIR) / "match-sessions.json"
-    if not path.exists():
+    if not _has_source(path):
         print("  skip match_sessions (no match-sessions.json)")
         return 0
     sessions: Dict[str, Any] = _read_json(path, {"sessions": {}}).get("sessions", {})
@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
-"""Apply sql/schema.sql to Cloud SQL."""
+"""Apply pending sql/migrations/NNNN_*.sql to Postgres, in order.
+
+    python scripts/migrate_schema.py           # apply pending migrations
+    python scripts/migrate_schema.py --status  # show the ledger, apply nothing
+
+Set DB_AUTO_MIGRATE=0 on the bot/API so only this runner touches DDL.
+"""
 
 from __future__ import annotations
 
+import argparse
+import os
 import sys
 from pathlib import Path
 
@@ -14,16 +22,48 @@ from dotenv import load_dotenv
 
 load_dotenv(ROOT / ".env.local")
 
-from utils.db import apply_schema, init_db, use_json_stores  # noqa: E402
+# init_db() must not migrate on its own; this script reports what it applies.
+os.environ["DB_AUTO_MIGRATE"] = "0"
+
+from utils.db import (  # noqa: E402
+    applied_migrations,
+    apply_migrations,
+    get_conn,
+    init_db,
+    migration_checksum,
+    migration_files,
+    use_json_stores,
+)
+
+
+def _print_status() -> None:
+    with get_conn() as conn:
+        ledger = applied_migrations(conn)
+    for version, name, path in migration_files():
+        row = ledger.get(version)
+        if row is None:
+            state = "pending"
+        elif row[1] != migration_checksum(path):
+            state = "applied (file changed since!)"
+        else:
+            state = "applied"
+        print(f"{version:04d}_{name}: {state}")
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="Show applied/pending migrations only.")
+    args = parser.parse_args()
+
     init_db()
     if use_json_stores():
         print("Database not available (JSON stores active). Fix secrets/IAM and retry.")
         return 1
-    apply_schema()
-    print("Schema applied.")
+    if args.status:
+        _print_status()
+        return 0
+    applied = apply_migrations()
+    print(f"Applied {len(applied)} migration(s)." if applied else "Schema is up to date.")
     return 0
 
 
@@ -71,6 +71,7 @@ def main() -> int:
             cursor.execute(
                 """
                 SELECT id, payload FROM war_results
+                WHERE mode = 'ranked'
                 ORDER BY completed_at ASC NULLS LAST, id ASC
                 """
             )
@@ -78,13 +79,9 @@ def main() -> int:
         finally:
             cursor.close()
 
-    print(f"Replaying {len(wars)} war(s) through apply_ranked_war_sr...")
+    print(f"Replaying {len(wars)} ranked war(s) through apply_ranked_war_sr...")
     for war_id, payload_raw in wars:
         payload = _parse(payload_raw)
-        mode = str(payload.get("mode") or "ranked").lower()
-        if mode != "ranked":
-            print(f"  skip war {war_id}: mode={mode}")
-            continue
         winner = payload.get("winner_lineup") or []
         loser = payload.get("loser_lineup") or []
         if not winner or not loser:
@@ -1,4 +1,4 @@
--- Durable War Bot tables (v1). Safe to re-run (IF NOT EXISTS).
+-- 0001: durable War Bot tables (v1). IF NOT EXISTS so pre-ledger databases adopt it cleanly.
 
 CREATE TABLE IF NOT EXISTS players (
   discord_id BIGINT PRIMARY KEY,
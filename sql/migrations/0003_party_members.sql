@@ -0,0 +1,29 @@
+-- 0003: normalized lineup membership for queue_parties, kept in sync by
+-- utils.queue_store.upsert_party (rows cascade away with the party).
+
+CREATE TABLE IF NOT EXISTS party_members (
+  party_id TEXT NOT NULL REFERENCES queue_parties (party_id) ON DELETE CASCADE,
+  discord_id BIGINT NOT NULL,
+  role TEXT,
+  ally BOOLEAN NOT NULL DEFAULT FALSE,
+  PRIMARY KEY (party_id, discord_id)
+);
+CREATE INDEX IF NOT EXISTS party_members_discord_idx ON party_members (discord_id);
+
+-- Backfill from existing lineups (discord_id may be stored as number or string).
+INSERT INTO party_members (party_id, discord_id, role, ally)
+SELECT DISTINCT ON (qp.party_id, member.discord_id)
+  qp.party_id,
+  member.discord_id,
+  member.role,
+  member.ally
+FROM queue_parties qp
+CROSS JOIN LATERAL (
+  SELECT
+    TRIM(BOTH '"' FROM (elem->'discord_id')::text)::bigint AS discord_id,
+    elem->>'role' AS role,
+    COALESCE((elem->>'ally')::boolean, FALSE) AS ally
+  FROM jsonb_array_elements(COALESCE(qp.data->'lineup', '[]'::jsonb)) AS elem
+  WHERE TRIM(BOTH '"' FROM (elem->'discord_id')::text) ~ '^[0-9]+$'
+) AS member
+ON CONFLICT (party_id, discord_id) DO NOTHING;
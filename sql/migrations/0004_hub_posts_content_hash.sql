@@ -0,0 +1,5 @@
+-- 0004: content hash per hub post. upsert_war() compares it with IS DISTINCT FROM
+-- and skips the write when a post has not changed. patch_war() refreshes it.
+-- Existing rows stay NULL and count as changed on their next upsert.
+
+ALTER TABLE hub_posts ADD COLUMN IF NOT EXISTS content_hash TEXT;
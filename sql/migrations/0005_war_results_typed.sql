@@ -0,0 +1,63 @@
+-- 0005: typed filter columns on war_results plus a per-player child table,
+-- both written by utils.war_results_store.append_result.
+
+ALTER TABLE war_results ADD COLUMN IF NOT EXISTS mode TEXT;
+ALTER TABLE war_results ADD COLUMN IF NOT EXISTS war_type TEXT;
+ALTER TABLE war_results ADD COLUMN IF NOT EXISTS board TEXT;
+ALTER TABLE war_results ADD COLUMN IF NOT EXISTS winner_guild_id BIGINT;
+ALTER TABLE war_results ADD COLUMN IF NOT EXISTS loser_guild_id BIGINT;
+ALTER TABLE war_results ADD COLUMN IF NOT EXISTS point_margin INT;
+
+UPDATE war_results SET
+  mode = LOWER(COALESCE(NULLIF(payload->>'mode', ''), 'ranked')),
+  war_type = UPPER(COALESCE(NULLIF(payload->>'war_type', ''), 'RT')),
+  board = payload->>'board',
+  winner_guild_id = CASE WHEN payload->>'winner_guild_id' ~ '^[0-9]+$'
+    THEN (payload->>'winner_guild_id')::bigint END,
+  loser_guild_id = CASE WHEN payload->>'loser_guild_id' ~ '^[0-9]+$'
+    THEN (payload->>'loser_guild_id')::bigint END,
+  point_margin = CASE WHEN payload->>'point_margin' ~ '^-?[0-9]+$'
+    THEN (payload->>'point_margin')::int END
+WHERE mode IS NULL;
+
+CREATE INDEX IF NOT EXISTS war_results_mode_type_idx
+  ON war_results (mode, war_type, completed_at);
+CREATE INDEX IF NOT EXISTS war_results_winner_guild_idx ON war_results (winner_guild_id);
+CREATE INDEX IF NOT EXISTS war_results_loser_guild_idx ON war_results (loser_guild_id);
+
+CREATE TABLE IF NOT EXISTS war_result_players (
+  result_id TEXT NOT NULL REFERENCES war_results (result_id) ON DELETE CASCADE,
+  discord_id BIGINT NOT NULL,
+  side TEXT NOT NULL,
+  role TEXT,
+  ally BOOLEAN NOT NULL DEFAULT FALSE,
+  score DOUBLE PRECISION,
+  PRIMARY KEY (result_id, discord_id)
+);
+CREATE INDEX IF NOT EXISTS war_result_players_discord_idx ON war_result_players (discord_id);
+
+INSERT INTO war_result_players (result_id, discord_id, side, role, ally, score)
+SELECT
+  wr.result_id,
+  player.discord_id,
+  player.side,
+  player.role,
+  player.ally,
+  CASE WHEN player.raw_score ~ '^-?[0-9]+(\.[0-9]+)?$' THEN player.raw_score::double precision END
+FROM war_results wr
+CROSS JOIN LATERAL (
+  SELECT
+    TRIM(BOTH '"' FROM (elem->'discord_id')::text)::bigint AS discord_id,
+    lineup.side,
+    elem->>'role' AS role,
+    COALESCE((elem->>'ally')::boolean, FALSE) AS ally,
+    COALESCE(
+      elem->>'score',
+      wr.payload->'player_scores'->>TRIM(BOTH '"' FROM (elem->'discord_id')::text)
+    ) AS raw_score
+  FROM (VALUES ('winner', 'winner_lineup'), ('loser', 'loser_lineup')) AS lineup(side, key)
+  CROSS JOIN LATERAL jsonb_array_elements(COALESCE(wr.payload->lineup.key, '[]'::jsonb)) AS elem
+  WHERE TRIM(BOTH '"' FROM (elem->'discord_id')::text) ~ '^[0-9]+$'
+) AS player
+WHERE wr.result_id IS NOT NULL
+ON CONFLICT (result_id, discord_id) DO NOTHING;
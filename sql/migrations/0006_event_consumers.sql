@@ -0,0 +1,8 @@
+-- 0006: durable event_bus read positions, one row per consumer, written in
+-- batches by the bot's event dispatcher (utils.event_dispatch).
+
+CREATE TABLE IF NOT EXISTS event_consumers (
+  name TEXT PRIMARY KEY,
+  last_id BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,4 @@
+-- 0007: optional routing audience per event (discord_ids / party_id /
+-- session_id / board), used by the API SSE hub. NULL means everyone.
+
+ALTER TABLE event_bus ADD COLUMN IF NOT EXISTS audience JSONB;
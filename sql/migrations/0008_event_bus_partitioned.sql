@@ -0,0 +1,27 @@
+-- 0008: event_bus becomes RANGE-partitioned on created_at (daily partitions,
+-- created ahead and dropped by utils.event_bus_retention). Existing rows stay
+-- where they are: the old table is attached as event_bus_legacy covering
+-- everything up to tomorrow (UTC), and is dropped like any other partition
+-- once retention passes it. event_bus_default only catches rows that arrive
+-- before their daily partition exists.
+
+ALTER TABLE event_bus RENAME TO event_bus_legacy;
+ALTER TABLE event_bus_legacy DROP CONSTRAINT IF EXISTS event_bus_pkey;
+DROP INDEX IF EXISTS event_bus_created_idx;
+ALTER SEQUENCE event_bus_id_seq OWNED BY NONE;
+
+CREATE TABLE event_bus (
+  id BIGINT NOT NULL DEFAULT nextval('event_bus_id_seq'),
+  event_type TEXT NOT NULL,
+  payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+  audience JSONB,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE event_bus_id_seq OWNED BY event_bus.id;
+
+ALTER TABLE event_bus ATTACH PARTITION event_bus_legacy
+  FOR VALUES FROM (MINVALUE) TO ((date_trunc('day', NOW() AT TIME ZONE 'UTC') + INTERVAL '1 day') AT TIME ZONE 'UTC');
+
+CREATE TABLE IF NOT EXISTS event_bus_default PARTITION OF event_bus DEFAULT;
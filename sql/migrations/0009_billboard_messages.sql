@@ -0,0 +1,16 @@
+-- 0009: which Discord message shows each hub post in each billboard channel,
+-- so a restart edits or deletes existing billboard messages instead of
+-- posting every open war again (cogs.post_war_billboard). content_hash is
+-- the hub post content the message was last rendered from.
+
+CREATE TABLE IF NOT EXISTS billboard_messages (
+  war_id TEXT NOT NULL,
+  channel_id BIGINT NOT NULL,
+  board TEXT NOT NULL,
+  message_id BIGINT NOT NULL,
+  content_hash TEXT,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (war_id, channel_id)
+);
+
+CREATE INDEX IF NOT EXISTS billboard_messages_board_idx ON billboard_messages (board);
@@ -0,0 +1,9 @@
+-- 0010: hub_posts.version, a number that moves on every change to a post
+-- (taken from one sequence, so it never repeats even across delete and
+-- re-create). Each change is also published as a hub_post event, and the
+-- billboard reconciles a board only when its versions moved.
+
+CREATE SEQUENCE IF NOT EXISTS hub_posts_version_seq;
+
+ALTER TABLE hub_posts
+  ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT nextval('hub_posts_version_seq');
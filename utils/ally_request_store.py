@@ -1,4 +1,4 @@
-"""Ally requests — Postgres ally_requests or temp/ally-requests.json."""
+"""Ally requests — Postgres ally_requests or the local store (utils.local_store)."""
 
 from __future__ import annotations
 
@@ -8,10 +8,13 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+from utils import local_store
 from utils.config import DATA_DIR
-from utils.db import get_conn, use_json_stores
+from utils.db import get_aconn, get_conn, use_json_stores
 
 ALLY_REQUESTS_PATH = os.path.join(DATA_DIR, "ally-requests.json")
+_LOCAL = "ally_requests"
+local_store.register_legacy_json(_LOCAL, ALLY_REQUESTS_PATH, "requests")
 
 
 def _parse(value: Any) -> Dict[str, Any]:
@@ -22,26 +25,9 @@ def _parse(value: Any) -> Dict[str, Any]:
     return {}
 
 
-def _load_all() -> Dict[str, Any]:
-    if not os.path.exists(ALLY_REQUESTS_PATH):
-        return {"requests": {}}
-    try:
-        with open(ALLY_REQUESTS_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if "requests" in data else {"requests": {}}
-    except json.JSONDecodeError:
-        return {"requests": {}}
-
-
-def _save_all(data: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(ALLY_REQUESTS_PATH), exist_ok=True)
-    with open(ALLY_REQUESTS_PATH, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, ensure_ascii=False)
-
-
 def _all_requests() -> Dict[str, Dict[str, Any]]:
     if use_json_stores():
-        return _load_all()["requests"]
+        return {str(doc["request_id"]): doc for doc in local_store.list_docs(_LOCAL)}
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
@@ -54,7 +40,7 @@ def _all_requests() -> Dict[str, Dict[str, Any]]:
 
 def get_ally_request(request_id: str) -> Optional[Dict[str, Any]]:
     if use_json_stores():
-        return _load_all()["requests"].get(request_id)
+        return local_store.get_doc(_LOCAL, request_id)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
@@ -68,11 +54,23 @@ def get_ally_request(request_id: str) -> Optional[Dict[str, Any]]:
     return _parse(row[0]) if row else None
 
 
+async def aget_ally_request(request_id: str) -> Optional[Dict[str, Any]]:
+    """get_ally_request() for async handlers."""
+    if use_json_stores():
+        return get_ally_request(request_id)
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "SELECT data FROM ally_requests WHERE request_id = %s",
+                (request_id,),
+            )
+            row = await cursor.fetchone()
+    return _parse(row[0]) if row else None
+
+
 def upsert_ally_request(request: Dict[str, Any]) -> Dict[str, Any]:
     if use_json_stores():
-        data = _load_all()
-        data["requests"][request["request_id"]] = request
-        _save_all(data)
+        local_store.put_doc(_LOCAL, request["request_id"], request)
         return request
     with get_conn() as conn:
         cursor = conn.cursor()
@@ -104,12 +102,7 @@ def upsert_ally_request(request: Dict[str, Any]) -> Dict[str, Any]:
 
 def delete_ally_request(request_id: str) -> bool:
     if use_json_stores():
-        data = _load_all()
-        if request_id not in data["requests"]:
-            return False
-        del data["requests"][request_id]
-        _save_all(data)
-        return True
+        return local_store.delete_doc(_LOCAL, request_id)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
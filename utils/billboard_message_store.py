@@ -0,0 +1,107 @@
+"""
+Billboard message index — Postgres billboard_messages or the local store.
+
+One row per (war_id, channel_id): the Discord message showing that hub post
+in that billboard channel and the content hash it was rendered from. The
+billboard cog loads it on startup to reconcile instead of reposting.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from utils import local_store
+from utils.db import get_conn, use_json_stores
+
+_LOCAL = "billboard_messages"
+
+
+def _key(war_id: str, channel_id: int) -> str:
+    return f"{war_id}:{int(channel_id)}"
+
+
+def load_board_messages(board: str) -> List[Dict[str, Any]]:
+    """Every indexed message for `board`: war_id, channel_id, message_id, content_hash."""
+    if use_json_stores():
+        return [doc for doc in local_store.list_docs(_LOCAL) if doc.get("board") == board]
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT war_id, channel_id, message_id, content_hash
+                FROM billboard_messages
+                WHERE board = %s
+                """,
+                (board,),
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    return [
+        {
+            "board": board,
+            "war_id": row[0],
+            "channel_id": int(row[1]),
+            "message_id": int(row[2]),
+            "content_hash": row[3],
+        }
+        for row in rows
+    ]
+
+
+def save_message(
+    board: str,
+    war_id: str,
+    channel_id: int,
+    message_id: int,
+    content_hash: Optional[str],
+) -> None:
+    if use_json_stores():
+        local_store.put_doc(
+            _LOCAL,
+            _key(war_id, channel_id),
+            {
+                "board": board,
+                "war_id": war_id,
+                "channel_id": int(channel_id),
+                "message_id": int(message_id),
+                "content_hash": content_hash,
+            },
+        )
+        return
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                INSERT INTO billboard_messages
+                  (war_id, channel_id, board, message_id, content_hash, updated_at)
+                VALUES (%s, %s, %s, %s, %s, NOW())
+                ON CONFLICT (war_id, channel_id) DO UPDATE SET
+                  board = EXCLUDED.board,
+                  message_id = EXCLUDED.message_id,
+                  content_hash = EXCLUDED.content_hash,
+                  updated_at = NOW()
+                WHERE billboard_messages.message_id IS DISTINCT FROM EXCLUDED.message_id
+                   OR billboard_messages.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                """,
+                (war_id, int(channel_id), board, int(message_id), content_hash),
+            )
+        finally:
+            cursor.close()
+
+
+def delete_message(war_id: str, channel_id: int) -> bool:
+    if use_json_stores():
+        return local_store.delete_doc(_LOCAL, _key(war_id, channel_id))
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "DELETE FROM billboard_messages WHERE war_id = %s AND channel_id = %s",
+                (war_id, int(channel_id)),
+            )
+            return cursor.rowcount > 0
+        finally:
+            cursor.close()
@@ -1,14 +1,21 @@
-"""Hub billboard posts — Postgres hub_posts or temp/billboard-data JSON files."""
+"""
+Hub billboard posts — Postgres hub_posts or temp/billboard-data JSON files.
+
+Every write that changes a post bumps its `version` and publishes a
+`hub_post` event ({action: upsert|delete, board, war_id, version}), which the
+billboard cog turns into edits of just that war's messages.
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 from typing import Any, Dict, List, Optional
 
 from utils.boards import ALL_BOARD_KEYS, board_key as make_board_key
 from utils.config import DATA_DIR
-from utils.db import get_conn, use_json_stores
+from utils.db import PatchKey, apply_patch, get_aconn, get_conn, jsonb_patch, use_json_stores
 
 BILLBOARD_DIR = os.path.join(DATA_DIR, "billboard-data")
 
@@ -51,7 +58,10 @@ def load_wars(board: str) -> List[Dict[str, Any]]:
             return [_parse(r[0]) for r in rows]
         except Exception as exc:
             print(f"⚠️ hub_posts load failed, falling back to JSON: {exc}")
+    return _load_wars_file(board)
+
 
+def _load_wars_file(board: str) -> List[Dict[str, Any]]:
     path = billboard_path(board)
     if not os.path.exists(path):
         legacy = _legacy_path(board)
@@ -72,48 +82,62 @@ def load_wars(board: str) -> List[Dict[str, Any]]:
         return []
 
 
-def save_wars(board: str, wars: List[Dict[str, Any]]) -> None:
+async def aload_wars(board: str) -> List[Dict[str, Any]]:
+    """load_wars() for async handlers; JSON fallback reads the board file."""
+    if not use_json_stores():
+        try:
+            async with get_aconn() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT data FROM hub_posts WHERE board = %s", (board,))
+                    rows = await cursor.fetchall()
+            return [_parse(r[0]) for r in rows]
+        except Exception as exc:
+            print(f"⚠️ hub_posts load failed, falling back to JSON: {exc}")
+    return _load_wars_file(board)
+
+
+def list_war_versions(board: str) -> Dict[str, str]:
+    """war_id → version for every post on `board` (content hash for JSON stores)."""
     if not use_json_stores():
         try:
             with get_conn() as conn:
                 cursor = conn.cursor()
                 try:
-                    cursor.execute("DELETE FROM hub_posts WHERE board = %s", (board,))
-                    for war in wars:
-                        cursor.execute(
-                            """
-                            INSERT INTO hub_posts (
-                              war_id, board, party_id, author_id, search_mode, status, data, updated_at
-                            ) VALUES (%s, %s, %s, %s, %s, %s, %s::jsonb, NOW())
-                            ON CONFLICT (war_id) DO UPDATE SET
-                              board = EXCLUDED.board,
-                              party_id = EXCLUDED.party_id,
-                              author_id = EXCLUDED.author_id,
-                              search_mode = EXCLUDED.search_mode,
-                              status = EXCLUDED.status,
-                              data = EXCLUDED.data,
-                              updated_at = NOW()
-                            """,
-                            (
-                                war.get("war_id"),
-                                board,
-                                war.get("party_id"),
-                                war.get("author_discord_id"),
-                                war.get("search_mode") or war.get("looking_for"),
-                                war.get("status", "open"),
-                                json.dumps(war),
-                            ),
-                        )
+                    cursor.execute(
+                        "SELECT war_id, version FROM hub_posts WHERE board = %s",
+                        (board,),
+                    )
+                    rows = cursor.fetchall()
                 finally:
                     cursor.close()
-            return
+            return {str(row[0]): str(row[1]) for row in rows}
         except Exception as exc:
-            print(f"⚠️ hub_posts save failed, writing JSON: {exc}")
+            print(f"⚠️ hub_posts version load failed, falling back to JSON: {exc}")
+    return {str(war.get("war_id")): war_content_hash(war) for war in _load_wars_file(board)}
+
+
+def _publish_hub_change(board: str, war_id: Any, action: str, version: Any = None) -> None:
+    from utils.event_bus import event_audience, publish_event
+
+    publish_event(
+        "hub_post",
+        {
+            "action": action,
+            "board": board,
+            "war_id": str(war_id),
+            "version": int(version) if version is not None else None,
+        },
+        audience=event_audience(board=board),
+    )
 
-    path = billboard_path(board)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as handle:
-        json.dump(wars, handle, indent=2, ensure_ascii=False)
+
+def war_content_hash(war: Dict[str, Any]) -> str:
+    """
+    Stable digest of a post's payload for the JSON fallback. Postgres keeps
+    its own `content_hash = md5(data::text)` (jsonb text is canonical).
+    """
+    encoded = json.dumps(war, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
 
 
 def find_war(board: str, war_id: str) -> Optional[Dict[str, Any]]:
@@ -146,8 +170,11 @@ def upsert_war(board: str, war: Dict[str, Any]) -> None:
                     cursor.execute(
                         """
                         INSERT INTO hub_posts (
-                          war_id, board, party_id, author_id, search_mode, status, data, updated_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s::jsonb, NOW())
+                          war_id, board, party_id, author_id, search_mode, status, data,
+                          content_hash, updated_at
+                        )
+                        SELECT %s, %s, %s, %s, %s, %s, doc.data, md5(doc.data::text), NOW()
+                        FROM (SELECT %s::jsonb AS data) AS doc
                         ON CONFLICT (war_id) DO UPDATE SET
                           board = EXCLUDED.board,
                           party_id = EXCLUDED.party_id,
@@ -155,7 +182,12 @@ def upsert_war(board: str, war: Dict[str, Any]) -> None:
                           search_mode = EXCLUDED.search_mode,
                           status = EXCLUDED.status,
                           data = EXCLUDED.data,
+                          content_hash = EXCLUDED.content_hash,
+                          version = nextval('hub_posts_version_seq'),
                           updated_at = NOW()
+                        WHERE hub_posts.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                           OR hub_posts.board IS DISTINCT FROM EXCLUDED.board
+                        RETURNING version
                         """,
                         (
                             war.get("war_id"),
@@ -167,8 +199,11 @@ def upsert_war(board: str, war: Dict[str, Any]) -> None:
                             json.dumps(war),
                         ),
                     )
+                    row = cursor.fetchone()
                 finally:
                     cursor.close()
+            if row:
+                _publish_hub_change(board, war.get("war_id"), "upsert", row[0])
             return
         except Exception as exc:
             print(f"⚠️ hub_posts upsert failed: {exc}")
@@ -190,6 +225,72 @@ def upsert_war(board: str, war: Dict[str, Any]) -> None:
         json.dump(wars, handle, indent=2, ensure_ascii=False)
 
 
+# Columns mirrored out of `data`: column -> source keys (first present wins).
+_WAR_COLUMNS = {
+    "party_id": ("party_id",),
+    "author_id": ("author_discord_id",),
+    "search_mode": ("search_mode", "looking_for"),
+    "status": ("status",),
+}
+
+
+def patch_war(board: str, war_id: str, changes: Dict[PatchKey, Any]) -> bool:
+    """
+    Update only the given fields of a stored post (see utils.db.jsonb_patch)
+    and refresh its content_hash. Returns False if the post is gone.
+    """
+    if not use_json_stores():
+        try:
+            expr, params = jsonb_patch("data", changes)
+            columns: List[tuple[str, Any]] = []
+            for column, keys in _WAR_COLUMNS.items():
+                key = next((key for key in keys if key in changes), None)
+                if key is not None:
+                    columns.append((column, changes[key]))
+            assignments = "".join(f", {column} = %s" for column, _ in columns)
+            with get_conn() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(
+                        f"""
+                        WITH patched AS (
+                          SELECT war_id, {expr} AS data
+                          FROM hub_posts WHERE board = %s AND war_id = %s
+                        )
+                        UPDATE hub_posts hp SET
+                          data = patched.data,
+                          content_hash = md5(patched.data::text),
+                          version = nextval('hub_posts_version_seq'){assignments},
+                          updated_at = NOW()
+                        FROM patched
+                        WHERE hp.war_id = patched.war_id
+                        RETURNING hp.version
+                        """,
+                        (*params, board, war_id, *(value for _, value in columns)),
+                    )
+                    row = cursor.fetchone()
+                finally:
+                    cursor.close()
+            if row:
+                _publish_hub_change(board, war_id, "upsert", row[0])
+            return row is not None
+        except Exception as exc:
+            print(f"⚠️ hub_posts patch failed: {exc}")
+
+    wars = _load_wars_file(board)
+    for war in wars:
+        if war.get("war_id") == war_id:
+            apply_patch(war, changes)
+            break
+    else:
+        return False
+    path = billboard_path(board)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(wars, handle, indent=2, ensure_ascii=False)
+    return True
+
+
 def delete_war(board: str, war_id: str) -> bool:
     if not use_json_stores():
         try:
@@ -200,9 +301,12 @@ def delete_war(board: str, war_id: str) -> bool:
                         "DELETE FROM hub_posts WHERE board = %s AND war_id = %s",
                         (board, war_id),
                     )
-                    return cursor.rowcount > 0
+                    deleted = cursor.rowcount > 0
                 finally:
                     cursor.close()
+            if deleted:
+                _publish_hub_change(board, war_id, "delete")
+            return deleted
         except Exception:
             pass
 
@@ -233,5 +337,37 @@ def find_war_across_boards(war_id: str) -> Optional[tuple[str, Dict[str, Any]]]:
     return None
 
 
+async def _afind_post_where(column: str, value: str) -> Optional[tuple[str, Dict[str, Any]]]:
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                f"SELECT board, data FROM hub_posts WHERE {column} = %s LIMIT 1",
+                (value,),
+            )
+            row = await cursor.fetchone()
+    return (row[0], _parse(row[1])) if row else None
+
+
+async def afind_post_by_party_id(party_id: str) -> Optional[tuple[str, Dict[str, Any]]]:
+    """Indexed hub_posts lookup by party_id (no per-board scan)."""
+    if use_json_stores():
+        return find_post_by_party_id(party_id)
+    return await _afind_post_where("party_id", str(party_id))
+
+
+async def afind_war_across_boards(war_id: str) -> Optional[tuple[str, Dict[str, Any]]]:
+    """Primary-key hub_posts lookup for async handlers."""
+    if use_json_stores():
+        return find_war_across_boards(war_id)
+    return await _afind_post_where("war_id", str(war_id))
+
+
+async def afind_war(board: str, war_id: str) -> Optional[Dict[str, Any]]:
+    found = await afind_war_across_boards(war_id)
+    if not found or found[0] != board:
+        return None
+    return found[1]
+
+
 def board_for_war(war_type: str, mode: str) -> str:
     return make_board_key(war_type, mode)
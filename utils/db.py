@@ -2,30 +2,41 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
 import ssl
 import threading
-from contextlib import contextmanager
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from queue import Empty, Full, Queue
-from typing import Any, Generator, Optional
-from urllib.parse import unquote, urlparse
+from typing import Any, AsyncIterator, Callable, Dict, Generator, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, unquote, urlencode, urlparse, urlunparse
 
 from utils.config import DEV, PROJECT_ENV
+from utils.db_metrics import record_statement
 
 _connector = None
 _connector_lock = threading.Lock()
 _initialized = False
 _use_json = False
-_pool: Queue = Queue(maxsize=10)
 _using_database_url = False
+_apool = None
+_apool_loop: Optional[asyncio.AbstractEventLoop] = None
+# Guards the first open per loop (an asyncio.Lock belongs to one loop).
+_apool_lock: Optional[asyncio.Lock] = None
+_apool_lock_loop: Optional[asyncio.AbstractEventLoop] = None
 
-SCHEMA_PATH = Path(__file__).resolve().parent.parent / "sql" / "schema.sql"
-SCHEMA_V2_PATH = Path(__file__).resolve().parent.parent / "sql" / "schema_v2.sql"
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "sql" / "migrations"
+# Serializes concurrent runners (bot + API cold-starting together).
+_MIGRATION_LOCK_KEY = 0x5741525F424F54
 
 
 def use_json_stores() -> bool:
-    """True when durable stores should keep using temp/*.json."""
+    """True when durable stores should use the local store instead of Postgres."""
     if os.getenv("USE_JSON_STORES", "").strip() in ("1", "true", "True", "yes"):
         return True
     return _use_json or not _initialized
@@ -138,38 +149,400 @@ def _connect():
     )
 
 
-def _acquire_conn():
+def _env_float(key: str, default: float) -> float:
     try:
-        return _pool.get_nowait()
-    except Empty:
-        return _connect()
+        return float(os.getenv(key, "").strip() or default)
+    except ValueError:
+        return default
 
 
-def _release_conn(conn: Any, *, discard: bool = False) -> None:
-    if discard:
+class PoolTimeoutError(RuntimeError):
+    """No pooled connection became free within DB_POOL_ACQUIRE_TIMEOUT."""
+
+
+class _PooledConn:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn: Any):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class _ConnectionPool:
+    """
+    Bounded pg8000 pool shared by every thread in the process.
+
+    - never more than `max_size` open connections; extra callers wait up to
+      `acquire_timeout` seconds, then get PoolTimeoutError
+    - connections idle longer than `validate_idle` get a `SELECT 1` on checkout
+    - connections older than `max_lifetime` or idle past `idle_timeout` are
+      closed instead of reused (pooler restarts leave dead sockets behind)
+    - `warm()` keeps `min_idle` connections open after init_db()
+    """
+
+    def __init__(self) -> None:
+        self.max_size = max(1, int(_env_float("DB_POOL_MAX_SIZE", 10)))
+        self.min_idle = max(0, min(self.max_size, int(_env_float("DB_POOL_MIN_IDLE", 2))))
+        self.acquire_timeout = _env_float("DB_POOL_ACQUIRE_TIMEOUT", 10.0)
+        self.max_lifetime = _env_float("DB_POOL_MAX_LIFETIME", 1800.0)
+        self.idle_timeout = _env_float("DB_POOL_IDLE_TIMEOUT", 300.0)
+        self.validate_idle = _env_float("DB_POOL_VALIDATE_IDLE", 10.0)
+        self._cond = threading.Condition()
+        self._idle: deque[_PooledConn] = deque()
+        self._in_use: dict[int, _PooledConn] = {}
+        self._opening = 0
+        self._stats = {
+            "waits": 0,
+            "wait_time_ms": 0.0,
+            "timeouts": 0,
+            "connects": 0,
+            "connect_failures": 0,
+            "discards": 0,
+            "validation_failures": 0,
+        }
+
+    def _size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _expired(self, entry: _PooledConn, now: float) -> bool:
+        if self.max_lifetime > 0 and now - entry.created_at >= self.max_lifetime:
+            return True
+        return self.idle_timeout > 0 and now - entry.last_used >= self.idle_timeout
+
+    @staticmethod
+    def _close(conn: Any) -> None:
         try:
             conn.close()
         except Exception:
             pass
-        return
-    try:
-        _pool.put_nowait(conn)
-    except Full:
+
+    def _open(self) -> _PooledConn:
         try:
-            conn.close()
+            entry = _PooledConn(_connect())
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._stats["connect_failures"] += 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opening -= 1
+            self._stats["connects"] += 1
+        return entry
+
+    @staticmethod
+    def _is_alive(conn: Any) -> bool:
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self) -> Any:
+        deadline = time.monotonic() + self.acquire_timeout
+        waited_since: Optional[float] = None
+        while True:
+            stale: list[_PooledConn] = []
+            entry: Optional[_PooledConn] = None
+            must_open = False
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    while self._idle:
+                        candidate = self._idle.pop()
+                        if self._expired(candidate, now):
+                            stale.append(candidate)
+                            continue
+                        entry = candidate
+                        break
+                    if entry is not None:
+                        break
+                    if self._size() < self.max_size:
+                        self._opening += 1
+                        must_open = True
+                        break
+                    remaining = deadline - now
+                    if waited_since is None:
+                        waited_since = now
+                        self._stats["waits"] += 1
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        self._stats["discards"] += len(stale)
+                        for old in stale:
+                            self._close(old.conn)
+                        raise PoolTimeoutError(
+                            f"No Postgres connection free after {self.acquire_timeout:.1f}s "
+                            f"(max {self.max_size} in use)."
+                        )
+                    self._cond.wait(remaining)
+                if waited_since is not None:
+                    self._stats["wait_time_ms"] += (time.monotonic() - waited_since) * 1000.0
+                    waited_since = None
+                self._stats["discards"] += len(stale)
+            for old in stale:
+                self._close(old.conn)
+
+            if must_open:
+                entry = self._open()
+            elif time.monotonic() - entry.last_used >= self.validate_idle and not self._is_alive(entry.conn):
+                self._close(entry.conn)
+                with self._cond:
+                    self._stats["discards"] += 1
+                    self._stats["validation_failures"] += 1
+                    self._cond.notify()
+                continue
+
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+            return entry.conn
+
+    def release(self, conn: Any, *, discard: bool = False) -> None:
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+            now = time.monotonic()
+            if entry is None:
+                entry = _PooledConn(conn)
+            entry.last_used = now
+            if discard or self._expired(entry, now) or self._size() >= self.max_size:
+                self._stats["discards"] += 1
+                keep = False
+            else:
+                self._idle.append(entry)
+                keep = True
+            self._cond.notify()
+        if not keep:
+            self._close(conn)
+
+    def warm(self) -> None:
+        """Open connections until `min_idle` are parked (best effort)."""
+        while True:
+            with self._cond:
+                if len(self._idle) >= self.min_idle or self._size() >= self.max_size:
+                    return
+                self._opening += 1
+            try:
+                entry = self._open()
+            except Exception as exc:
+                print(f"⚠️ Postgres pool warmup stopped: {exc}")
+                return
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def close_all(self) -> None:
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._close(entry.conn)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "min_idle": self.min_idle,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "opening": self._opening,
+                **{key: round(value, 1) if isinstance(value, float) else value for key, value in self._stats.items()},
+            }
+
+
+_pool = _ConnectionPool()
+
+
+def _acquire_conn():
+    return _pool.acquire()
+
+
+def _release_conn(conn: Any, *, discard: bool = False) -> None:
+    _pool.release(conn, discard=discard)
+
+
+def pool_stats() -> dict[str, Any]:
+    """Runtime counters for the sync pool (and the asyncio pool, if open)."""
+    stats: dict[str, Any] = {"sync": _pool.stats()}
+    if _apool is not None:
+        try:
+            stats["async"] = _apool.get_stats()
         except Exception:
             pass
+    return stats
+
+
+class UnitOfWork:
+    """One connection + one transaction shared by every get_conn() in the block."""
+
+    def __init__(self, conn: Any = None):
+        self.conn = conn
+        self.failed = False
+        # Events queued by utils.event_bus; written by a before_commit hook.
+        self.outbox: list = []
+        self.before_commit: list[Callable[["UnitOfWork"], None]] = []
+
+
+_current_uow: ContextVar[Optional[UnitOfWork]] = ContextVar("db_unit_of_work", default=None)
+
+
+@contextmanager
+def unit_of_work() -> Generator[UnitOfWork, None, None]:
+    """
+    Make every store call inside the block join a single transaction.
+
+    Nested blocks join the outer unit. If any joined statement failed (even
+    one a store swallowed), the whole unit rolls back and raises. Events
+    published inside the unit ride in its outbox and are written just before
+    the commit. JSON-store mode runs the block in one local-store (SQLite)
+    transaction instead.
+    """
+    outer = _current_uow.get()
+    if outer is not None:
+        yield outer
+        return
+    if use_json_stores():
+        from utils.local_store import transaction
+
+        uow = UnitOfWork()
+        token = _current_uow.set(uow)
+        try:
+            with transaction():
+                yield uow
+        finally:
+            _current_uow.reset(token)
+        return
+    with get_conn() as conn:
+        uow = UnitOfWork(conn)
+        token = _current_uow.set(uow)
+        try:
+            yield uow
+            if uow.failed:
+                raise RuntimeError("unit_of_work rolled back: a statement inside it failed.")
+            for hook in uow.before_commit:
+                hook(uow)
+        finally:
+            _current_uow.reset(token)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """The unit_of_work() the caller is inside, if any."""
+    return _current_uow.get()
+
+
+def multi_values(row_template: str, count: int) -> str:
+    """`(%s, %s), (%s, %s), ...` for one multi-row VALUES statement."""
+    return ", ".join([row_template] * count)
+
+
+PatchKey = Union[str, Tuple[Union[str, int], ...]]
+
+
+def jsonb_patch(column: str, changes: Dict[PatchKey, Any]) -> Tuple[str, List[Any]]:
+    """
+    SQL expression + params that apply `changes` to a jsonb column.
+
+    String keys are top-level fields merged with `||`; tuple keys are paths
+    written with jsonb_set (e.g. ("lineup", 2, "role")). As with jsonb_set,
+    a path whose parent does not exist is skipped.
+    """
+    top = {key: value for key, value in changes.items() if isinstance(key, str)}
+    expr = column
+    params: List[Any] = []
+    if top:
+        expr = f"{expr} || %s::jsonb"
+        params.append(json.dumps(top))
+    for key, value in changes.items():
+        if isinstance(key, tuple):
+            expr = f"jsonb_set({expr}, %s::text[], %s::jsonb, true)"
+            params.extend([[str(part) for part in key], json.dumps(value)])
+    return expr, params
+
+
+def apply_patch(doc: Dict[str, Any], changes: Dict[PatchKey, Any]) -> Dict[str, Any]:
+    """Python twin of jsonb_patch() for JSON-store mode; mutates and returns `doc`."""
+    for key, value in changes.items():
+        if isinstance(key, str):
+            doc[key] = value
+            continue
+        target: Any = doc
+        try:
+            for part in key[:-1]:
+                target = target[int(part)] if isinstance(target, list) else target[part]
+            if isinstance(target, list):
+                target[int(key[-1])] = value
+            elif isinstance(target, dict):
+                target[key[-1]] = value
+        except (IndexError, KeyError, TypeError, ValueError):
+            continue
+    return doc
+
+
+class _TimedCursor:
+    """pg8000 cursor proxy that reports every statement to utils.db_metrics."""
+
+    def __init__(self, cursor: Any):
+        self._cursor = cursor
+
+    def execute(self, sql: str, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, *args, **kwargs)
+        finally:
+            record_statement(sql, time.perf_counter() - started)
+
+    def executemany(self, sql: str, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, *args, **kwargs)
+        finally:
+            record_statement(sql, time.perf_counter() - started)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class _TimedConnection:
+    """Connection proxy whose cursors are timed; everything else passes through."""
+
+    def __init__(self, conn: Any):
+        self._conn = conn
+
+    def cursor(self) -> _TimedCursor:
+        return _TimedCursor(self._conn.cursor())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
 
 
 @contextmanager
 def get_conn() -> Generator[Any, None, None]:
-    """Yield a live pg8000 connection; commit on success, rollback on error."""
+    """
+    Yield a live pg8000 connection; commit on success, rollback on error.
+    Inside unit_of_work() this is the unit's connection and nothing commits
+    until the unit exits.
+    """
     if use_json_stores():
         raise RuntimeError("Database is not initialized (JSON stores active).")
+    uow = _current_uow.get()
+    if uow is not None and uow.conn is not None:
+        try:
+            yield uow.conn
+        except Exception:
+            uow.failed = True
+            raise
+        return
     conn = _acquire_conn()
     discard = False
     try:
-        yield conn
+        yield _TimedConnection(conn)
         conn.commit()
     except Exception:
         discard = True
@@ -182,6 +555,218 @@ def get_conn() -> Generator[Any, None, None]:
         _release_conn(conn, discard=discard)
 
 
+def _async_conninfo(url: str) -> str:
+    """libpq conninfo for the asyncio pool; Supabase / Neon still need TLS."""
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+    host_l = (parsed.hostname or "").lower()
+    if "sslmode" not in query and host_l not in ("", "localhost", "127.0.0.1"):
+        query["sslmode"] = "require"
+    scheme = "postgresql" if parsed.scheme in ("postgres", "postgresql") else parsed.scheme
+    return urlunparse(parsed._replace(scheme=scheme, query=urlencode(query)))
+
+
+async def _close_stale_apool(pool: Any, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Close a pool opened on a previous event loop (on that loop while it still runs)."""
+    try:
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(pool.close(), loop))
+        else:
+            await pool.close()
+    except Exception as exc:
+        print(f"⚠️ Could not close previous async DB pool: {exc}")
+
+
+async def _get_apool():
+    """Lazily open one psycopg AsyncConnectionPool per event loop (bot or API)."""
+    global _apool, _apool_loop, _apool_lock, _apool_lock_loop
+    loop = asyncio.get_running_loop()
+    if _apool is not None and _apool_loop is loop:
+        return _apool
+    if _apool_lock is None or _apool_lock_loop is not loop:
+        _apool_lock, _apool_lock_loop = asyncio.Lock(), loop
+    async with _apool_lock:
+        # Another coroutine may have opened it while this one waited.
+        if _apool is not None and _apool_loop is loop:
+            return _apool
+        stale, stale_loop = _apool, _apool_loop
+        _apool, _apool_loop = None, None
+        if stale is not None:
+            await _close_stale_apool(stale, stale_loop)
+        pool = await _open_apool()
+        _apool, _apool_loop = pool, loop
+        return pool
+
+
+async def _open_apool():
+    from psycopg_pool import AsyncConnectionPool
+
+    pool = AsyncConnectionPool(
+        _async_conninfo(_database_url()),
+        min_size=max(1, _pool.min_idle),
+        max_size=max(1, int(_env_float("DB_ASYNC_POOL_SIZE", 20))),
+        kwargs={"connect_timeout": 30},
+        timeout=_pool.acquire_timeout,
+        max_lifetime=_pool.max_lifetime,
+        max_idle=_pool.idle_timeout,
+        check=AsyncConnectionPool.check_connection,
+        open=False,
+    )
+    await pool.open()
+    return pool
+
+
+class _ThreadedCursor:
+    """Async facade over a pg8000 cursor; each call runs in a worker thread."""
+
+    def __init__(self, cursor: Any):
+        self._cursor = cursor
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    async def execute(self, sql: str, params: Any = None) -> "_ThreadedCursor":
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._cursor.execute, sql, params)
+        finally:
+            record_statement(sql, time.perf_counter() - started)
+        return self
+
+    async def executemany(self, sql: str, params_seq: Any) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._cursor.executemany, sql, params_seq)
+        finally:
+            record_statement(sql, time.perf_counter() - started)
+
+    async def fetchone(self) -> Any:
+        return await asyncio.to_thread(self._cursor.fetchone)
+
+    async def fetchall(self) -> Any:
+        return await asyncio.to_thread(self._cursor.fetchall)
+
+    async def __aenter__(self) -> "_ThreadedCursor":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self._cursor.close()
+
+
+class _ThreadedAsyncConnection:
+    """psycopg-shaped async connection for Cloud SQL connector (pg8000) mode."""
+
+    def __init__(self, conn: Any):
+        self._conn = conn
+
+    def cursor(self) -> _ThreadedCursor:
+        return _ThreadedCursor(self._conn.cursor())
+
+    async def commit(self) -> None:
+        await asyncio.to_thread(self._conn.commit)
+
+    async def rollback(self) -> None:
+        await asyncio.to_thread(self._conn.rollback)
+
+
+class _TimedAsyncCursor:
+    """psycopg AsyncCursor proxy that reports every statement to utils.db_metrics."""
+
+    def __init__(self, cursor: Any):
+        self._cursor = cursor
+
+    async def execute(self, sql: str, *args: Any, **kwargs: Any) -> "_TimedAsyncCursor":
+        started = time.perf_counter()
+        try:
+            await self._cursor.execute(sql, *args, **kwargs)
+        finally:
+            record_statement(sql, time.perf_counter() - started)
+        return self
+
+    async def executemany(self, sql: str, *args: Any, **kwargs: Any) -> None:
+        started = time.perf_counter()
+        try:
+            await self._cursor.executemany(sql, *args, **kwargs)
+        finally:
+            record_statement(sql, time.perf_counter() - started)
+
+    async def __aenter__(self) -> "_TimedAsyncCursor":
+        await self._cursor.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self._cursor.__aexit__(*exc)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class _TimedAsyncConnection:
+    """psycopg AsyncConnection proxy whose cursors are timed."""
+
+    def __init__(self, aconn: Any):
+        self._aconn = aconn
+
+    def cursor(self) -> _TimedAsyncCursor:
+        return _TimedAsyncCursor(self._aconn.cursor())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._aconn, name)
+
+
+@asynccontextmanager
+async def get_aconn() -> AsyncIterator[Any]:
+    """
+    Async twin of get_conn(): commit on success, rollback on error.
+
+    DATABASE_URL deployments get a psycopg AsyncConnection from an asyncio
+    pool, so waits never block the event loop. The Cloud SQL connector only
+    speaks pg8000 here, so that path runs the sync pool in worker threads.
+    Both expose `async with conn.cursor() as cur: await cur.execute(...)`.
+    """
+    if use_json_stores():
+        raise RuntimeError("Database is not initialized (JSON stores active).")
+    if _using_database_url:
+        pool = await _get_apool()
+        async with pool.connection() as aconn:
+            yield _TimedAsyncConnection(aconn)
+        return
+
+    conn = await asyncio.to_thread(_acquire_conn)
+    discard = False
+    try:
+        yield _ThreadedAsyncConnection(conn)
+        await asyncio.to_thread(conn.commit)
+    except Exception:
+        discard = True
+        try:
+            await asyncio.to_thread(conn.rollback)
+        except Exception:
+            pass
+        raise
+    finally:
+        _release_conn(conn, discard=discard)
+
+
+def supports_listen() -> bool:
+    """LISTEN needs a long-lived psycopg connection (DATABASE_URL mode only)."""
+    return not use_json_stores() and _using_database_url
+
+
+async def aconnect_listener() -> Any:
+    """Dedicated autocommit psycopg connection for LISTEN; the caller closes it."""
+    if not supports_listen():
+        raise RuntimeError("LISTEN is only available with DATABASE_URL.")
+    import psycopg
+
+    return await psycopg.AsyncConnection.connect(
+        _async_conninfo(_database_url()),
+        autocommit=True,
+        connect_timeout=30,
+    )
+
+
 def _split_sql(sql: str) -> list[str]:
     """Split schema files on semicolons outside dollar-quotes (simple)."""
     parts: list[str] = []
@@ -210,33 +795,109 @@ def _split_sql(sql: str) -> list[str]:
     return parts
 
 
-def apply_schema(conn: Optional[Any] = None) -> None:
-    statements = [
-        SCHEMA_PATH.read_text(encoding="utf-8"),
-        SCHEMA_V2_PATH.read_text(encoding="utf-8") if SCHEMA_V2_PATH.exists() else "",
-    ]
-    sql = "\n".join(s for s in statements if s.strip())
-    chunks = _split_sql(sql)
+def migration_files() -> list[tuple[int, str, Path]]:
+    """`(version, name, path)` for sql/migrations/NNNN_name.sql, in order."""
+    found: list[tuple[int, str, Path]] = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        prefix, _, name = path.stem.partition("_")
+        if prefix.isdigit():
+            found.append((int(prefix), name or path.stem, path))
+    return sorted(found)
+
+
+def migration_checksum(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def schema_version(conn: Any) -> int:
+    """Highest applied migration; 0 for a database that predates the ledger."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+        row = cursor.fetchone()
+        return int(row[0]) if row else 0
+    except Exception:
+        conn.rollback()
+        return 0
+    finally:
+        cursor.close()
+
+
+def applied_migrations(conn: Any) -> dict[int, tuple[str, str]]:
+    """version -> (name, checksum) from the ledger."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT version, name, checksum FROM schema_migrations")
+        return {int(row[0]): (row[1], row[2]) for row in cursor.fetchall()}
+    except Exception:
+        conn.rollback()
+        return {}
+    finally:
+        cursor.close()
+
 
-    def _run(target: Any) -> None:
-        cursor = target.cursor()
+def apply_migrations(conn: Optional[Any] = None) -> list[int]:
+    """
+    Apply pending sql/migrations in order, one transaction each, under a
+    session advisory lock. Returns the versions applied (empty when current).
+    """
+    if conn is None:
+        owned = _acquire_conn()
+        discard = False
         try:
-            for chunk in chunks:
-                cursor.execute(chunk)
+            return apply_migrations(owned)
+        except Exception:
+            discard = True
+            raise
         finally:
-            cursor.close()
+            _release_conn(owned, discard=discard)
 
-    if conn is not None:
-        _run(conn)
-        return
-
-    with get_conn() as owned:
-        _run(owned)
+    applied: list[int] = []
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (_MIGRATION_LOCK_KEY,))
+        try:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                  version INT PRIMARY KEY,
+                  name TEXT NOT NULL,
+                  checksum TEXT NOT NULL,
+                  applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                )
+                """
+            )
+            conn.commit()
+            # Re-read under the lock: another process may have just migrated.
+            current = schema_version(conn)
+            for version, name, path in migration_files():
+                if version <= current:
+                    continue
+                try:
+                    for chunk in _split_sql(path.read_text(encoding="utf-8")):
+                        cursor.execute(chunk)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                        (version, name, migration_checksum(path)),
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                applied.append(version)
+                print(f"🗄️ Applied migration {version:04d}_{name}")
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_MIGRATION_LOCK_KEY,))
+            conn.commit()
+    finally:
+        cursor.close()
+    return applied
 
 
 def init_db() -> None:
     """
-    Connect to Postgres (DATABASE_URL or Cloud SQL) and ensure schema exists.
+    Connect to Postgres (DATABASE_URL or Cloud SQL) and check the migration
+    ledger; pending sql/migrations run unless DB_AUTO_MIGRATE=0.
     Prod: fail loud if unreachable.
     Local: USE_JSON_STORES=1 skips DB; otherwise connection errors fall back to JSON.
     """
@@ -245,52 +906,41 @@ def init_db() -> None:
     if os.getenv("USE_JSON_STORES", "").strip() in ("1", "true", "True", "yes"):
         _use_json = True
         _initialized = False
-        print("USE_JSON_STORES=1 — durable stores stay on temp/*.json.")
+        print("USE_JSON_STORES=1 — durable stores use the local SQLite store.")
         return
 
     try:
-        conn = _connect()
+        conn = _acquire_conn()
         try:
-            apply_schema(conn)
-            conn.commit()
-            cursor = conn.cursor()
-            try:
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
-            finally:
-                cursor.close()
+            # One round trip on a current database; DDL only when behind.
+            latest = max((version for version, _, _ in migration_files()), default=0)
+            if schema_version(conn) < latest:
+                if os.getenv("DB_AUTO_MIGRATE", "1").strip() in ("0", "false", "False", "no"):
+                    print("⚠️ Database schema is behind; run scripts/migrate_schema.py.")
+                else:
+                    apply_migrations(conn)
             _release_conn(conn)
         except Exception:
-            try:
-                conn.close()
-            except Exception:
-                pass
+            _release_conn(conn, discard=True)
             raise
     except Exception as exc:
         if not DEV and PROJECT_ENV != "local":
             raise RuntimeError(f"Postgres unavailable in {PROJECT_ENV}: {exc}") from exc
         _use_json = True
         _initialized = False
-        print(f"WARNING: Postgres unavailable ({exc}); falling back to JSON stores.")
+        print(f"WARNING: Postgres unavailable ({exc}); falling back to the local store.")
         return
 
     _use_json = False
     _initialized = True
+    _pool.warm()
     mode = "DATABASE_URL" if _using_database_url else "Cloud SQL connector"
     print(f"Postgres connected via {mode}; durable stores use Postgres.")
 
 
 def close_db() -> None:
     global _connector, _initialized, _use_json
-    while True:
-        try:
-            conn = _pool.get_nowait()
-        except Empty:
-            break
-        try:
-            conn.close()
-        except Exception:
-            pass
+    _pool.close_all()
     with _connector_lock:
         if _connector is not None:
             try:
@@ -299,3 +949,14 @@ def close_db() -> None:
                 pass
             _connector = None
     _initialized = False
+
+
+async def aclose_db() -> None:
+    """Close the asyncio pool (API lifespan shutdown); pair with close_db()."""
+    global _apool, _apool_loop
+    pool, _apool, _apool_loop = _apool, None, None
+    if pool is not None:
+        try:
+            await pool.close()
+        except Exception:
+            pass
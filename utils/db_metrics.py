@@ -0,0 +1,209 @@
+"""
+Per-statement timing, per-request round-trip counts and a slow-query log.
+
+utils.db wraps every cursor it hands out, so all store SQL is measured
+without touching call sites. Statement names are derived from the SQL
+(`select:queue_parties`, `insert:event_bus`, …); a leading
+`/* name: foo */` comment overrides the derived name.
+
+Round trips are attributed to the innermost active scope — a FastAPI
+request, an interactions.py command, or a Task tick (see db_scope /
+db_scoped). Snapshot everything with metrics_snapshot().
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Generator, List, Optional
+
+# Upper bounds (ms) for the per-statement duration histogram.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+SLOW_LOG_SIZE = 50
+
+_lock = threading.Lock()
+_statements: Dict[str, Dict[str, Any]] = {}
+_scopes: Dict[str, Dict[str, Any]] = {}
+_slow: deque = deque(maxlen=SLOW_LOG_SIZE)
+
+_NAME_HINT = re.compile(r"^\s*/\*\s*name:\s*([\w.:-]+)\s*\*/", re.IGNORECASE)
+_VERB_TABLE = re.compile(
+    r"\b(?:(insert)\s+into|(update)|(delete)\s+from|(select)\b.*?\bfrom)\s+([\w.]+)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def slow_query_ms() -> float:
+    try:
+        return float(os.getenv("DB_SLOW_QUERY_MS", "").strip() or 250)
+    except ValueError:
+        return 250.0
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_name(sql: str) -> str:
+    """Stable low-cardinality label for a SQL string."""
+    hint = _NAME_HINT.match(sql)
+    if hint:
+        return hint.group(1)
+    body = sql.strip()
+    match = None
+    if body[:4].upper() == "WITH":
+        # Writable CTEs are named after the write, not the trailing SELECT.
+        match = next(
+            (m for m in _VERB_TABLE.finditer(body) if not m.group(4)),
+            None,
+        )
+    match = match or _VERB_TABLE.search(body)
+    if match:
+        verb = next(group for group in match.groups()[:4] if group)
+        return f"{verb.lower()}:{match.group(5).lower()}"
+    first = body.split(None, 1)[0].lower() if body else "empty"
+    return first
+
+
+class _Scope:
+    __slots__ = ("label", "round_trips", "db_ms", "started")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.round_trips = 0
+        self.db_ms = 0.0
+        self.started = time.monotonic()
+
+
+_current_scope: ContextVar[Optional[_Scope]] = ContextVar("db_metrics_scope", default=None)
+
+
+def record_statement(sql: str, elapsed_s: float) -> None:
+    """Called by utils.db cursor wrappers after every execute/executemany."""
+    name = statement_name(sql)
+    elapsed_ms = elapsed_s * 1000.0
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.round_trips += 1
+        scope.db_ms += elapsed_ms
+    with _lock:
+        stat = _statements.get(name)
+        if stat is None:
+            stat = _statements[name] = {
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(BUCKETS_MS) + 1),
+            }
+        stat["count"] += 1
+        stat["total_ms"] += elapsed_ms
+        stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+        index = next((i for i, bound in enumerate(BUCKETS_MS) if elapsed_ms <= bound), len(BUCKETS_MS))
+        stat["buckets"][index] += 1
+    if elapsed_ms >= slow_query_ms():
+        where = scope.label if scope else "-"
+        entry = {
+            "name": name,
+            "ms": round(elapsed_ms, 1),
+            "scope": where,
+            "sql": " ".join(sql.split())[:300],
+            "at": time.time(),
+        }
+        with _lock:
+            _slow.append(entry)
+        print(f"🐢 slow query {name} {elapsed_ms:.0f}ms (scope {where})")
+
+
+def begin_scope(label: str) -> Token:
+    """Start attributing round trips to `label`; pair with end_scope()."""
+    return _current_scope.set(_Scope(label))
+
+
+def end_scope(token: Optional[Token] = None) -> None:
+    """Record the current scope. Without a token, just records (no reset)."""
+    scope = _current_scope.get()
+    if token is not None:
+        _current_scope.reset(token)
+    if scope is None:
+        return
+    with _lock:
+        stat = _scopes.get(scope.label)
+        if stat is None:
+            stat = _scopes[scope.label] = {
+                "count": 0,
+                "round_trips": 0,
+                "max_round_trips": 0,
+                "db_ms": 0.0,
+            }
+        stat["count"] += 1
+        stat["round_trips"] += scope.round_trips
+        stat["max_round_trips"] = max(stat["max_round_trips"], scope.round_trips)
+        stat["db_ms"] += scope.db_ms
+
+
+def current_scope() -> Optional[_Scope]:
+    return _current_scope.get()
+
+
+@contextmanager
+def db_scope(label: str) -> Generator[_Scope, None, None]:
+    """Count DB round trips made inside the block under `label`."""
+    token = begin_scope(label)
+    try:
+        yield _current_scope.get()
+    finally:
+        end_scope(token)
+
+
+def db_scoped(label: str) -> Callable:
+    """Decorator form of db_scope() for async Task ticks and handlers."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with db_scope(label):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def metrics_snapshot() -> Dict[str, Any]:
+    """JSON-ready view for /metrics (API and the bot's health server)."""
+    from utils.db import pool_stats
+
+    with _lock:
+        statements = {
+            name: {
+                "count": stat["count"],
+                "total_ms": round(stat["total_ms"], 1),
+                "avg_ms": round(stat["total_ms"] / stat["count"], 2) if stat["count"] else 0.0,
+                "max_ms": round(stat["max_ms"], 1),
+                "histogram_ms": {
+                    **{f"le_{bound}": stat["buckets"][i] for i, bound in enumerate(BUCKETS_MS)},
+                    "le_inf": stat["buckets"][-1],
+                },
+            }
+            for name, stat in sorted(_statements.items(), key=lambda kv: -kv[1]["total_ms"])
+        }
+        scopes = {
+            label: {
+                "count": stat["count"],
+                "avg_round_trips": round(stat["round_trips"] / stat["count"], 2) if stat["count"] else 0.0,
+                "max_round_trips": stat["max_round_trips"],
+                "db_ms": round(stat["db_ms"], 1),
+            }
+            for label, stat in sorted(_scopes.items())
+        }
+        slow: List[Dict[str, Any]] = list(_slow)
+    return {
+        "slow_query_ms": slow_query_ms(),
+        "statements": statements,
+        "scopes": scopes,
+        "slow_queries": slow,
+        "pool": pool_stats(),
+    }
@@ -0,0 +1,347 @@
+"""
+Outbound Discord writes (bot side) through one scheduler.
+
+Cogs hand their message sends, edits and deletes to send() / edit() /
+delete() (edit_by_id() / delete_by_id() when only the stored message id is
+known) instead of awaiting the interactions call directly. Each job has a
+priority class and a route (method + channel, Discord's rate-limit scope):
+
+- at most OUTBOUND_CONCURRENCY jobs are in flight, and a free slot goes to
+  the most urgent waiting job (match > chat > billboard), so a burst of
+  billboard edits cannot hold up a match notification;
+- one job per route at a time, and a route whose rate-limit bucket is
+  exhausted (interactions' own BucketLock) is passed over until it resets
+  rather than parking a slot on it;
+- an edit to a message that already has an edit waiting replaces it, so
+  only the latest state is sent; a delete drops the message's waiting edit.
+
+outbound_stats() (bot /metrics) reports queue depth, wait and send latency
+per priority, and how many edits were merged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import interactions
+from interactions.api.http.route import Route
+from interactions.models.discord.message import process_message_payload
+
+PRIORITY_MATCH = 0  # match requests, confirmations, score prompts
+PRIORITY_CHAT = 1  # bridged match / group chat
+PRIORITY_BILLBOARD = 2  # hub billboards, queue lobby status messages
+
+_PRIORITY_NAMES = {PRIORITY_MATCH: "match", PRIORITY_CHAT: "chat", PRIORITY_BILLBOARD: "billboard"}
+
+OUTBOUND_CONCURRENCY = int(os.getenv("DISCORD_OUTBOUND_CONCURRENCY", "8"))
+# How often waiting workers look again while every queued route is rate limited.
+BUCKET_RECHECK_SECONDS = 0.25
+
+_MESSAGES_PATH = "/channels/{channel_id}/messages"
+_MESSAGE_PATH = "/channels/{channel_id}/messages/{message_id}"
+
+
+class _Job:
+    __slots__ = ("priority", "seq", "route", "bucket", "key", "call", "kwargs", "future", "enqueued_at")
+
+    def __init__(
+        self,
+        priority: int,
+        seq: int,
+        route: str,
+        bucket: Optional[Route],
+        key: Optional[Tuple],
+        call: Callable[..., Awaitable[Any]],
+        kwargs: Dict[str, Any],
+        future: asyncio.Future,
+    ):
+        self.priority = priority
+        self.seq = seq
+        self.route = route
+        self.bucket = bucket
+        self.key = key
+        self.call = call
+        self.kwargs = kwargs
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other: "_Job") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _PriorityStats:
+    __slots__ = ("submitted", "sent", "failed", "wait_ms_total", "wait_ms_max", "send_ms_total", "send_ms_max")
+
+    def __init__(self):
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.send_ms_total = 0.0
+        self.send_ms_max = 0.0
+
+
+class OutboundScheduler:
+    def __init__(self, concurrency: int = OUTBOUND_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self._http: Any = None
+        self._routes: Dict[str, List[_Job]] = {}
+        self._busy: Set[str] = set()
+        self._waiting_edits: Dict[Tuple, _Job] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._stats = {priority: _PriorityStats() for priority in _PRIORITY_NAMES}
+        self.coalesced = 0
+        self.dropped_edits = 0
+        self.bucket_skips = 0
+
+    def _attach(self, target: Any) -> None:
+        if self._http is None:
+            client = target if isinstance(target, interactions.Client) else getattr(target, "_client", None)
+            self._http = getattr(client, "http", None)
+
+    def _ensure_workers(self) -> None:
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.concurrency:
+            self._workers.append(
+                asyncio.create_task(self._work(), name=f"discord-outbound:{len(self._workers)}")
+            )
+
+    def submit(
+        self,
+        priority: int,
+        route: str,
+        call: Callable[..., Awaitable[Any]],
+        kwargs: Dict[str, Any],
+        *,
+        bucket: Optional[Route] = None,
+        key: Optional[Tuple] = None,
+    ) -> asyncio.Future:
+        """Queue `call(**kwargs)`; jobs with the same `key` that are still waiting merge."""
+        self._ensure_workers()
+        stats = self._stats.setdefault(priority, _PriorityStats())
+        stats.submitted += 1
+        if key is not None:
+            waiting = self._waiting_edits.get(key)
+            if waiting is not None:
+                waiting.call, waiting.kwargs = call, kwargs
+                if priority < waiting.priority:
+                    waiting.priority = priority
+                    heapq.heapify(self._routes[waiting.route])
+                self.coalesced += 1
+                return waiting.future
+
+        job = _Job(
+            priority,
+            next(self._seq),
+            route,
+            bucket,
+            key,
+            call,
+            kwargs,
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._routes.setdefault(route, []), job)
+        if key is not None:
+            self._waiting_edits[key] = job
+        self._wake.set()
+        return job.future
+
+    def drop_waiting(self, key: Tuple) -> None:
+        """Forget a waiting job (e.g. the edit of a message about to be deleted)."""
+        job = self._waiting_edits.pop(key, None)
+        if job is None:
+            return
+        heap = self._routes.get(job.route) or []
+        if job in heap:
+            heap.remove(job)
+            heapq.heapify(heap)
+        if not heap:
+            self._routes.pop(job.route, None)
+        if not job.future.done():
+            job.future.set_result(None)
+        self.dropped_edits += 1
+
+    def _rate_limited(self, job: _Job) -> bool:
+        if self._http is None or job.bucket is None:
+            return False
+        try:
+            return bool(self._http.get_ratelimit(job.bucket).locked)
+        except Exception:
+            return False
+
+    def _next_job(self) -> Optional[_Job]:
+        best: Optional[_Job] = None
+        for route, heap in self._routes.items():
+            if not heap or route in self._busy:
+                continue
+            head = heap[0]
+            if best is not None and not head < best:
+                continue
+            if self._rate_limited(head):
+                self.bucket_skips += 1
+                continue
+            best = head
+        if best is None:
+            return None
+        heap = self._routes[best.route]
+        heapq.heappop(heap)
+        if not heap:
+            del self._routes[best.route]
+        if best.key is not None and self._waiting_edits.get(best.key) is best:
+            del self._waiting_edits[best.key]
+        return best
+
+    async def _work(self) -> None:
+        while True:
+            # No await between clear() and _next_job(): a submit cannot slip in.
+            self._wake.clear()
+            job = self._next_job()
+            if job is None:
+                timeout = BUCKET_RECHECK_SECONDS if self._routes else None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            stats = self._stats.setdefault(job.priority, _PriorityStats())
+            started = time.monotonic()
+            wait_ms = (started - job.enqueued_at) * 1000.0
+            stats.wait_ms_total += wait_ms
+            stats.wait_ms_max = max(stats.wait_ms_max, wait_ms)
+            self._busy.add(job.route)
+            try:
+                result = await job.call(**job.kwargs)
+                stats.sent += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as exc:
+                stats.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            finally:
+                send_ms = (time.monotonic() - started) * 1000.0
+                stats.send_ms_total += send_ms
+                stats.send_ms_max = max(stats.send_ms_max, send_ms)
+                self._busy.discard(job.route)
+                self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        # Read from the /metrics thread: iterate over copies.
+        queued: Dict[int, int] = {}
+        for heap in list(self._routes.values()):
+            for job in list(heap):
+                queued[job.priority] = queued.get(job.priority, 0) + 1
+        per_priority = {}
+        for priority, stats in sorted(list(self._stats.items())):
+            done = stats.sent + stats.failed
+            per_priority[_PRIORITY_NAMES.get(priority, str(priority))] = {
+                "queued": queued.get(priority, 0),
+                "submitted": stats.submitted,
+                "sent": stats.sent,
+                "failed": stats.failed,
+                "avg_wait_ms": round(stats.wait_ms_total / done, 2) if done else 0.0,
+                "max_wait_ms": round(stats.wait_ms_max, 2),
+                "avg_send_ms": round(stats.send_ms_total / done, 2) if done else 0.0,
+                "max_send_ms": round(stats.send_ms_max, 2),
+            }
+        return {
+            "in_flight": len(self._busy),
+            "routes_waiting": len(self._routes),
+            "coalesced_edits": self.coalesced,
+            "dropped_edits": self.dropped_edits,
+            "bucket_skips": self.bucket_skips,
+            "priorities": per_priority,
+        }
+
+
+_scheduler = OutboundScheduler()
+
+
+def _channel_id(message: Any) -> Any:
+    return getattr(message, "_channel_id", None) or getattr(getattr(message, "channel", None), "id", None)
+
+
+async def send(target: Any, *, priority: int = PRIORITY_CHAT, **kwargs: Any) -> Any:
+    """`target.send(**kwargs)` (a channel, or a user for DMs) through the scheduler."""
+    _scheduler._attach(target)
+    if isinstance(target, (interactions.BaseUser, interactions.Member)):
+        # The DM channel (and its bucket) is resolved inside send().
+        route, bucket = f"DM {target.id}", None
+    else:
+        route = f"POST {target.id}"
+        bucket = Route("POST", _MESSAGES_PATH, channel_id=target.id)
+    return await _scheduler.submit(priority, route, target.send, kwargs, bucket=bucket)
+
+
+def _submit_edit(priority: int, channel_id: Any, message_id: Any, call, kwargs) -> asyncio.Future:
+    return _scheduler.submit(
+        priority,
+        f"PATCH {channel_id}",
+        call,
+        kwargs,
+        bucket=Route("PATCH", _MESSAGE_PATH, channel_id=channel_id, message_id=message_id),
+        key=("edit", channel_id, message_id),
+    )
+
+
+def _submit_delete(priority: int, channel_id: Any, message_id: Any, call) -> asyncio.Future:
+    _scheduler.drop_waiting(("edit", channel_id, message_id))
+    return _scheduler.submit(
+        priority,
+        f"DELETE {channel_id}",
+        call,
+        {},
+        bucket=Route("DELETE", _MESSAGE_PATH, channel_id=channel_id, message_id=message_id),
+    )
+
+
+async def edit(message: Any, *, priority: int = PRIORITY_BILLBOARD, **kwargs: Any) -> Any:
+    """`message.edit(**kwargs)`; a newer edit of the same message replaces a waiting one."""
+    _scheduler._attach(message)
+    return await _submit_edit(priority, _channel_id(message), message.id, message.edit, kwargs)
+
+
+async def delete(message: Any, *, priority: int = PRIORITY_BILLBOARD) -> None:
+    """`message.delete()`; any edit still waiting for that message is dropped."""
+    _scheduler._attach(message)
+    await _submit_delete(priority, _channel_id(message), message.id, message.delete)
+
+
+async def edit_by_id(
+    bot: interactions.Client, channel_id: int, message_id: int, *, priority: int = PRIORITY_BILLBOARD, **kwargs: Any
+) -> Any:
+    """
+    Edit a message known only by id, without fetching it first. Raises
+    interactions' NotFound if the message is gone.
+    """
+    _scheduler._attach(bot)
+
+    async def call(**fields: Any) -> Any:
+        return await bot.http.edit_message(process_message_payload(**fields), channel_id, message_id)
+
+    return await _submit_edit(priority, channel_id, message_id, call, kwargs)
+
+
+async def delete_by_id(
+    bot: interactions.Client, channel_id: int, message_id: int, *, priority: int = PRIORITY_BILLBOARD
+) -> None:
+    """Delete a message known only by id; raises NotFound if it is already gone."""
+    _scheduler._attach(bot)
+    await _submit_delete(
+        priority, channel_id, message_id, lambda: bot.http.delete_message(channel_id, message_id)
+    )
+
+
+def outbound_stats() -> Dict[str, Any]:
+    return _scheduler.stats()
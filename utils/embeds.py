@@ -1,10 +1,12 @@
 import os
-from typing import Any, Dict, List, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import interactions
 
 from utils.colors import COLORS
-from utils.mmr import format_average_rank
+from utils.mmr import format_average_rank, lineup_rank_key
 from classes.queue_party import MODE_CASUAL
 from utils.roster import (
     SEARCH_ALLIES,
@@ -33,7 +35,12 @@ def _embed_color(war: Dict[str, Any]) -> int:
     return COLORS["allies"]
 
 
-def build_war_embed(war: Dict[str, Any]) -> interactions.Embed:
+def build_war_embed(
+    war: Dict[str, Any],
+    *,
+    ratings: Optional[Dict[int, Dict[str, Dict[str, Any]]]] = None,
+) -> interactions.Embed:
+    """`ratings`: get_player_ratings_for_ids() for the war's track (see prefetch_war_ratings)."""
     from utils.rank_icons import icon_url
     from utils.search_time import format_search_time, opponent_search_unlocked
 
@@ -80,38 +87,13 @@ def build_war_embed(war: Dict[str, Any]) -> interactions.Embed:
             inline=False,
         )
     else:
+        rank_key = lineup_rank_key(lineup, war_type, ratings)
         embed.add_field(
             name="Team rank",
-            value=format_average_rank(lineup, war_type),
+            value=format_average_rank(lineup, war_type, rank_key=rank_key),
             inline=False,
         )
         if ranked_opponents and status != "matched":
-            from utils.sr import get_player_rating, rank_for_sr
-
-            scores = []
-            for entry in lineup or []:
-                did = entry.get("discord_id")
-                if did is None:
-                    continue
-                try:
-                    rating = get_player_rating(
-                        int(did),
-                        war_type,
-                        bagger=bool(
-                            entry.get("bagger")
-                            or str(entry.get("role") or "").lower() == "bagger"
-                        ),
-                        role=entry.get("role"),
-                    )
-                    if rating.get("sr") is not None:
-                        scores.append(int(rating["sr"]))
-                except Exception:
-                    continue
-            rank_key = (
-                rank_for_sr(int(round(sum(scores) / len(scores))), revealed=True)
-                if scores
-                else "unranked"
-            )
             thumb = icon_url(rank_key)
             if thumb:
                 embed.set_thumbnail(thumb)
@@ -145,6 +127,85 @@ def build_war_embed(war: Dict[str, Any]) -> interactions.Embed:
     return embed
 
 
+# {track: get_player_ratings_for_ids()} for a batch of wars.
+PrefetchedRatings = Dict[str, Dict[int, Dict[str, Dict[str, Any]]]]
+
+# Billboard renders, keyed by war content + whether opponent search has
+# unlocked (the only time-dependent part). Ratings only move when a war
+# completes, which rewrites the post; the TTL bounds any other drift.
+RENDER_CACHE_SIZE = int(os.getenv("WAR_RENDER_CACHE_SIZE", "512"))
+RENDER_CACHE_TTL_SECONDS = float(os.getenv("WAR_RENDER_CACHE_TTL_SECONDS", "300"))
+_render_cache: "OrderedDict[Tuple[str, str, bool], Tuple[float, Any, Any]]" = OrderedDict()
+_render_stats = {"hits": 0, "misses": 0}
+
+
+def prefetch_war_ratings(wars: List[Dict[str, Any]]) -> PrefetchedRatings:
+    """One get_player_ratings_for_ids() per track for every lineup in `wars`."""
+    from utils.sr import get_player_ratings_for_ids
+
+    ids_by_track: Dict[str, List[int]] = {}
+    for war in wars:
+        if war.get("mode", "ranked") == MODE_CASUAL:
+            continue
+        track = str(war.get("war_type", "RT")).upper()
+        ids_by_track.setdefault(track, []).extend(
+            entry["discord_id"]
+            for entry in war.get("lineup") or []
+            if entry.get("discord_id") is not None
+        )
+    out: PrefetchedRatings = {}
+    for track, ids in ids_by_track.items():
+        try:
+            out[track] = get_player_ratings_for_ids(ids, track)
+        except Exception as exc:
+            print(f"⚠️ Rating prefetch failed for {track}: {exc}")
+    return out
+
+
+def render_war_message(
+    war: Dict[str, Any],
+    *,
+    ratings: Union[PrefetchedRatings, Callable[[], PrefetchedRatings], None] = None,
+) -> Tuple[interactions.Embed, Any]:
+    """
+    (embed, components) for a billboard post, rendered once per war version
+    and shared by every hub channel. Treat the result as read-only.
+    `ratings` is a prefetch_war_ratings() result, or a callable returning
+    one (only called on a cache miss).
+    """
+    from utils.billboard_store import war_content_hash
+    from utils.search_time import opponent_search_unlocked
+    from utils.war_buttons import build_war_buttons
+
+    unlocked = opponent_search_unlocked(
+        war.get("start_time", "ASAP"),
+        created_at=war.get("created_at") or war.get("last_updated"),
+    )
+    key = (str(war.get("war_id")), war_content_hash(war), bool(unlocked))
+    now = time.monotonic()
+    cached = _render_cache.get(key)
+    if cached and now - cached[0] < RENDER_CACHE_TTL_SECONDS:
+        _render_cache.move_to_end(key)
+        _render_stats["hits"] += 1
+        return cached[1], cached[2]
+
+    _render_stats["misses"] += 1
+    if callable(ratings):
+        ratings = ratings()
+    track = str(war.get("war_type", "RT")).upper()
+    embed = build_war_embed(war, ratings=(ratings or {}).get(track))
+    components = build_war_buttons(war)
+    _render_cache[key] = (now, embed, components)
+    _render_cache.move_to_end(key)
+    while len(_render_cache) > RENDER_CACHE_SIZE:
+        _render_cache.popitem(last=False)
+    return embed, components
+
+
+def render_cache_stats() -> Dict[str, int]:
+    return {**_render_stats, "size": len(_render_cache)}
+
+
 def build_queue_party_embed(party: Dict[str, Any]) -> interactions.Embed:
     from utils.search_time import format_search_time, opponent_search_unlocked
 
@@ -558,37 +619,13 @@ def build_match_request_embed(requester_war: Dict[str, Any]) -> interactions.Emb
             ),
             color=COLORS["opponents"],
         )
+        rank_key = lineup_rank_key(lineup, war_type)
         embed.add_field(
             name="Their team rank",
-            value=format_average_rank(lineup, war_type),
+            value=format_average_rank(lineup, war_type, rank_key=rank_key),
             inline=False,
         )
         # Thumbnail matches web icon-only opponent cards.
-        from utils.sr import get_player_rating, rank_for_sr
-
-        scores = []
-        for entry in lineup or []:
-            did = entry.get("discord_id")
-            if did is None:
-                continue
-            try:
-                rating = get_player_rating(
-                    int(did),
-                    war_type,
-                    bagger=bool(
-                        entry.get("bagger") or str(entry.get("role") or "").lower() == "bagger"
-                    ),
-                    role=entry.get("role"),
-                )
-                if rating.get("sr") is not None:
-                    scores.append(int(rating["sr"]))
-            except Exception:
-                continue
-        rank_key = (
-            rank_for_sr(int(round(sum(scores) / len(scores))), revealed=True)
-            if scores
-            else "unranked"
-        )
         thumb = icon_url(rank_key)
         if thumb:
             embed.set_thumbnail(thumb)
@@ -1,29 +1,595 @@
-"""Thin wrapper around the Postgres event_bus table."""
+"""
+Thin wrapper around the Postgres event_bus table.
+
+Every publish also pg_notify()s EVENT_CHANNEL in the same statement, so the
+notification fires on commit. Payloads are "<event id>:<event_type>"; stores
+may add row-less notifications as "0:<kind>:<key>" (e.g. "0:party:<id>").
+EventBusListener holds one LISTEN connection per process and wakes consumers;
+they still read rows by id, so polling is only a gap-filling fallback
+(listener down, Cloud SQL connector mode).
+
+Rows may carry an `audience` (see event_audience()) so the SSE hub only
+copies an event to the streams it concerns.
+
+Refresh-style events (COALESCED_ACTIONS) are debounced before they reach the
+table: the same (event_type, action, party/war) published again within
+COALESCE_WINDOW_MS merges into one row, since every consumer re-reads the
+current state anyway. Any other event for that party/war flushes the pending
+ones first, so per-entity order is kept.
+
+Inside utils.db.unit_of_work() publishes go to the unit's outbox instead:
+they are written in one statement on the unit's connection right before it
+commits, so the events exist if and only if the state change does.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
-from typing import Any, Dict
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from utils.db import (
+    UnitOfWork,
+    aconnect_listener,
+    current_unit_of_work,
+    get_aconn,
+    get_conn,
+    supports_listen,
+    use_json_stores,
+)
+
+EVENT_CHANNEL = "event_bus"
+# While the listener is connected, consumers only re-poll this often.
+FALLBACK_POLL_SECONDS = float(os.getenv("EVENT_BUS_FALLBACK_POLL_SECONDS", "30"))
+# 0 disables coalescing (every publish is written immediately).
+COALESCE_WINDOW_MS = float(os.getenv("EVENT_COALESCE_WINDOW_MS", "150"))
+# Actions whose consumers only "refresh from current state"; safe to merge.
+COALESCED_ACTIONS: Dict[str, FrozenSet[str]] = {
+    "party_sync": frozenset({"roster_update", "post"}),
+    "queue": frozenset({"join_queue", "unhide_queue", "hide_queue"}),
+    "hub_post": frozenset({"upsert"}),
+}
+
+_INSERT_EVENT_SQL = """
+    WITH ins AS (
+      INSERT INTO event_bus (event_type, payload, audience, created_at)
+      VALUES (%s, %s::jsonb, %s::jsonb, NOW())
+      RETURNING id, event_type
+    )
+    SELECT pg_notify(%s, ins.id || ':' || ins.event_type) FROM ins
+"""
+
+# A unit_of_work() outbox: every queued event in one statement, in order.
+_INSERT_OUTBOX_SQL = """
+    WITH ins AS (
+      INSERT INTO event_bus (event_type, payload, audience, created_at)
+      SELECT e.event_type, e.payload, e.audience, NOW()
+      FROM jsonb_to_recordset(%s::jsonb) AS e(ord INT, event_type TEXT, payload JSONB, audience JSONB)
+      ORDER BY e.ord
+      RETURNING id, event_type
+    )
+    SELECT pg_notify(%s, ins.id || ':' || ins.event_type) FROM ins
+"""
+
+
+def _json_or_none(value: Any) -> Optional[Dict[str, Any]]:
+    if value is None or isinstance(value, dict):
+        return value
+    return json.loads(value)
+
+
+def _row_to_event(row: tuple) -> Dict[str, Any]:
+    row_id, event_type, payload, audience = row
+    return {
+        "id": int(row_id),
+        "event_type": event_type,
+        "payload": _json_or_none(payload) or {},
+        "audience": _json_or_none(audience),
+    }
+
+
+def event_audience(
+    *,
+    discord_ids: Iterable[Any] = (),
+    party_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    board: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Who an event is for (SSE routing). A subscriber matches any listed user,
+    its active party, or a board it watches; None means everyone.
+    """
+    ids = set()
+    for value in discord_ids:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    audience: Dict[str, Any] = {}
+    if ids:
+        audience["discord_ids"] = sorted(ids)
+    if party_id:
+        audience["party_id"] = str(party_id)
+    if session_id:
+        audience["session_id"] = str(session_id)
+    if board:
+        audience["board"] = str(board)
+    return audience or None
+
+
+def _insert_params(
+    event_type: str, payload: Dict[str, Any], audience: Optional[Dict[str, Any]]
+) -> tuple:
+    return (
+        event_type,
+        json.dumps(payload),
+        json.dumps(audience) if audience else None,
+        EVENT_CHANNEL,
+    )
+
+
+def _entity_key(payload: Dict[str, Any]) -> Optional[str]:
+    entity = payload.get("party_id") or payload.get("war_id")
+    return str(entity) if entity else None
+
+
+def coalesce_key(event_type: str, payload: Dict[str, Any]) -> Optional[str]:
+    """Merge key for debounced events; None means publish right away."""
+    action = str(payload.get("action") or "")
+    entity = _entity_key(payload)
+    if not entity or action not in COALESCED_ACTIONS.get(event_type, ()):
+        return None
+    return f"{event_type}:{action}:{entity}"
+
+
+def _merge_audience(
+    old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    if old is None or new is None:
+        return None  # either one was a broadcast
+    merged = {**old, **{k: v for k, v in new.items() if v is not None}}
+    ids = set(old.get("discord_ids") or ()) | set(new.get("discord_ids") or ())
+    if ids:
+        merged["discord_ids"] = sorted(ids)
+    return merged
+
+
+class _Coalescer:
+    """
+    Per-process debounce buffer in front of event_bus. The first event for a
+    key opens a window; later ones merge into it (newer non-null fields win)
+    and the merged event is written when the window closes.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self._lock = threading.Lock()
+        self._pending: Dict[str, list] = {}  # key -> [deadline, entity, type, payload, audience]
+        self._timer: Optional[threading.Timer] = None
+        self.offered = 0
+        self.published = 0
+        self.collapsed = 0
+
+    def offer(
+        self,
+        key: str,
+        event_type: str,
+        payload: Dict[str, Any],
+        audience: Optional[Dict[str, Any]],
+    ) -> None:
+        with self._lock:
+            self.offered += 1
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[3] = {**entry[3], **{k: v for k, v in payload.items() if v is not None}}
+                entry[4] = _merge_audience(entry[4], audience)
+                self.collapsed += 1
+                return
+            deadline = time.monotonic() + self.window
+            self._pending[key] = [deadline, _entity_key(payload), event_type, dict(payload), audience]
+            if self._timer is None:
+                self._schedule(self.window)
 
-from utils.db import get_conn, use_json_stores
+    def has_pending(self, entity: Optional[str]) -> bool:
+        return entity is not None and any(e[1] == entity for e in list(self._pending.values()))
 
+    def flush(self, *, entity: Optional[str] = None, due_only: bool = False) -> int:
+        """Write pending events (all, one entity's, or those whose window closed)."""
+        now = time.monotonic()
+        with self._lock:
+            ready = [
+                key
+                for key, entry in self._pending.items()
+                if (entity is None or entry[1] == entity) and (not due_only or entry[0] <= now)
+            ]
+            entries = [self._pending.pop(key) for key in ready]
+            self.published += len(entries)
+        for _, _, event_type, payload, audience in entries:
+            _publish_now(event_type, payload, audience)
+        return len(entries)
 
-def publish_event(event_type: str, payload: Dict[str, Any]) -> None:
-    """Best-effort insert into event_bus. No-op for JSON stores."""
+    def _schedule(self, delay: float) -> None:
+        self._timer = threading.Timer(max(delay, 0.0), self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        try:
+            self.flush(due_only=True)
+        finally:
+            with self._lock:
+                self._timer = None
+                if self._pending:
+                    next_due = min(entry[0] for entry in self._pending.values())
+                    self._schedule(next_due - time.monotonic())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "offered": self.offered,
+            "published": self.published,
+            "collapsed": self.collapsed,
+            "pending": len(self._pending),
+        }
+
+
+_coalescer = _Coalescer(COALESCE_WINDOW_MS / 1000.0)
+atexit.register(lambda: _coalescer.flush())
+
+_outbox_stats = {"enqueued": 0, "merged": 0, "batches": 0, "written": 0}
+
+
+def flush_coalesced() -> int:
+    """Write every debounced event now (shutdown); returns how many."""
+    return _coalescer.flush()
+
+
+def publish_stats() -> Dict[str, Dict[str, int]]:
+    """Debounce buffer and unit_of_work outbox counters for /metrics."""
+    return {"coalescing": _coalescer.stats(), "outbox": dict(_outbox_stats)}
+
+
+def _enqueue(
+    uow: UnitOfWork,
+    event_type: str,
+    payload: Dict[str, Any],
+    audience: Optional[Dict[str, Any]],
+) -> None:
+    """Queue an event on the unit; same-key refresh events merge within it."""
+    _outbox_stats["enqueued"] += 1
+    key = coalesce_key(event_type, payload)
+    if key is not None:
+        for entry in uow.outbox:
+            if entry[0] == key:
+                entry[2] = {**entry[2], **{k: v for k, v in payload.items() if v is not None}}
+                entry[3] = _merge_audience(entry[3], audience)
+                _outbox_stats["merged"] += 1
+                return
+    if not uow.outbox:
+        uow.before_commit.append(_write_outbox)
+    uow.outbox.append([key, event_type, dict(payload), audience])
+
+
+def _write_outbox(uow: UnitOfWork) -> None:
+    """before_commit hook: one INSERT for the whole outbox (errors roll the unit back)."""
+    if not uow.outbox:
+        return
+    rows = [
+        {"ord": ord_, "event_type": event_type, "payload": payload, "audience": audience}
+        for ord_, (_, event_type, payload, audience) in enumerate(uow.outbox)
+    ]
+    cursor = uow.conn.cursor()
+    try:
+        cursor.execute(_INSERT_OUTBOX_SQL, (json.dumps(rows), EVENT_CHANNEL))
+    finally:
+        cursor.close()
+    _outbox_stats["batches"] += 1
+    _outbox_stats["written"] += len(rows)
+    uow.outbox.clear()
+
+
+def publish_event(
+    event_type: str,
+    payload: Dict[str, Any],
+    *,
+    audience: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Insert into event_bus; no-op for JSON stores. Inside unit_of_work() the
+    event joins the unit's transaction, otherwise it is best-effort (and
+    debounced for COALESCED_ACTIONS).
+    """
     if use_json_stores():
         return
+    uow = current_unit_of_work()
+    if uow is not None and uow.conn is not None:
+        if _coalescer.has_pending(_entity_key(payload)):
+            _coalescer.flush(entity=_entity_key(payload))
+        _enqueue(uow, event_type, payload, audience)
+        return
+    key = coalesce_key(event_type, payload) if COALESCE_WINDOW_MS > 0 else None
+    if key is not None:
+        _coalescer.offer(key, event_type, payload, audience)
+        return
+    if _coalescer.has_pending(_entity_key(payload)):
+        _coalescer.flush(entity=_entity_key(payload))
+    _publish_now(event_type, payload, audience)
+
+
+def _publish_now(
+    event_type: str, payload: Dict[str, Any], audience: Optional[Dict[str, Any]]
+) -> None:
     try:
         with get_conn() as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute(
-                    """
-                    INSERT INTO event_bus (event_type, payload, created_at)
-                    VALUES (%s, %s::jsonb, NOW())
-                    """,
-                    (event_type, json.dumps(payload)),
-                )
+                cursor.execute(_INSERT_EVENT_SQL, _insert_params(event_type, payload, audience))
             finally:
                 cursor.close()
     except Exception as exc:
         print(f"⚠️ event_bus publish failed ({event_type}): {exc}")
+
+
+async def apublish_event(
+    event_type: str,
+    payload: Dict[str, Any],
+    *,
+    audience: Optional[Dict[str, Any]] = None,
+) -> None:
+    """publish_event() for async handlers — never blocks the event loop."""
+    if use_json_stores():
+        return
+    key = coalesce_key(event_type, payload) if COALESCE_WINDOW_MS > 0 else None
+    if key is not None:
+        _coalescer.offer(key, event_type, payload, audience)
+        return
+    if _coalescer.has_pending(_entity_key(payload)):
+        await asyncio.to_thread(_coalescer.flush, entity=_entity_key(payload))
+    try:
+        async with get_aconn() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    _INSERT_EVENT_SQL, _insert_params(event_type, payload, audience)
+                )
+    except Exception as exc:
+        print(f"⚠️ event_bus publish failed ({event_type}): {exc}")
+
+
+async def alatest_event_id() -> int:
+    """Current event_bus high-water mark (0 for JSON stores / missing table)."""
+    if use_json_stores():
+        return 0
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT COALESCE(MAX(id), 0) FROM event_bus")
+            row = await cursor.fetchone()
+    return int(row[0]) if row else 0
+
+
+async def apoll_events(
+    after_id: int,
+    *,
+    event_type: Optional[str] = None,
+    event_types: Optional[Iterable[str]] = None,
+    limit: int = 100,
+) -> List[Dict[str, Any]]:
+    """Events with id > after_id, oldest first, optionally for one or more event_types."""
+    if use_json_stores():
+        return []
+    types = [event_type] if event_type else sorted(set(event_types or ()))
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            if types:
+                await cursor.execute(
+                    """
+                    SELECT id, event_type, payload, audience FROM event_bus
+                    WHERE id > %s AND event_type = ANY(%s)
+                    ORDER BY id ASC LIMIT %s
+                    """,
+                    (after_id, types, limit),
+                )
+            else:
+                await cursor.execute(
+                    """
+                    SELECT id, event_type, payload, audience FROM event_bus
+                    WHERE id > %s ORDER BY id ASC LIMIT %s
+                    """,
+                    (after_id, limit),
+                )
+            rows = await cursor.fetchall()
+    return [_row_to_event(row) for row in rows]
+
+
+async def aload_consumer_cursors(names: Iterable[str]) -> Dict[str, int]:
+    """Stored event_consumers positions; consumers never seen are absent."""
+    wanted = sorted(set(names))
+    if use_json_stores() or not wanted:
+        return {}
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "SELECT name, last_id FROM event_consumers WHERE name = ANY(%s)",
+                (wanted,),
+            )
+            rows = await cursor.fetchall()
+    return {str(row[0]): int(row[1]) for row in rows}
+
+
+async def asave_consumer_cursors(cursors: Dict[str, int]) -> None:
+    """Upsert many consumer positions in one statement (never moves one backwards)."""
+    if use_json_stores() or not cursors:
+        return
+    rows = [{"name": name, "last_id": int(last_id)} for name, last_id in cursors.items()]
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                """
+                INSERT INTO event_consumers (name, last_id, updated_at)
+                SELECT c.name, c.last_id, NOW()
+                FROM jsonb_to_recordset(%s::jsonb) AS c(name TEXT, last_id BIGINT)
+                ON CONFLICT (name) DO UPDATE SET
+                  last_id = GREATEST(event_consumers.last_id, EXCLUDED.last_id),
+                  updated_at = NOW()
+                """,
+                (json.dumps(rows),),
+            )
+
+
+class _Wakeup:
+    """Runs one consumer callback per burst of notifications, never concurrently."""
+
+    def __init__(self, callback: Callable[[], Awaitable[None]]):
+        self.callback = callback
+        self._task: Optional[asyncio.Task] = None
+        self._again = False
+
+    def fire(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._again = True
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self._again = False
+            try:
+                await self.callback()
+            except Exception as exc:
+                print(f"⚠️ event_bus consumer failed: {exc}")
+            if not self._again:
+                return
+
+
+class EventBusListener:
+    """
+    Dedicated LISTEN connection that wakes in-process consumers.
+
+    `subscribe()` registers a drain callback (optionally for some event_types);
+    `wait()` is for loops such as SSE streams. After every (re)connect all
+    subscribers are woken once so anything published in the gap is read.
+    """
+
+    def __init__(self) -> None:
+        self.connected = False
+        self.last_event_id = 0
+        self._subscribers: List[Tuple[Optional[FrozenSet[str]], _Wakeup]] = []
+        self._observers: List[Callable[[str, str], None]] = []
+        self._next: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(
+        self,
+        callback: Callable[[], Awaitable[None]],
+        *,
+        event_types: Optional[Iterable[str]] = None,
+    ) -> None:
+        wanted = frozenset(event_types) if event_types is not None else None
+        self._subscribers.append((wanted, _Wakeup(callback)))
+
+    def observe(self, callback: Callable[[str, str], None]) -> None:
+        """
+        Call `callback(event_type, key)` synchronously for every notification;
+        ("", "") after each (re)connect means anything may have changed.
+        """
+        self._observers.append(callback)
+
+    def start(self) -> None:
+        """Start listening (no-op without DATABASE_URL or when already running)."""
+        if not supports_listen():
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def fallback_due(self, last_polled: float) -> bool:
+        """Should a consumer last drained at `last_polled` (monotonic) poll now?"""
+        interval = FALLBACK_POLL_SECONDS if self.connected else 0.0
+        return time.monotonic() - last_polled >= interval
+
+    async def wait(self, timeout: float, *, after_id: Optional[int] = None) -> bool:
+        """
+        Block until the next notification (True) or `timeout` seconds (False).
+        With `after_id`, return at once if a newer event was already announced.
+        """
+        if after_id is not None and self.last_event_id > after_id:
+            return True
+        if self._next is None or self._next.done():
+            self._next = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._next), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _wake(self, event_type: Optional[str]) -> None:
+        if self._next is not None and not self._next.done():
+            self._next.set_result(event_type)
+        for wanted, wakeup in self._subscribers:
+            if event_type is None or wanted is None or event_type in wanted:
+                wakeup.fire()
+
+    def _handle(self, payload: str) -> None:
+        event_id, _, rest = payload.partition(":")
+        event_type, _, key = rest.partition(":")
+        if event_id.isdigit():
+            self.last_event_id = max(self.last_event_id, int(event_id))
+        for observer in self._observers:
+            try:
+                observer(event_type, key)
+            except Exception as exc:
+                print(f"⚠️ event_bus observer failed: {exc}")
+        self._wake(event_type or None)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                conn = await aconnect_listener()
+                try:
+                    await conn.execute(f"LISTEN {EVENT_CHANNEL}")
+                    self.connected = True
+                    backoff = 1.0
+                    print("📡 event_bus listener connected")
+                    # Empty type/key = "anything may have changed" (gap fill).
+                    self._handle("0:")
+                    while True:
+                        async for notify in conn.notifies(timeout=FALLBACK_POLL_SECONDS):
+                            self._handle(notify.payload)
+                        # Quiet period: make sure the connection is still alive.
+                        await conn.execute("SELECT 1")
+                finally:
+                    self.connected = False
+                    try:
+                        await conn.close()
+                    except Exception:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"⚠️ event_bus listener disconnected: {exc}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+_listener: Optional[EventBusListener] = None
+_listener_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def event_listener() -> EventBusListener:
+    """The process-wide listener for the running event loop (bot or API)."""
+    global _listener, _listener_loop
+    loop = asyncio.get_running_loop()
+    if _listener is None or _listener_loop is not loop:
+        _listener, _listener_loop = EventBusListener(), loop
+    return _listener
@@ -0,0 +1,196 @@
+"""
+event_bus partition upkeep (see sql/migrations/0008_event_bus_partitioned.sql).
+
+event_bus is RANGE-partitioned on created_at, one partition per UTC day.
+amaintain_event_bus() creates the next few days ahead of time and drops every
+partition that ends before the retention cutoff:
+
+    oldest event the slowest event_consumers cursor has not read yet
+    - RETENTION_GRACE_HOURS, but never older than MAX_RETENTION_DAYS
+
+so a stalled or long-gone consumer cannot keep the table growing forever.
+Dropping a partition is a metadata change, not a DELETE + VACUUM.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from utils.db import get_aconn, use_json_stores
+
+PARTITION_AHEAD_DAYS = int(os.getenv("EVENT_BUS_PARTITION_AHEAD_DAYS", "3"))
+RETENTION_GRACE_HOURS = float(os.getenv("EVENT_BUS_RETENTION_GRACE_HOURS", "24"))
+MAX_RETENTION_DAYS = float(os.getenv("EVENT_BUS_MAX_RETENTION_DAYS", "14"))
+
+DEFAULT_PARTITION = "event_bus_default"
+
+# Upper bound of every event_bus partition (NULL for the DEFAULT one); the
+# bound text is cast in SQL so the session TimeZone does not matter.
+_PARTITIONS_SQL = """
+    SELECT
+      c.relname,
+      (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \\(''([^'']+)''\\)'))[1]::timestamptz,
+      GREATEST(c.reltuples, 0)::bigint,
+      pg_total_relation_size(c.oid)
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'event_bus'::regclass
+    ORDER BY 2 ASC NULLS LAST
+"""
+
+# created_at of the oldest row some consumer still has to read (NULL = none).
+_OLDEST_UNREAD_SQL = """
+    SELECT eb.created_at
+    FROM event_bus eb
+    WHERE eb.id > (SELECT COALESCE(MIN(last_id), 0) FROM event_consumers)
+    ORDER BY eb.id ASC
+    LIMIT 1
+"""
+
+
+def _partition_name(day: date) -> str:
+    return f"event_bus_p{day:%Y%m%d}"
+
+
+def _day_literal(day: date) -> str:
+    return f"'{day.isoformat()} 00:00:00+00'"
+
+
+async def alist_partitions() -> List[Dict[str, Any]]:
+    """name, upper bound (None for DEFAULT), estimated rows and bytes, oldest first."""
+    if use_json_stores():
+        return []
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(_PARTITIONS_SQL)
+            rows = await cursor.fetchall()
+    return [
+        {"name": row[0], "until": row[1], "rows_estimate": int(row[2]), "bytes": int(row[3])}
+        for row in rows
+    ]
+
+
+async def aretention_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Partitions ending at or before this instant are safe to drop."""
+    now = now or datetime.now(timezone.utc)
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(_OLDEST_UNREAD_SQL)
+            row = await cursor.fetchone()
+    oldest_unread = row[0] if row and row[0] is not None else now
+    cutoff = min(oldest_unread, now) - timedelta(hours=RETENTION_GRACE_HOURS)
+    return max(cutoff, now - timedelta(days=MAX_RETENTION_DAYS))
+
+
+async def aensure_partitions(today: Optional[date] = None) -> List[str]:
+    """
+    Create daily partitions through today + PARTITION_AHEAD_DAYS. Rows that
+    landed in the DEFAULT partition for a new day's range move into it.
+    """
+    if use_json_stores():
+        return []
+    today = today or datetime.now(timezone.utc).date()
+    covered = [p["until"] for p in await alist_partitions() if p["until"] is not None]
+    # Continue from the last covered day, so a gap while the bot was down is
+    # back-filled (and its rows moved out of DEFAULT) rather than skipped.
+    start = max((until.astimezone(timezone.utc).date() for until in covered), default=today)
+    created: List[str] = []
+    day = start
+    while day <= today + timedelta(days=PARTITION_AHEAD_DAYS):
+        name = _partition_name(day)
+        lower, upper = _day_literal(day), _day_literal(day + timedelta(days=1))
+        async with get_aconn() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(f"CREATE TABLE {name} (LIKE event_bus INCLUDING DEFAULTS)")
+                await cursor.execute(
+                    f"""
+                    WITH moved AS (
+                      DELETE FROM {DEFAULT_PARTITION}
+                      WHERE created_at >= {lower} AND created_at < {upper}
+                      RETURNING *
+                    )
+                    INSERT INTO {name} SELECT * FROM moved
+                    """
+                )
+                await cursor.execute(
+                    f"ALTER TABLE event_bus ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ({lower}) TO ({upper})"
+                )
+        created.append(name)
+        day += timedelta(days=1)
+    return created
+
+
+async def adrop_expired_partitions(cutoff: datetime) -> List[str]:
+    """Drop partitions that end at or before `cutoff`; trim the DEFAULT one."""
+    if use_json_stores():
+        return []
+    dropped: List[str] = []
+    for partition in await alist_partitions():
+        until = partition["until"]
+        if until is None or until > cutoff:
+            continue
+        async with get_aconn() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(f"DROP TABLE IF EXISTS {partition['name']}")
+        dropped.append(partition["name"])
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < %s", (cutoff,)
+            )
+    return dropped
+
+
+async def amaintain_event_bus() -> Dict[str, Any]:
+    """Create upcoming partitions, then drop the expired ones."""
+    if use_json_stores():
+        return {}
+    created = await aensure_partitions()
+    cutoff = await aretention_cutoff()
+    dropped = await adrop_expired_partitions(cutoff)
+    return {"created": created, "dropped": dropped, "cutoff": cutoff.isoformat()}
+
+
+async def aevent_bus_status() -> Dict[str, Any]:
+    """Table size, partitions and per-consumer lag (scripts/event_bus_admin.py)."""
+    if use_json_stores():
+        return {}
+    partitions = await alist_partitions()
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT COALESCE(MAX(id), 0), NOW() FROM event_bus")
+            head_id, now = await cursor.fetchone()
+            await cursor.execute(
+                """
+                SELECT ec.name, ec.last_id, ec.updated_at, nxt.created_at
+                FROM event_consumers ec
+                LEFT JOIN LATERAL (
+                  SELECT eb.created_at FROM event_bus eb
+                  WHERE eb.id > ec.last_id
+                  ORDER BY eb.id ASC LIMIT 1
+                ) nxt ON TRUE
+                ORDER BY ec.last_id ASC, ec.name ASC
+                """
+            )
+            consumer_rows = await cursor.fetchall()
+    consumers = [
+        {
+            "name": row[0],
+            "last_id": int(row[1]),
+            "lag_events": max(int(head_id) - int(row[1]), 0),
+            "lag_seconds": round(max((now - row[3]).total_seconds(), 0.0), 1) if row[3] else 0.0,
+            "updated_at": row[2].isoformat() if row[2] else None,
+        }
+        for row in consumer_rows
+    ]
+    return {
+        "head_id": int(head_id),
+        "total_bytes": sum(p["bytes"] for p in partitions),
+        "rows_estimate": sum(p["rows_estimate"] for p in partitions),
+        "partitions": partitions,
+        "consumers": consumers,
+        "retention_cutoff": (await aretention_cutoff(now)).isoformat(),
+    }
@@ -0,0 +1,163 @@
+"""
+In-process router for event_bus rows (bot side).
+
+cogs.event_dispatcher tails event_bus once and hands each row to every
+handler registered for its event_type. Each handler owns a bounded queue and
+one worker task: handlers run concurrently with each other, in order within
+themselves, and a full queue makes the tail wait instead of buffering forever.
+
+Each handler is also a durable event_consumers row: load_cursors() seeds the
+restart position and flush_cursors() commits every advanced cursor in one
+statement, so a redeploy replays what it missed instead of skipping it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from utils.db_metrics import db_scope
+from utils.event_bus import aload_consumer_cursors, asave_consumer_cursors
+
+HANDLER_QUEUE_SIZE = int(os.getenv("EVENT_HANDLER_QUEUE_SIZE", "200"))
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class _HandlerState:
+    def __init__(self, name: str, event_type: str, handler: Handler):
+        self.name = name
+        self.event_type = event_type
+        self.handler = handler
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.last_event_id = 0
+        self.cursor = 0
+        self.saved_cursor = 0
+        self.last_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.handle_ms_total = 0.0
+
+    def safe_cursor(self) -> int:
+        """Highest id this handler can resume after without missing anything."""
+        if self.enqueued > self.processed + self.failed:
+            return max(self.cursor, self.last_event_id)
+        return max(self.cursor, self.last_event_id, _position)
+
+    def ensure_worker(self) -> None:
+        if self.task is not None and not self.task.done():
+            return
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=HANDLER_QUEUE_SIZE)
+        self.task = asyncio.create_task(self._work(), name=f"event-handler:{self.name}")
+
+    async def _work(self) -> None:
+        while True:
+            enqueued_at, event = await self.queue.get()
+            started = time.monotonic()
+            wait_ms = (started - enqueued_at) * 1000.0
+            self.last_wait_ms = wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            try:
+                with db_scope(f"event {self.name}"):
+                    await self.handler(event["payload"])
+                self.processed += 1
+            except Exception as exc:
+                self.failed += 1
+                print(f"⚠️ {self.name} handle failed (event {event['id']}): {exc}")
+            finally:
+                self.handle_ms_total += (time.monotonic() - started) * 1000.0
+                self.last_event_id = max(self.last_event_id, int(event["id"]))
+                self.queue.task_done()
+
+
+_handlers: Dict[str, _HandlerState] = {}
+# Highest event id the dispatcher has handed out (or skipped past on load).
+_position = 0
+
+
+def register_event_handler(event_type: str, handler: Handler, *, name: str) -> None:
+    """Route `event_type` payloads to `handler`; re-registering a name replaces it."""
+    previous = _handlers.get(name)
+    if previous is not None and previous.task is not None:
+        previous.task.cancel()
+    _handlers[name] = _HandlerState(name, event_type, handler)
+
+
+def event_types() -> Set[str]:
+    return {state.event_type for state in _handlers.values()}
+
+
+def start_handlers() -> None:
+    """Create queues + worker tasks (call from the running event loop)."""
+    for state in _handlers.values():
+        state.ensure_worker()
+
+
+async def load_cursors(head_id: int) -> int:
+    """
+    Seed handler cursors from event_consumers; handlers without a row start at
+    `head_id`. Returns the id to resume reading after (the slowest cursor).
+    """
+    global _position
+    stored = await aload_consumer_cursors(_handlers)
+    for name, state in _handlers.items():
+        state.cursor = stored.get(name, head_id)
+        # -1 forces a first write for consumers that have no row yet.
+        state.saved_cursor = state.cursor if name in stored else -1
+    _position = min((state.cursor for state in _handlers.values()), default=head_id)
+    return _position
+
+
+async def flush_cursors() -> int:
+    """Persist every cursor that moved since the last flush; returns how many."""
+    dirty = {
+        name: state.safe_cursor()
+        for name, state in _handlers.items()
+        if state.safe_cursor() > state.saved_cursor
+    }
+    if not dirty:
+        return 0
+    await asave_consumer_cursors(dirty)
+    for name, last_id in dirty.items():
+        _handlers[name].saved_cursor = last_id
+    return len(dirty)
+
+
+async def dispatch(event: Dict[str, Any]) -> None:
+    """Queue one event for every matching handler; waits while a queue is full."""
+    global _position
+    now = time.monotonic()
+    event_id = int(event["id"])
+    for state in list(_handlers.values()):
+        if state.event_type != event["event_type"] or event_id <= state.cursor:
+            continue
+        state.ensure_worker()
+        state.enqueued += 1
+        await state.queue.put((now, event))
+    _position = max(_position, event_id)
+
+
+def handler_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-handler throughput, queue depth and lag for /metrics."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, state in sorted(_handlers.items()):
+        done = state.processed + state.failed
+        out[name] = {
+            "event_type": state.event_type,
+            "processed": state.processed,
+            "failed": state.failed,
+            "queued": state.queue.qsize() if state.queue is not None else 0,
+            "last_event_id": state.last_event_id,
+            "cursor": state.saved_cursor,
+            "lag_events": state.enqueued - done,
+            "last_wait_ms": round(state.last_wait_ms, 2),
+            "max_wait_ms": round(state.max_wait_ms, 2),
+            "avg_handle_ms": round(state.handle_ms_total / done, 2) if done else 0.0,
+        }
+    return out
@@ -4,7 +4,7 @@ from typing import Any, Dict, Optional
 
 from utils.billboard_store import load_wars
 from utils.boards import ALL_BOARD_KEYS
-from utils.queue_store import list_parties
+from utils.queue_store import list_active_parties_for_member
 
 ACTIVE_PARTY_STATUSES = ("preparing", "posted", "matched")
 ACTIVE_WAR_STATUSES = ("open", "matched")
@@ -21,17 +21,14 @@ def find_blocking_lineup(
     exclude_war_id: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
     """Return another active lineup this user is on, or None if free to join."""
-    for party in list_parties():
-        if party.get("status") not in ACTIVE_PARTY_STATUSES:
-            continue
+    for party in list_active_parties_for_member(discord_id):
         if exclude_party_id and party.get("party_id") == exclude_party_id:
             continue
-        if _user_in_lineup(party.get("lineup", []), discord_id):
-            return {
-                "kind": "party",
-                "team_name": party.get("team_name", "Unknown"),
-                "status": party.get("status", "active"),
-            }
+        return {
+            "kind": "party",
+            "team_name": party.get("team_name", "Unknown"),
+            "status": party.get("status", "active"),
+        }
 
     for board in ALL_BOARD_KEYS:
         for war in load_wars(board):
@@ -0,0 +1,331 @@
+"""
+SQLite (WAL) engine behind the USE_JSON_STORES / no-Postgres fallback.
+
+Replaces the per-store `_load_all()` / `_save_all()` pairs that parsed and
+rewrote a whole temp/*.json file on every call. Two tables:
+
+- `documents` — keyed JSON docs per collection (parties, players, requests,
+  sessions, war results). Point reads/writes by key; listing keeps insert
+  order because upserts preserve the rowid.
+- `entries` — append-only JSON rows per collection (chat messages), indexed
+  by (collection, key, id) so paging one channel never reads the others.
+
+Every write commits on its own (crash-safe via the WAL) unless it runs inside
+transaction(), which utils.db.unit_of_work() uses in JSON mode.
+
+The first time a collection is touched, its legacy temp/*.json file (if any)
+is imported once; the file itself is left in place.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
+
+from utils.config import DATA_DIR
+
+LOCAL_STORE_PATH = os.getenv("LOCAL_STORE_PATH", "").strip() or os.path.join(
+    DATA_DIR, "local-store.sqlite3"
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+      collection TEXT NOT NULL,
+      key TEXT NOT NULL,
+      data TEXT NOT NULL,
+      PRIMARY KEY (collection, key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      collection TEXT NOT NULL,
+      key TEXT NOT NULL,
+      data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entries_collection_key ON entries (collection, key, id)",
+    """
+    CREATE TABLE IF NOT EXISTS legacy_imports (
+      collection TEXT PRIMARY KEY,
+      source TEXT NOT NULL,
+      imported_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready_for: Optional[str] = None
+
+# collection -> (legacy path, root key, key field or None for entries, entry key fn)
+_legacy: Dict[str, Tuple[str, str, Optional[str], Any]] = {}
+_imported: set[str] = set()
+_import_lock = threading.Lock()
+
+
+def _conn() -> sqlite3.Connection:
+    global _schema_ready_for
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "path", None) == LOCAL_STORE_PATH:
+        return conn
+    os.makedirs(os.path.dirname(LOCAL_STORE_PATH) or ".", exist_ok=True)
+    # isolation_level=None: we issue BEGIN/COMMIT ourselves.
+    conn = sqlite3.connect(LOCAL_STORE_PATH, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    with _schema_lock:
+        if _schema_ready_for != LOCAL_STORE_PATH:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            _schema_ready_for = LOCAL_STORE_PATH
+    _local.conn = conn
+    _local.path = LOCAL_STORE_PATH
+    _local.depth = 0
+    return conn
+
+
+@contextmanager
+def transaction() -> Generator[sqlite3.Connection, None, None]:
+    """
+    BEGIN IMMEDIATE … COMMIT around the block (rollback on error).
+    Nested calls join the outer transaction.
+    """
+    conn = _conn()
+    if _local.depth:
+        _local.depth += 1
+        try:
+            yield conn
+        finally:
+            _local.depth -= 1
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    _local.depth = 1
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        _local.depth = 0
+
+
+def register_legacy_json(
+    collection: str,
+    path: str,
+    root: str,
+    *,
+    key_field: Optional[str] = None,
+    entry_key: Any = None,
+) -> None:
+    """
+    Import `path` into `collection` the first time the collection is used.
+
+    `root` is the top-level key in the old file. Dict roots become documents
+    keyed by their dict key; list roots become documents keyed by
+    `key_field`, or entries keyed by `entry_key(row)` when that is given.
+    """
+    _legacy[collection] = (path, root, key_field, entry_key)
+
+
+def _ensure_imported(collection: str) -> None:
+    if collection in _imported or collection not in _legacy:
+        return
+    with _import_lock:
+        if collection in _imported:
+            return
+        path, root, key_field, entry_key = _legacy[collection]
+        with transaction() as conn:
+            done = conn.execute(
+                "SELECT 1 FROM legacy_imports WHERE collection = ?", (collection,)
+            ).fetchone()
+            if not done:
+                count = _import_file(conn, collection, path, root, key_field, entry_key)
+                conn.execute(
+                    "INSERT INTO legacy_imports (collection, source) VALUES (?, ?)",
+                    (collection, path),
+                )
+                if count:
+                    print(f"📦 Imported {count} {collection} row(s) from {os.path.basename(path)}")
+        _imported.add(collection)
+
+
+def _import_file(
+    conn: sqlite3.Connection,
+    collection: str,
+    path: str,
+    root: str,
+    key_field: Optional[str],
+    entry_key: Any,
+) -> int:
+    if not os.path.exists(path):
+        return 0
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            payload = json.load(handle).get(root)
+    except (json.JSONDecodeError, AttributeError):
+        return 0
+    if isinstance(payload, dict):
+        rows = [(str(key), doc) for key, doc in payload.items()]
+    elif isinstance(payload, list) and entry_key is not None:
+        ordered = sorted(payload, key=lambda row: row.get("id") or 0)
+        conn.executemany(
+            "INSERT INTO entries (collection, key, data) VALUES (?, ?, ?)",
+            [
+                (collection, entry_key(row), json.dumps({k: v for k, v in row.items() if k != "id"}))
+                for row in ordered
+            ],
+        )
+        return len(ordered)
+    elif isinstance(payload, list) and key_field:
+        rows = [(str(row.get(key_field)), row) for row in payload if row.get(key_field)]
+    else:
+        return 0
+    conn.executemany(
+        "INSERT OR REPLACE INTO documents (collection, key, data) VALUES (?, ?, ?)",
+        [(collection, key, json.dumps(doc)) for key, doc in rows],
+    )
+    return len(rows)
+
+
+def _write(statement: str, params: Iterable[Any]) -> sqlite3.Cursor:
+    with transaction() as conn:
+        return conn.execute(statement, tuple(params))
+
+
+# ---------------------------------------------------------------------------
+# documents
+# ---------------------------------------------------------------------------
+def get_doc(collection: str, key: Any) -> Optional[Dict[str, Any]]:
+    _ensure_imported(collection)
+    row = _conn().execute(
+        "SELECT data FROM documents WHERE collection = ? AND key = ?",
+        (collection, str(key)),
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def get_docs(collection: str, keys: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+    _ensure_imported(collection)
+    wanted = list({str(key) for key in keys})
+    found: Dict[str, Dict[str, Any]] = {}
+    conn = _conn()
+    # SQLite caps bound parameters; 500 stays well under every build's limit.
+    for start in range(0, len(wanted), 500):
+        chunk = wanted[start : start + 500]
+        marks = ", ".join("?" * len(chunk))
+        for key, data in conn.execute(
+            f"SELECT key, data FROM documents WHERE collection = ? AND key IN ({marks})",
+            (collection, *chunk),
+        ):
+            found[key] = json.loads(data)
+    return found
+
+
+def list_docs(collection: str) -> List[Dict[str, Any]]:
+    """All docs in first-insert order."""
+    _ensure_imported(collection)
+    rows = _conn().execute(
+        "SELECT data FROM documents WHERE collection = ? ORDER BY rowid",
+        (collection,),
+    ).fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+
+def put_doc(collection: str, key: Any, doc: Dict[str, Any]) -> None:
+    put_docs(collection, {key: doc})
+
+
+def put_docs(collection: str, docs: Dict[Any, Dict[str, Any]]) -> None:
+    _ensure_imported(collection)
+    with transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO documents (collection, key, data) VALUES (?, ?, ?)
+            ON CONFLICT (collection, key) DO UPDATE SET data = excluded.data
+            """,
+            [(collection, str(key), json.dumps(doc)) for key, doc in docs.items()],
+        )
+
+
+def delete_doc(collection: str, key: Any) -> bool:
+    _ensure_imported(collection)
+    cursor = _write(
+        "DELETE FROM documents WHERE collection = ? AND key = ?",
+        (collection, str(key)),
+    )
+    return cursor.rowcount > 0
+
+
+def replace_docs(collection: str, docs: Dict[Any, Dict[str, Any]]) -> None:
+    """Swap the whole collection atomically (rebuild jobs)."""
+    _ensure_imported(collection)
+    with transaction() as conn:
+        conn.execute("DELETE FROM documents WHERE collection = ?", (collection,))
+        put_docs(collection, docs)
+
+
+# ---------------------------------------------------------------------------
+# entries (append-only)
+# ---------------------------------------------------------------------------
+def append_entry(collection: str, key: str, doc: Dict[str, Any]) -> int:
+    """O(1) append; returns the new entry id."""
+    _ensure_imported(collection)
+    cursor = _write(
+        "INSERT INTO entries (collection, key, data) VALUES (?, ?, ?)",
+        (collection, key, json.dumps(doc)),
+    )
+    return int(cursor.lastrowid)
+
+
+def list_entries(
+    collection: str,
+    key: Optional[str] = None,
+    *,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """`(id, doc)` oldest-first; with `limit`, the newest `limit` of them."""
+    _ensure_imported(collection)
+    clauses = ["collection = ?"]
+    params: List[Any] = [collection]
+    if key is not None:
+        clauses.append("key = ?")
+        params.append(key)
+    if before_id:
+        clauses.append("id < ?")
+        params.append(int(before_id))
+    sql = f"SELECT id, data FROM entries WHERE {' AND '.join(clauses)} ORDER BY id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    rows = _conn().execute(sql, params).fetchall()
+    return [(int(row[0]), json.loads(row[1])) for row in reversed(rows)]
+
+
+def read_legacy_shape(path: str) -> Optional[Dict[str, Any]]:
+    """
+    The data registered for a legacy temp/*.json path, in that file's old
+    shape (for scripts/import_temp_to_cloudsql.py). None if not registered.
+    """
+    for collection, (legacy_path, root, key_field, entry_key) in _legacy.items():
+        if os.path.abspath(legacy_path) != os.path.abspath(path):
+            continue
+        if entry_key is not None:
+            return {root: [{**doc, "id": entry_id} for entry_id, doc in list_entries(collection)]}
+        _ensure_imported(collection)
+        rows = _conn().execute(
+            "SELECT key, data FROM documents WHERE collection = ? ORDER BY rowid",
+            (collection,),
+        ).fetchall()
+        if key_field:
+            return {root: [json.loads(data) for _, data in rows]}
+        return {root: {key: json.loads(data) for key, data in rows}}
+    return None
@@ -1,33 +1,29 @@
-"""Match chat messages — Postgres match_messages or temp JSON fallback."""
+"""Match chat messages — Postgres match_messages or the local store (utils.local_store)."""
 
 from __future__ import annotations
 
-import json
 import os
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from utils import local_store
 from utils.config import DATA_DIR
-from utils.db import get_conn, use_json_stores
+from utils.db import get_conn, unit_of_work, use_json_stores
 
 STORE_PATH = os.path.join(DATA_DIR, "match-messages.json")
+_LOCAL = "match_messages"
 
 
-def _load_all() -> Dict[str, Any]:
-    if not os.path.exists(STORE_PATH):
-        return {"messages": []}
-    try:
-        with open(STORE_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if "messages" in data else {"messages": []}
-    except json.JSONDecodeError:
-        return {"messages": []}
+def _local_key(session_id: str, channel: str) -> str:
+    return f"{session_id}:{channel}"
 
 
-def _save_all(data: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(STORE_PATH), exist_ok=True)
-    with open(STORE_PATH, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, ensure_ascii=False)
+local_store.register_legacy_json(
+    _LOCAL,
+    STORE_PATH,
+    "messages",
+    entry_key=lambda msg: _local_key(msg.get("session_id"), msg.get("channel")),
+)
 
 
 def append_message(
@@ -38,7 +34,9 @@ def append_message(
     author_discord_id: Optional[int] = None,
     author_name: Optional[str] = None,
     source: str = "web",
+    session: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
+    """`session` (if the caller already loaded it) scopes the chat event to its players."""
     channel = "group" if channel == "group" else "match"
     msg = {
         "session_id": session_id,
@@ -50,14 +48,12 @@ def append_message(
         "created_at": datetime.utcnow().isoformat(),
     }
     if use_json_stores():
-        data = _load_all()
-        msg["id"] = len(data["messages"]) + 1
-        data["messages"].append(msg)
-        _save_all(data)
-        _publish_event("chat", msg)
+        msg["id"] = local_store.append_entry(_LOCAL, _local_key(session_id, channel), msg)
+        _publish_chat(msg, session)
         return msg
 
-    with get_conn() as conn:
+    # The message row and its chat event commit together on one connection.
+    with unit_of_work(), get_conn() as conn:
         cursor = conn.cursor()
         try:
             cursor.execute(
@@ -80,7 +76,7 @@ def append_message(
             msg["created_at"] = row[1].isoformat() if hasattr(row[1], "isoformat") else str(row[1])
         finally:
             cursor.close()
-    _publish_event("chat", msg)
+        _publish_chat(msg, session)
     return msg
 
 
@@ -93,15 +89,15 @@ def list_messages(
 ) -> List[Dict[str, Any]]:
     channel = "group" if channel == "group" else "match"
     if use_json_stores():
-        rows = [
-            m
-            for m in _load_all()["messages"]
-            if m.get("session_id") == session_id and m.get("channel") == channel
+        return [
+            {**msg, "id": entry_id}
+            for entry_id, msg in local_store.list_entries(
+                _LOCAL,
+                _local_key(session_id, channel),
+                before_id=before_id,
+                limit=limit,
+            )
         ]
-        rows.sort(key=lambda m: m.get("id") or 0)
-        if before_id:
-            rows = [m for m in rows if int(m.get("id") or 0) < before_id]
-        return rows[-limit:]
 
     with get_conn() as conn:
         cursor = conn.cursor()
@@ -145,7 +141,19 @@ def list_messages(
     return out
 
 
-def _publish_event(event_type: str, payload: Dict[str, Any]) -> None:
-    from utils.event_bus import publish_event
-
-    publish_event(event_type, payload)
\ No newline at end of file
+def _publish_chat(msg: Dict[str, Any], session: Optional[Dict[str, Any]]) -> None:
+    from utils.event_bus import event_audience, publish_event
+    from utils.match_session_store import get_session, session_roster_ids
+
+    if session is None:
+        session = get_session(msg["session_id"]) or {}
+    # Group chat is team-only: route it to the author's roster alone.
+    author = msg.get("author_discord_id") if msg["channel"] == "group" else None
+    publish_event(
+        "chat",
+        msg,
+        audience=event_audience(
+            discord_ids=session_roster_ids(session, author_discord_id=author),
+            session_id=msg["session_id"],
+        ),
+    )
\ No newline at end of file
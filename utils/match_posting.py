@@ -3,7 +3,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from classes.player import Player
 from classes.war import War
-from utils.billboard_store import find_post_by_party_id, upsert_war
+from utils.billboard_store import find_post_by_party_id, patch_war
 from utils.roster import SEARCH_ALLIES, SEARCH_OPPONENTS, can_seek_opponents, reconcile_search_mode
 from utils.search_time import opponent_search_unlocked
 
@@ -59,21 +59,28 @@ def sync_billboard_post_from_party(party: Dict[str, Any]) -> Optional[Tuple[str,
         return None
 
     board, war = found
-    war["lineup"] = list(party.get("lineup", []))
-    war["ally_count"] = sum(1 for player in war["lineup"] if player.get("ally"))
-    war["last_updated"] = datetime.utcnow().isoformat()
-    war["start_time"] = party.get("search_time", war.get("start_time", "ASAP"))
+    lineup = list(party.get("lineup", []))
+    changes: Dict[str, Any] = {
+        "lineup": lineup,
+        "ally_count": sum(1 for player in lineup if player.get("ally")),
+        "last_updated": datetime.utcnow().isoformat(),
+        "start_time": party.get("search_time", war.get("start_time", "ASAP")),
+    }
     if party.get("created_at") and not war.get("created_at"):
-        war["created_at"] = party["created_at"]
+        changes["created_at"] = party["created_at"]
+    war.update(changes)
 
-    war["search_mode"] = reconcile_search_mode(
+    search_mode = reconcile_search_mode(
         war.get("search_mode", SEARCH_ALLIES),
         war["lineup"],
         **_schedule_kwargs({**war, **party}),
     )
-    party["search_mode"] = war["search_mode"]
+    if search_mode != war.get("search_mode"):
+        changes["search_mode"] = search_mode
+    war["search_mode"] = search_mode
+    party["search_mode"] = search_mode
 
-    upsert_war(board, war)
+    patch_war(board, war["war_id"], changes)
     return board, war
 
 
@@ -82,7 +89,7 @@ def promote_due_opponent_searches() -> List[Tuple[str, Dict[str, Any]]]:
     Flip posted ally searches to Looking For Opponents once roster + schedule allow it.
     Returns list of (board, war) that changed.
     """
-    from utils.queue_store import list_parties, upsert_party
+    from utils.queue_store import list_parties, patch_party
 
     promoted: List[Tuple[str, Dict[str, Any]]] = []
     for party in list_parties():
@@ -104,18 +111,22 @@ def promote_due_opponent_searches() -> List[Tuple[str, Dict[str, Any]]]:
         if not found:
             continue
 
-        party["search_mode"] = SEARCH_OPPONENTS
-        upsert_party(party)
+        party_changes: Dict[str, Any] = {"search_mode": SEARCH_OPPONENTS}
+        patch_party(party["party_id"], party_changes)
+        party.update(party_changes)
 
         board, war = found
-        war["lineup"] = list(lineup)
-        war["ally_count"] = sum(1 for player in lineup if player.get("ally"))
-        war["search_mode"] = SEARCH_OPPONENTS
-        war["start_time"] = party.get("search_time", war.get("start_time", "ASAP"))
-        war["last_updated"] = datetime.utcnow().isoformat()
+        changes: Dict[str, Any] = {
+            "lineup": list(lineup),
+            "ally_count": sum(1 for player in lineup if player.get("ally")),
+            "search_mode": SEARCH_OPPONENTS,
+            "start_time": party.get("search_time", war.get("start_time", "ASAP")),
+            "last_updated": datetime.utcnow().isoformat(),
+        }
         if party.get("created_at"):
-            war["created_at"] = party["created_at"]
-        upsert_war(board, war)
+            changes["created_at"] = party["created_at"]
+        war.update(changes)
+        patch_war(board, war["war_id"], changes)
         promoted.append((board, war))
 
     return promoted
@@ -5,6 +5,7 @@ from typing import Optional
 import interactions
 from interactions import Modal, ParagraphText, ShortText
 
+from utils import discord_outbound as outbound
 from utils.billboard_store import find_war_across_boards
 from utils.match_session_store import get_session_by_channel
 from utils.war_abort import abort_matched_war
@@ -92,7 +93,7 @@ async def send_to_guild_war_channel(bot, session: dict, guild_id: int, content:
         return
     try:
         channel = await bot.fetch_channel(channel_id)
-        await channel.send(content)
+        await outbound.send(channel, priority=outbound.PRIORITY_MATCH, content=content)
     except Exception as exc:
         print(f"❌ Failed to send to war channel {channel_id}: {exc}")
 
@@ -259,7 +260,8 @@ async def handle_complete(
         rxx=rxx,
         rxx_error=rxx_error,
     )
-    from utils.event_bus import publish_event
+    from utils.event_bus import event_audience, publish_event
+    from utils.match_session_store import session_roster_ids
 
     publish_event(
         "match_completion",
@@ -268,6 +270,9 @@ async def handle_complete(
             "status": "collecting_scores",
             "manual_fallback": True,
         },
+        audience=event_audience(
+            discord_ids=session_roster_ids(session), session_id=session.get("session_id")
+        ),
     )
     await m_ctx.send(
         f"RXX lookup failed — manual score entry required.\n"
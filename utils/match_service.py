@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional
 import interactions
 from interactions import PermissionOverwrite, Permissions
 
+from utils import discord_outbound as outbound
 from utils.billboard_store import upsert_war
 from utils.boards import board_key as board_for_war
 from utils.guild_config import get_guild_config
@@ -185,7 +186,11 @@ async def create_war_comm_channels(
                 permission_overwrites=await _channel_overwrites(guild_a, roster_a, bot),
                 topic=f"War comms vs {requester_war.get('team_name')} — messages relay to their server",
             )
-            await channel_a.send(_match_intro(requester_war.get("team_name")))
+            await outbound.send(
+                channel_a,
+                priority=outbound.PRIORITY_MATCH,
+                content=_match_intro(requester_war.get("team_name")),
+            )
         except Exception as exc:
             print(f"❌ create_war_comm_channels guild_a failed: {exc}")
             return None
@@ -202,7 +207,11 @@ async def create_war_comm_channels(
                 permission_overwrites=await _channel_overwrites(guild_b, roster_b, bot),
                 topic=f"War comms vs {target_war.get('team_name')} — messages relay to their server",
             )
-            await channel_b.send(_match_intro(target_war.get("team_name")))
+            await outbound.send(
+                channel_b,
+                priority=outbound.PRIORITY_MATCH,
+                content=_match_intro(target_war.get("team_name")),
+            )
         except Exception as exc:
             # Web requesters often have no usable Discord guild channel — target-side only is OK.
             print(f"❌ create_war_comm_channels guild_b failed: {exc}")
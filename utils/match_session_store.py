@@ -1,4 +1,4 @@
-"""Match sessions — Postgres match_sessions or temp/match-sessions.json."""
+"""Match sessions — Postgres match_sessions or the local store (utils.local_store)."""
 
 from __future__ import annotations
 
@@ -8,10 +8,13 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from utils import local_store
 from utils.config import DATA_DIR
-from utils.db import get_conn, use_json_stores
+from utils.db import get_aconn, get_conn, use_json_stores
 
 MATCH_SESSIONS_PATH = os.path.join(DATA_DIR, "match-sessions.json")
+_LOCAL = "match_sessions"
+local_store.register_legacy_json(_LOCAL, MATCH_SESSIONS_PATH, "sessions")
 
 
 def _parse(value: Any) -> Dict[str, Any]:
@@ -22,26 +25,10 @@ def _parse(value: Any) -> Dict[str, Any]:
     return {}
 
 
-def _load_all() -> Dict[str, Any]:
-    if not os.path.exists(MATCH_SESSIONS_PATH):
-        return {"sessions": {}}
-    try:
-        with open(MATCH_SESSIONS_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if "sessions" in data else {"sessions": {}}
-    except json.JSONDecodeError:
-        return {"sessions": {}}
-
-
-def _save_all(data: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(MATCH_SESSIONS_PATH), exist_ok=True)
-    with open(MATCH_SESSIONS_PATH, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, ensure_ascii=False)
-
-
-def _all_sessions() -> List[Dict[str, Any]]:
+def list_sessions() -> List[Dict[str, Any]]:
+    """Every match session (API /matches/me filters by participant)."""
     if use_json_stores():
-        return list(_load_all()["sessions"].values())
+        return local_store.list_docs(_LOCAL)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
@@ -54,7 +41,7 @@ def _all_sessions() -> List[Dict[str, Any]]:
 
 def get_session(session_id: str) -> Optional[Dict[str, Any]]:
     if use_json_stores():
-        return _load_all()["sessions"].get(session_id)
+        return local_store.get_doc(_LOCAL, session_id)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
@@ -68,8 +55,22 @@ def get_session(session_id: str) -> Optional[Dict[str, Any]]:
     return _parse(row[0]) if row else None
 
 
+async def aget_session(session_id: str) -> Optional[Dict[str, Any]]:
+    """get_session() for async handlers."""
+    if use_json_stores():
+        return get_session(session_id)
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                "SELECT data FROM match_sessions WHERE session_id = %s",
+                (session_id,),
+            )
+            row = await cursor.fetchone()
+    return _parse(row[0]) if row else None
+
+
 def get_session_by_channel(channel_id: int) -> Optional[Dict[str, Any]]:
-    for session in _all_sessions():
+    for session in list_sessions():
         if channel_id in (
             session.get("channel_a_id"),
             session.get("channel_b_id"),
@@ -79,15 +80,28 @@ def get_session_by_channel(channel_id: int) -> Optional[Dict[str, Any]]:
 
 
 def get_session_by_war_id(war_id: str) -> Optional[Dict[str, Any]]:
-    for session in _all_sessions():
+    for session in list_sessions():
         if war_id in (session.get("war_a_id"), session.get("war_b_id")):
             return session
     return None
 
 
+def session_roster_ids(session: Dict[str, Any], *, author_discord_id: Any = None) -> List[int]:
+    """Both rosters, or only the side `author_discord_id` plays on when given."""
+    sides = [
+        [int(x) for x in session.get("roster_a_ids", [])],
+        [int(x) for x in session.get("roster_b_ids", [])],
+    ]
+    if author_discord_id is not None:
+        for side in sides:
+            if int(author_discord_id) in side:
+                return side
+    return sides[0] + sides[1]
+
+
 def get_session_for_user(discord_id: int) -> Optional[Dict[str, Any]]:
     did = int(discord_id)
-    for session in _all_sessions():
+    for session in list_sessions():
         if did in [int(x) for x in session.get("roster_a_ids", [])] or did in [
             int(x) for x in session.get("roster_b_ids", [])
         ]:
@@ -97,12 +111,7 @@ def get_session_for_user(discord_id: int) -> Optional[Dict[str, Any]]:
 
 def delete_session(session_id: str) -> bool:
     if use_json_stores():
-        data = _load_all()
-        if session_id not in data["sessions"]:
-            return False
-        del data["sessions"][session_id]
-        _save_all(data)
-        return True
+        return local_store.delete_doc(_LOCAL, session_id)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
@@ -114,9 +123,7 @@ def delete_session(session_id: str) -> bool:
 
 def upsert_session(session: Dict[str, Any]) -> Dict[str, Any]:
     if use_json_stores():
-        data = _load_all()
-        data["sessions"][session["session_id"]] = session
-        _save_all(data)
+        local_store.put_doc(_LOCAL, session["session_id"], session)
         return session
     with get_conn() as conn:
         cursor = conn.cursor()
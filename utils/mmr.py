@@ -1,7 +1,8 @@
 """MMR helpers — track+role ratings, team averages, ranked war adjustments."""
 
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+from utils.db import current_unit_of_work
 from utils.player_store import DEFAULT_PLAYER_MMR, apply_player_delta, get_player, get_rating
 
 DEFAULT_MMR = DEFAULT_PLAYER_MMR
@@ -91,7 +92,10 @@ def apply_ranked_war_mmr(
         team_delta = max(abs(v) for v in win_d.values()) if win_d else 1
         return team_delta, per_player
     except Exception:
-        pass
+        # In a unit_of_work() the failed statement aborted the transaction,
+        # so the Elo fallback below could not write either.
+        if current_unit_of_work() is not None:
+            raise
 
     team_delta = calculate_team_mmr_delta(
         winner_lineup, loser_lineup, point_margin, war_type=war_type
@@ -125,32 +129,53 @@ def apply_ranked_war_mmr(
     return team_delta, per_player
 
 
-def format_average_rank(lineup: List[Dict[str, Any]], war_type: str = "RT") -> str:
-    """Discord-facing team rank: TrueSkill tier + emoji (matches web opponent cards)."""
-    from utils.rank_icons import emoji_mention
-    from utils.sr import get_player_rating, rank_for_sr, tier_label
+def lineup_rank_key(
+    lineup: List[Dict[str, Any]],
+    war_type: str = "RT",
+    ratings: Optional[Dict[int, Dict[str, Dict[str, Any]]]] = None,
+) -> str:
+    """
+    Revealed rank of the lineup's average SR. `ratings` is a
+    get_player_ratings_for_ids() result for this track (fetched in one query
+    when omitted).
+    """
+    from utils.sr import get_player_ratings_for_ids, rank_for_sr
 
-    scores: List[int] = []
-    for entry in lineup or []:
-        did = entry.get("discord_id")
-        if did is None:
-            continue
+    entries = [entry for entry in lineup or [] if entry.get("discord_id") is not None]
+    if ratings is None:
         try:
-            rating = get_player_rating(
-                int(did),
-                war_type,
-                bagger=bool(entry.get("bagger") or str(entry.get("role") or "").lower() == "bagger"),
-                role=entry.get("role"),
-            )
-            if rating.get("sr") is not None:
-                scores.append(int(rating["sr"]))
+            ratings = get_player_ratings_for_ids([e["discord_id"] for e in entries], war_type)
         except Exception:
+            ratings = {}
+
+    scores: List[int] = []
+    for entry in entries:
+        try:
+            lanes = ratings.get(int(entry["discord_id"])) or {}
+        except (TypeError, ValueError):
             continue
-    rank_key = (
-        rank_for_sr(int(round(sum(scores) / len(scores))), revealed=True)
-        if scores
-        else "unranked"
-    )
+        bagger = entry.get("bagger") or str(entry.get("role") or "").lower() == "bagger"
+        rating = lanes.get("bagger" if bagger else "runner")
+        if rating and rating.get("sr") is not None:
+            scores.append(int(rating["sr"]))
+    if not scores:
+        return "unranked"
+    return rank_for_sr(int(round(sum(scores) / len(scores))), revealed=True)
+
+
+def format_average_rank(
+    lineup: List[Dict[str, Any]],
+    war_type: str = "RT",
+    ratings: Optional[Dict[int, Dict[str, Dict[str, Any]]]] = None,
+    *,
+    rank_key: Optional[str] = None,
+) -> str:
+    """Discord-facing team rank: TrueSkill tier + emoji (matches web opponent cards)."""
+    from utils.rank_icons import emoji_mention
+    from utils.sr import tier_label
+
+    if rank_key is None:
+        rank_key = lineup_rank_key(lineup, war_type, ratings)
     emoji = emoji_mention(rank_key)
     label = tier_label(rank_key)
     if emoji:
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, Optional
 
-from utils.event_bus import publish_event
+from utils.event_bus import event_audience, publish_event
 
 
 def publish_party_sync(
@@ -27,11 +27,12 @@ def publish_party_sync(
       - post: ensure hub post is visible/up to date
     """
     p = party or {}
+    party_id = party_id or p.get("party_id")
     publish_event(
         "party_sync",
         {
             "action": action,
-            "party_id": party_id or p.get("party_id"),
+            "party_id": party_id,
             "board": board,
             "war_id": war_id or p.get("match_post_id"),
             "lobby_channel_id": lobby_channel_id
@@ -42,4 +43,5 @@ def publish_party_sync(
             else p.get("lobby_message_id"),
             "guild_id": p.get("guild_id"),
         },
+        audience=event_audience(party_id=party_id, board=board),
     )
@@ -1,16 +1,19 @@
-"""Player MMR / ratings — Postgres `players` table or temp/player-mmr.json."""
+"""Player MMR / ratings — Postgres `players` table or the local store (utils.local_store)."""
 
 from __future__ import annotations
 
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from utils import local_store
 from utils.config import DATA_DIR
-from utils.db import get_conn, use_json_stores
+from utils.db import get_conn, multi_values, use_json_stores
 
 DEFAULT_PLAYER_MMR = 10_000
 PLAYER_STORE_PATH = os.path.join(DATA_DIR, "player-mmr.json")
+_LOCAL = "players"
+local_store.register_legacy_json(_LOCAL, PLAYER_STORE_PATH, "players")
 
 TRACKS = ("rt", "ct")
 ROLES = ("runner", "bagger")
@@ -137,64 +140,61 @@ def _row_to_player(row: tuple) -> Dict[str, Any]:
     )
 
 
-def _load_all() -> Dict[str, Any]:
-    if not os.path.exists(PLAYER_STORE_PATH):
-        return {"players": {}}
-    try:
-        with open(PLAYER_STORE_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if "players" in data else {"players": {}}
-    except json.JSONDecodeError:
-        return {"players": {}}
+_UPSERT_PLAYERS_CHUNK = 500
 
 
-def _save_all(data: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(PLAYER_STORE_PATH), exist_ok=True)
-    with open(PLAYER_STORE_PATH, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, ensure_ascii=False)
-
-
-def _db_upsert_player(player: Dict[str, Any]) -> None:
-    shaped = _ensure_player_shape(dict(player))
-    discord_id = int(shaped["discord_id"])
+def _db_upsert_players(players: Iterable[Dict[str, Any]]) -> None:
+    """Upsert many players with one multi-row statement per chunk."""
+    rows = []
+    for player in players:
+        shaped = _ensure_player_shape(dict(player))
+        rows.append(
+            (
+                int(shaped["discord_id"]),
+                int(shaped["mmr"]),
+                int(shaped["wins"]),
+                int(shaped["losses"]),
+                json.dumps(shaped["ratings"]),
+                json.dumps(shaped["record"]),
+            )
+        )
+    if not rows:
+        return
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
-            cursor.execute(
-                """
-                INSERT INTO players (
-                  discord_id, mmr, wins, losses, ratings, record, updated_at
-                ) VALUES (
-                  %s, %s, %s, %s, %s::jsonb, %s::jsonb, NOW()
+            for start in range(0, len(rows), _UPSERT_PLAYERS_CHUNK):
+                chunk = rows[start : start + _UPSERT_PLAYERS_CHUNK]
+                params = [value for row in chunk for value in row]
+                cursor.execute(
+                    f"""
+                    INSERT INTO players (
+                      discord_id, mmr, wins, losses, ratings, record, updated_at
+                    ) VALUES {multi_values("(%s, %s, %s, %s, %s::jsonb, %s::jsonb, NOW())", len(chunk))}
+                    ON CONFLICT (discord_id) DO UPDATE SET
+                      mmr = EXCLUDED.mmr,
+                      wins = EXCLUDED.wins,
+                      losses = EXCLUDED.losses,
+                      ratings = EXCLUDED.ratings,
+                      record = EXCLUDED.record,
+                      updated_at = NOW()
+                    """,
+                    tuple(params),
                 )
-                ON CONFLICT (discord_id) DO UPDATE SET
-                  mmr = EXCLUDED.mmr,
-                  wins = EXCLUDED.wins,
-                  losses = EXCLUDED.losses,
-                  ratings = EXCLUDED.ratings,
-                  record = EXCLUDED.record,
-                  updated_at = NOW()
-                """,
-                (
-                    discord_id,
-                    int(shaped["mmr"]),
-                    int(shaped["wins"]),
-                    int(shaped["losses"]),
-                    json.dumps(shaped["ratings"]),
-                    json.dumps(shaped["record"]),
-                ),
-            )
         finally:
             cursor.close()
 
 
+def _db_upsert_player(player: Dict[str, Any]) -> None:
+    _db_upsert_players([player])
+
+
 def get_player(discord_id: int) -> Dict[str, Any]:
     if use_json_stores():
-        data = _load_all()
-        key = str(discord_id)
-        if key not in data["players"]:
+        stored = local_store.get_doc(_LOCAL, discord_id)
+        if stored is None:
             return _blank_player(discord_id)
-        return _ensure_player_shape(dict(data["players"][key]))
+        return _ensure_player_shape(stored)
 
     with get_conn() as conn:
         cursor = conn.cursor()
@@ -214,6 +214,35 @@ def get_player(discord_id: int) -> Dict[str, Any]:
     return _row_to_player(row)
 
 
+def get_players(discord_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Many players in one round-trip; unknown ids come back blank."""
+    ids = sorted({int(did) for did in discord_ids})
+    out = {did: _blank_player(did) for did in ids}
+    if use_json_stores():
+        for key, stored in local_store.get_docs(_LOCAL, ids).items():
+            out[int(key)] = _ensure_player_shape(stored)
+        return out
+    if not ids:
+        return out
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT discord_id, mmr, wins, losses, ratings, record
+                FROM players WHERE discord_id = ANY(%s)
+                """,
+                (ids,),
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    for row in rows:
+        player = _row_to_player(row)
+        out[int(player["discord_id"])] = player
+    return out
+
+
 def get_rating(
     discord_id: int,
     war_type: str,
@@ -227,16 +256,16 @@ def get_rating(
     return int(player["ratings"][track][role_key])
 
 
-def apply_player_delta(
-    discord_id: int,
+def _apply_delta(
+    current: Dict[str, Any],
     mmr_delta: int,
     won: bool,
     *,
-    war_type: str = "RT",
-    bagger: bool = False,
-    role: Optional[str] = None,
+    war_type: str,
+    bagger: bool,
+    role: Optional[str],
 ) -> Dict[str, Any]:
-    current = _ensure_player_shape(get_player(discord_id))
+    current = _ensure_player_shape(current)
     track = _normalize_track(war_type)
     role_key = _normalize_role(bagger=bagger, role=role)
 
@@ -251,17 +280,63 @@ def apply_player_delta(
     current["wins"] = sum(current["record"][t][r]["wins"] for t in TRACKS for r in ROLES)
     current["losses"] = sum(current["record"][t][r]["losses"] for t in TRACKS for r in ROLES)
     current["mmr"] = _average_ratings(current["ratings"])
+    return current
+
+
+def apply_player_delta(
+    discord_id: int,
+    mmr_delta: int,
+    won: bool,
+    *,
+    war_type: str = "RT",
+    bagger: bool = False,
+    role: Optional[str] = None,
+) -> Dict[str, Any]:
+    current = _apply_delta(
+        get_player(discord_id),
+        mmr_delta,
+        won,
+        war_type=war_type,
+        bagger=bagger,
+        role=role,
+    )
     current["discord_id"] = discord_id
 
     if use_json_stores():
-        data = _load_all()
-        data["players"][str(discord_id)] = current
-        _save_all(data)
+        local_store.put_doc(_LOCAL, discord_id, current)
     else:
         _db_upsert_player(current)
     return current
 
 
+def apply_player_deltas(
+    deltas: List[Dict[str, Any]],
+    *,
+    war_type: str = "RT",
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Batch apply_player_delta() for a whole war: one read, one write.
+    Each entry: {"discord_id", "delta", "won", "bagger", "role"}.
+    """
+    players = get_players(int(entry["discord_id"]) for entry in deltas)
+    for entry in deltas:
+        did = int(entry["discord_id"])
+        players[did] = _apply_delta(
+            players[did],
+            int(entry["delta"]),
+            bool(entry["won"]),
+            war_type=war_type,
+            bagger=bool(entry.get("bagger")),
+            role=entry.get("role"),
+        )
+        players[did]["discord_id"] = did
+    if use_json_stores():
+        local_store.put_docs(_LOCAL, players)
+    else:
+        _db_upsert_players(players.values())
+    return players
+
+
 def set_player_mmr(discord_id: int, mmr: int) -> Dict[str, Any]:
     """Set all four ratings to the same value (admin/dev helper)."""
     current = _ensure_player_shape(get_player(discord_id))
@@ -271,9 +346,7 @@ def set_player_mmr(discord_id: int, mmr: int) -> Dict[str, Any]:
     current["discord_id"] = discord_id
 
     if use_json_stores():
-        data = _load_all()
-        data["players"][str(discord_id)] = current
-        _save_all(data)
+        local_store.put_doc(_LOCAL, discord_id, current)
     else:
         _db_upsert_player(current)
     return current
@@ -282,41 +355,15 @@ def set_player_mmr(discord_id: int, mmr: int) -> Dict[str, Any]:
 def replace_all_players(players: Dict[str, Any]) -> None:
     """Bulk replace player MMR rows (used by rebuild)."""
     if use_json_stores():
-        _save_all({"players": players})
+        local_store.replace_docs(_LOCAL, players)
         return
 
-    with get_conn() as conn:
-        cursor = conn.cursor()
-        try:
-            for key, player in players.items():
-                shaped = _ensure_player_shape(dict(player))
-                shaped["discord_id"] = int(shaped.get("discord_id") or key)
-                cursor.execute(
-                    """
-                    INSERT INTO players (
-                      discord_id, mmr, wins, losses, ratings, record, updated_at
-                    ) VALUES (
-                      %s, %s, %s, %s, %s::jsonb, %s::jsonb, NOW()
-                    )
-                    ON CONFLICT (discord_id) DO UPDATE SET
-                      mmr = EXCLUDED.mmr,
-                      wins = EXCLUDED.wins,
-                      losses = EXCLUDED.losses,
-                      ratings = EXCLUDED.ratings,
-                      record = EXCLUDED.record,
-                      updated_at = NOW()
-                    """,
-                    (
-                        int(shaped["discord_id"]),
-                        int(shaped["mmr"]),
-                        int(shaped["wins"]),
-                        int(shaped["losses"]),
-                        json.dumps(shaped["ratings"]),
-                        json.dumps(shaped["record"]),
-                    ),
-                )
-        finally:
-            cursor.close()
+    shaped_players = []
+    for key, player in players.items():
+        shaped = dict(player)
+        shaped["discord_id"] = int(shaped.get("discord_id") or key)
+        shaped_players.append(shaped)
+    _db_upsert_players(shaped_players)
 
 
 def rebuild_players_from_war_results() -> Dict[str, Any]:
@@ -337,13 +384,11 @@ def rebuild_players_from_war_results() -> Dict[str, Any]:
         return players[key]
 
     results = sorted(
-        list_results(),
+        list_results(mode="ranked"),
         key=lambda row: row.get("completed_at") or "",
     )
     applied = 0
     for result in results:
-        if str(result.get("mode", "ranked")).lower() != "ranked":
-            continue
         war_type = result.get("war_type", "RT")
         team_delta = int(result.get("team_mmr_delta") or 0)
         if team_delta == 0:
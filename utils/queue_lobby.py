@@ -1,5 +1,6 @@
 """Refresh the team-server queue lobby Discord message."""
 
+from utils import discord_outbound as outbound
 from utils.embeds import build_queue_party_embed
 from utils.queue_buttons import build_queue_party_buttons
 
@@ -13,7 +14,9 @@ async def refresh_queue_lobby_message(bot, party: dict) -> None:
     try:
         channel = await bot.fetch_channel(channel_id)
         message = await channel.fetch_message(message_id)
-        await message.edit(
+        await outbound.edit(
+            message,
+            priority=outbound.PRIORITY_BILLBOARD,
             embeds=build_queue_party_embed(party),
             components=build_queue_party_buttons(party),
         )
@@ -2,9 +2,10 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 from utils.billboard_store import delete_war, find_post_by_party_id, upsert_war
+from utils.db import unit_of_work
 from utils.match_service import board_for_party
 from utils.match_posting import create_match_post_from_party
-from utils.queue_store import delete_party, get_party, list_parties, upsert_party
+from utils.queue_store import delete_party, get_party, list_parties, patch_party, upsert_party
 from utils.roster import (
     SEARCH_ALLIES,
     SEARCH_OPPONENTS,
@@ -114,17 +115,19 @@ def _restore_queue_surfaces(party: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _publish_unhide_queue(party: Dict[str, Any]) -> None:
-    from utils.event_bus import publish_event
+    from utils.event_bus import event_audience, publish_event
     from utils.party_sync import publish_party_sync
 
-    publish_party_sync("unhide_queue", party=party, board=board_for_party(party))
+    board = board_for_party(party)
+    publish_party_sync("unhide_queue", party=party, board=board)
     publish_event(
         "queue",
         {
             "action": "unhide_queue",
             "party_id": party.get("party_id"),
-            "board": board_for_party(party),
+            "board": board,
         },
+        audience=event_audience(party_id=party.get("party_id"), board=board),
     )
 
 
@@ -153,38 +156,45 @@ def hide_party_from_queue(party: Dict[str, Any]) -> Dict[str, Any]:
     if is_idle_hide_exempt(party):
         return party
 
-    found = find_post_by_party_id(party.get("party_id"))
-    removed_board = None
-    removed_war_id = None
-    if found:
-        board, war = found
-        removed_board = board
-        removed_war_id = war.get("war_id")
-        delete_war(board, removed_war_id)
-
-    party["queue_hidden"] = True
-    party["hidden_at"] = _utcnow_iso()
-    party["match_post_id"] = None
-    party["status"] = PARTY_POSTED
-    upsert_party(party)
-
-    from utils.event_bus import publish_event
+    from utils.event_bus import event_audience, publish_event
     from utils.party_sync import publish_party_sync
 
-    publish_party_sync(
-        "hide_queue",
-        party=party,
-        board=removed_board,
-        war_id=removed_war_id,
-    )
-    publish_event(
-        "queue",
-        {
-            "action": "hide_queue",
-            "party_id": party.get("party_id"),
-            "board": removed_board or board_for_party(party),
-        },
-    )
+    # Post removal, party patch and both events commit together.
+    with unit_of_work():
+        found = find_post_by_party_id(party.get("party_id"))
+        removed_board = None
+        removed_war_id = None
+        if found:
+            board, war = found
+            removed_board = board
+            removed_war_id = war.get("war_id")
+            delete_war(board, removed_war_id)
+
+        changes = {
+            "queue_hidden": True,
+            "hidden_at": _utcnow_iso(),
+            "match_post_id": None,
+            "status": PARTY_POSTED,
+        }
+        patch_party(party["party_id"], changes)
+        party.update(changes)
+
+        publish_party_sync(
+            "hide_queue",
+            party=party,
+            board=removed_board,
+            war_id=removed_war_id,
+        )
+        board = removed_board or board_for_party(party)
+        publish_event(
+            "queue",
+            {
+                "action": "hide_queue",
+                "party_id": party.get("party_id"),
+                "board": board,
+            },
+            audience=event_audience(party_id=party.get("party_id"), board=board),
+        )
     return party
 
 
@@ -195,13 +205,16 @@ def unhide_party_queue(party: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]],
     if not party.get("queue_hidden"):
         return party, "Already visible in the queue."
 
-    party["queue_hidden"] = False
-    party["hidden_at"] = None
-    party["last_roster_change_at"] = _utcnow_iso()
-    upsert_party(party)
-
-    party = _restore_queue_surfaces(party)
-    _publish_unhide_queue(party)
+    changes = {
+        "queue_hidden": False,
+        "hidden_at": None,
+        "last_roster_change_at": _utcnow_iso(),
+    }
+    with unit_of_work():
+        patch_party(party["party_id"], changes)
+        party.update(changes)
+        party = _restore_queue_surfaces(party)
+        _publish_unhide_queue(party)
     return party, "You're visible in the queue again."
 
 
@@ -351,18 +364,21 @@ def join_party_queue(party: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], O
     found = find_post_by_party_id(party.get("party_id"))
     if not found:
         party["match_post_id"] = None
-    upsert_party(party)
 
-    from utils.event_bus import publish_event
+    from utils.event_bus import event_audience, publish_event
 
-    publish_event(
-        "queue",
-        {
-            "action": "join_queue",
-            "party_id": party.get("party_id"),
-            "board": board_for_party(party),
-        },
-    )
+    board = board_for_party(party)
+    with unit_of_work():
+        upsert_party(party)
+        publish_event(
+            "queue",
+            {
+                "action": "join_queue",
+                "party_id": party.get("party_id"),
+                "board": board,
+            },
+            audience=event_audience(party_id=party.get("party_id"), board=board),
+        )
     return party, "Joined the queue."
 
 
@@ -383,21 +399,22 @@ def ensure_opponent_hub_post(party: Dict[str, Any]) -> Tuple[Optional[Dict[str,
         _board, war = found
         if war.get("status") != "open":
             return None, "Your war post is no longer open."
-        if war.get("search_mode") != SEARCH_OPPONENTS:
-            war["search_mode"] = SEARCH_OPPONENTS
-            upsert_war(_board, war)
-            from utils.party_sync import publish_party_sync
-
-            publish_party_sync(
-                "roster_update",
-                party=party,
-                board=_board,
-                war_id=war.get("war_id"),
-            )
         party["match_post_id"] = war.get("war_id")
         party["search_mode"] = SEARCH_OPPONENTS
         party["status"] = PARTY_POSTED
-        upsert_party(party)
+        with unit_of_work():
+            if war.get("search_mode") != SEARCH_OPPONENTS:
+                war["search_mode"] = SEARCH_OPPONENTS
+                upsert_war(_board, war)
+                from utils.party_sync import publish_party_sync
+
+                publish_party_sync(
+                    "roster_update",
+                    party=party,
+                    board=_board,
+                    war_id=war.get("war_id"),
+                )
+            upsert_party(party)
         return war, None
 
     post, message = post_party_to_billboard(party, SEARCH_OPPONENTS)
@@ -426,40 +443,43 @@ def leave_party_queue(
     if party.get("status") != PARTY_POSTED:
         return False, "This party is not in the queue.", None
 
+    from utils.event_bus import event_audience, publish_event
+    from utils.party_sync import publish_party_sync
+
     party_id = party.get("party_id")
     removed: Optional[Tuple[str, str]] = None
-    found = find_post_by_party_id(party_id)
-    if found:
-        board, war = found
-        war_id = war.get("war_id")
-        delete_war(board, war_id)
-        if war_id:
-            removed = (board, str(war_id))
-
-    party["status"] = PARTY_PREPARING
-    party["match_post_id"] = None
-    party["search_mode"] = SEARCH_ALLIES
-    party["queue_hidden"] = False
-    party["hidden_at"] = None
-    upsert_party(party)
-
-    from utils.event_bus import publish_event
-    from utils.party_sync import publish_party_sync
+    with unit_of_work():
+        found = find_post_by_party_id(party_id)
+        if found:
+            board, war = found
+            war_id = war.get("war_id")
+            delete_war(board, war_id)
+            if war_id:
+                removed = (board, str(war_id))
+
+        party["status"] = PARTY_PREPARING
+        party["match_post_id"] = None
+        party["search_mode"] = SEARCH_ALLIES
+        party["queue_hidden"] = False
+        party["hidden_at"] = None
+        upsert_party(party)
 
-    publish_party_sync(
-        "leave_queue",
-        party=party,
-        board=removed[0] if removed else None,
-        war_id=removed[1] if removed else None,
-    )
-    publish_event(
-        "queue",
-        {
-            "action": "leave_queue",
-            "party_id": party.get("party_id"),
-            "board": removed[0] if removed else board_for_party(party),
-        },
-    )
+        publish_party_sync(
+            "leave_queue",
+            party=party,
+            board=removed[0] if removed else None,
+            war_id=removed[1] if removed else None,
+        )
+        board = removed[0] if removed else board_for_party(party)
+        publish_event(
+            "queue",
+            {
+                "action": "leave_queue",
+                "party_id": party.get("party_id"),
+                "board": board,
+            },
+            audience=event_audience(party_id=party.get("party_id"), board=board),
+        )
     return True, "Left the queue.", removed
 
 
@@ -542,26 +562,27 @@ def cancel_party(party_id: str) -> bool:
     if not party:
         return False
 
-    found = find_post_by_party_id(party_id)
-    lobby_channel_id = party.get("lobby_channel_id")
-    lobby_message_id = party.get("lobby_message_id")
-    if found:
-        board, war = found
-        delete_war(board, war.get("war_id"))
-
-    delete_party(party_id)
-
     from utils.party_sync import publish_party_sync
 
-    publish_party_sync(
-        "cancel",
-        party_id=party_id,
-        board=found[0] if found else None,
-        war_id=found[1].get("war_id") if found else None,
-        lobby_channel_id=lobby_channel_id,
-        lobby_message_id=lobby_message_id,
-        party=party,
-    )
+    lobby_channel_id = party.get("lobby_channel_id")
+    lobby_message_id = party.get("lobby_message_id")
+    with unit_of_work():
+        found = find_post_by_party_id(party_id)
+        if found:
+            board, war = found
+            delete_war(board, war.get("war_id"))
+
+        delete_party(party_id)
+
+        publish_party_sync(
+            "cancel",
+            party_id=party_id,
+            board=found[0] if found else None,
+            war_id=found[1].get("war_id") if found else None,
+            lobby_channel_id=lobby_channel_id,
+            lobby_message_id=lobby_message_id,
+            party=party,
+        )
     return True
 
 
@@ -595,27 +616,29 @@ def remove_player_from_party(discord_id: int, *, party_id: Optional[str] = None)
         captain_id = 0
     if captain_id == int(discord_id):
         party["captain_discord_id"] = new_lineup[0].get("discord_id")
-    upsert_party(party)
-    party = finalize_roster_change(party, was_hidden=was_hidden)
 
-    # Keep hub post in sync if this party was posted.
-    found = find_post_by_party_id(party.get("party_id"))
     from utils.party_sync import publish_party_sync
 
-    if found:
-        from utils.match_posting import sync_billboard_post_from_party
-
-        synced = sync_billboard_post_from_party(party)
-        if synced:
-            board, war = synced
-            publish_party_sync(
-                "roster_update",
-                party=party,
-                board=board,
-                war_id=war.get("war_id"),
-            )
+    with unit_of_work():
+        upsert_party(party)
+        party = finalize_roster_change(party, was_hidden=was_hidden)
+
+        # Keep hub post in sync if this party was posted.
+        found = find_post_by_party_id(party.get("party_id"))
+        if found:
+            from utils.match_posting import sync_billboard_post_from_party
+
+            synced = sync_billboard_post_from_party(party)
+            if synced:
+                board, war = synced
+                publish_party_sync(
+                    "roster_update",
+                    party=party,
+                    board=board,
+                    war_id=war.get("war_id"),
+                )
+            else:
+                publish_party_sync("roster_update", party=party)
         else:
             publish_party_sync("roster_update", party=party)
-    else:
-        publish_party_sync("roster_update", party=party)
     return True
@@ -1,16 +1,20 @@
-"""Queue parties — Postgres queue_parties or temp/queue-parties.json."""
+"""Queue parties — Postgres queue_parties or the local store (utils.local_store)."""
 
 from __future__ import annotations
 
 import json
 import os
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
+from utils import local_store
 from utils.config import DATA_DIR
-from utils.db import get_conn, use_json_stores
+from utils.db import PatchKey, apply_patch, get_aconn, get_conn, jsonb_patch, use_json_stores
+from utils.event_bus import EVENT_CHANNEL
 
 QUEUE_STORE_PATH = os.path.join(DATA_DIR, "queue-parties.json")
+_LOCAL = "queue_parties"
+local_store.register_legacy_json(_LOCAL, QUEUE_STORE_PATH, "parties")
 
 
 def _parse(value: Any) -> Dict[str, Any]:
@@ -21,26 +25,9 @@ def _parse(value: Any) -> Dict[str, Any]:
     return {}
 
 
-def _load_all() -> Dict[str, Any]:
-    if not os.path.exists(QUEUE_STORE_PATH):
-        return {"parties": {}}
-    try:
-        with open(QUEUE_STORE_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if "parties" in data else {"parties": {}}
-    except json.JSONDecodeError:
-        return {"parties": {}}
-
-
-def _save_all(data: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(QUEUE_STORE_PATH), exist_ok=True)
-    with open(QUEUE_STORE_PATH, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, ensure_ascii=False)
-
-
 def list_parties() -> List[Dict[str, Any]]:
     if use_json_stores():
-        return list(_load_all()["parties"].values())
+        return local_store.list_docs(_LOCAL)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
@@ -53,7 +40,7 @@ def list_parties() -> List[Dict[str, Any]]:
 
 def get_party(party_id: str) -> Optional[Dict[str, Any]]:
     if use_json_stores():
-        return _load_all()["parties"].get(party_id)
+        return local_store.get_doc(_LOCAL, party_id)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
@@ -64,6 +51,22 @@ def get_party(party_id: str) -> Optional[Dict[str, Any]]:
     return _parse(row[0]) if row else None
 
 
+async def aget_party(party_id: str) -> Optional[Dict[str, Any]]:
+    """get_party() for async handlers."""
+    if use_json_stores():
+        return get_party(party_id)
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute("SELECT data FROM queue_parties WHERE party_id = %s", (party_id,))
+            row = await cursor.fetchone()
+    return _parse(row[0]) if row else None
+
+
+def _party_notify(party_id: str) -> tuple:
+    """pg_notify args announcing a party write (fires on commit; see utils.event_bus)."""
+    return (EVENT_CHANNEL, f"0:party:{party_id}")
+
+
 def get_party_by_invite(invite_code: str) -> Optional[Dict[str, Any]]:
     for party in list_parties():
         if party.get("invite_code") == invite_code and party.get("status") == "preparing":
@@ -78,58 +81,108 @@ def _discord_ids_equal(left: Any, right: Any) -> bool:
         return left == right and left is not None
 
 
+_ACTIVE_STATUSES = ("preparing", "posted", "matched")
+
+# Prefer lineup membership (party_members index), then captain ownership.
+_ACTIVE_PARTY_SQL = """
+    SELECT data FROM (
+      SELECT qp.data, 0 AS pref, qp.updated_at
+      FROM party_members pm
+      JOIN queue_parties qp ON qp.party_id = pm.party_id
+      WHERE pm.discord_id = %s AND qp.status IN ('preparing', 'posted', 'matched')
+      UNION ALL
+      SELECT data, 1 AS pref, updated_at
+      FROM queue_parties
+      WHERE captain_discord_id = %s AND status IN ('preparing', 'posted', 'matched')
+    ) AS candidates
+    ORDER BY pref, updated_at DESC NULLS LAST
+    LIMIT 1
+"""
+
+
+def _active_party_params(discord_id: int) -> tuple:
+    did = int(discord_id)
+    return (did, did)
+
+
+def _lineup_members(party: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """party_members rows for a lineup; skips placeholder / non-numeric ids."""
+    members: Dict[int, Dict[str, Any]] = {}
+    for player in party.get("lineup") or []:
+        try:
+            did = int(player.get("discord_id"))
+        except (TypeError, ValueError):
+            continue
+        members.setdefault(
+            did,
+            {"discord_id": did, "role": player.get("role"), "ally": bool(player.get("ally"))},
+        )
+    return list(members.values())
+
+
 def get_active_party_for_user(discord_id: int) -> Optional[Dict[str, Any]]:
     """Return the active party that includes this user in its lineup (preferred)."""
     if use_json_stores():
+        member_of = list_active_parties_for_member(discord_id)
+        if member_of:
+            return member_of[0]
         for party in list_parties():
-            if party.get("status") not in ("preparing", "posted", "matched"):
-                continue
-            for player in party.get("lineup", []):
-                if _discord_ids_equal(player.get("discord_id"), discord_id):
-                    return party
-        for party in list_parties():
-            if party.get("status") not in ("preparing", "posted", "matched"):
+            if party.get("status") not in _ACTIVE_STATUSES:
                 continue
             if _discord_ids_equal(party.get("captain_discord_id"), discord_id):
                 return party
         return None
 
-    did = int(discord_id)
-    did_str = str(did)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
-            # Prefer lineup membership, then captain ownership — no full-table Python scan.
+            cursor.execute(_ACTIVE_PARTY_SQL, _active_party_params(discord_id))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+    return _parse(row[0]) if row else None
+
+
+async def aget_active_party_for_user(discord_id: int) -> Optional[Dict[str, Any]]:
+    """get_active_party_for_user() for async handlers (SSE loop, bridges)."""
+    if use_json_stores():
+        return get_active_party_for_user(discord_id)
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(_ACTIVE_PARTY_SQL, _active_party_params(discord_id))
+            row = await cursor.fetchone()
+    return _parse(row[0]) if row else None
+
+
+def list_active_parties_for_member(discord_id: int) -> List[Dict[str, Any]]:
+    """Active parties whose lineup includes this user (party_members index)."""
+    if use_json_stores():
+        return [
+            party
+            for party in list_parties()
+            if party.get("status") in _ACTIVE_STATUSES
+            and any(
+                _discord_ids_equal(player.get("discord_id"), discord_id)
+                for player in party.get("lineup") or []
+            )
+        ]
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
             cursor.execute(
                 """
-                SELECT data FROM queue_parties
-                WHERE status IN ('preparing', 'posted', 'matched')
-                  AND (
-                    captain_discord_id = %s
-                    OR EXISTS (
-                      SELECT 1
-                      FROM jsonb_array_elements(COALESCE(data->'lineup', '[]'::jsonb)) AS elem
-                      WHERE elem->>'discord_id' = %s
-                         OR elem->>'discord_id' = %s
-                         OR TRIM(BOTH '"' FROM (elem->'discord_id')::text) = %s
-                    )
-                  )
-                ORDER BY CASE WHEN captain_discord_id = %s
-                  AND NOT EXISTS (
-                    SELECT 1
-                    FROM jsonb_array_elements(COALESCE(data->'lineup', '[]'::jsonb)) AS elem
-                    WHERE elem->>'discord_id' = %s
-                       OR TRIM(BOTH '"' FROM (elem->'discord_id')::text) = %s
-                  ) THEN 1 ELSE 0 END,
-                  updated_at DESC NULLS LAST
-                LIMIT 1
+                SELECT qp.data
+                FROM party_members pm
+                JOIN queue_parties qp ON qp.party_id = pm.party_id
+                WHERE pm.discord_id = %s AND qp.status IN ('preparing', 'posted', 'matched')
+                ORDER BY qp.updated_at DESC NULLS LAST
                 """,
-                (did, did_str, str(did), did_str, did, did_str, did_str),
+                (int(discord_id),),
             )
-            row = cursor.fetchone()
+            rows = cursor.fetchall()
         finally:
             cursor.close()
-    return _parse(row[0]) if row else None
+    return [_parse(r[0]) for r in rows]
 
 
 def get_active_party_for_guild(guild_id: int) -> Optional[Dict[str, Any]]:
@@ -146,25 +199,46 @@ def get_active_party_for_guild(guild_id: int) -> Optional[Dict[str, Any]]:
 def upsert_party(party: Dict[str, Any]) -> Dict[str, Any]:
     party["last_updated"] = datetime.utcnow().isoformat()
     if use_json_stores():
-        data = _load_all()
-        data["parties"][party["party_id"]] = party
-        _save_all(data)
+        local_store.put_doc(_LOCAL, party["party_id"], party)
         return party
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
+            # Party row, its party_members index and the change notification
+            # in one statement.
             cursor.execute(
                 """
-                INSERT INTO queue_parties (
-                  party_id, invite_code, captain_discord_id, guild_id, data, status, updated_at
-                ) VALUES (%s, %s, %s, %s, %s::jsonb, %s, NOW())
-                ON CONFLICT (party_id) DO UPDATE SET
-                  invite_code = EXCLUDED.invite_code,
-                  captain_discord_id = EXCLUDED.captain_discord_id,
-                  guild_id = EXCLUDED.guild_id,
-                  data = EXCLUDED.data,
-                  status = EXCLUDED.status,
-                  updated_at = NOW()
+                WITH party AS (
+                  INSERT INTO queue_parties (
+                    party_id, invite_code, captain_discord_id, guild_id, data, status, updated_at
+                  ) VALUES (%s, %s, %s, %s, %s::jsonb, %s, NOW())
+                  ON CONFLICT (party_id) DO UPDATE SET
+                    invite_code = EXCLUDED.invite_code,
+                    captain_discord_id = EXCLUDED.captain_discord_id,
+                    guild_id = EXCLUDED.guild_id,
+                    data = EXCLUDED.data,
+                    status = EXCLUDED.status,
+                    updated_at = NOW()
+                  RETURNING party_id
+                ),
+                members AS (
+                  SELECT m.discord_id, m.role, COALESCE(m.ally, FALSE) AS ally
+                  FROM jsonb_to_recordset(%s::jsonb) AS m(discord_id BIGINT, role TEXT, ally BOOLEAN)
+                ),
+                gone AS (
+                  DELETE FROM party_members pm
+                  WHERE pm.party_id = %s
+                    AND pm.discord_id NOT IN (SELECT discord_id FROM members)
+                ),
+                linked AS (
+                  INSERT INTO party_members (party_id, discord_id, role, ally)
+                  SELECT party.party_id, members.discord_id, members.role, members.ally
+                  FROM party CROSS JOIN members
+                  ON CONFLICT (party_id, discord_id) DO UPDATE SET
+                    role = EXCLUDED.role,
+                    ally = EXCLUDED.ally
+                )
+                SELECT pg_notify(%s, %s)
                 """,
                 (
                     party["party_id"],
@@ -173,6 +247,9 @@ def upsert_party(party: Dict[str, Any]) -> Dict[str, Any]:
                     party.get("guild_id"),
                     json.dumps(party),
                     party.get("status"),
+                    json.dumps(_lineup_members(party)),
+                    party["party_id"],
+                    *_party_notify(party["party_id"]),
                 ),
             )
         finally:
@@ -180,18 +257,107 @@ def upsert_party(party: Dict[str, Any]) -> Dict[str, Any]:
     return party
 
 
-def delete_party(party_id: str) -> bool:
+# Columns mirrored out of `data`; a patch touching one also updates the column.
+_PARTY_COLUMNS = ("invite_code", "captain_discord_id", "guild_id", "status")
+
+
+def patch_party(party_id: str, changes: Dict[PatchKey, Any]) -> bool:
+    """
+    Update only the given fields of a stored party (see utils.db.jsonb_patch).
+    Stamps `last_updated` like upsert_party, also into `changes`, so a caller
+    doing `party.update(changes)` afterwards stays in sync with the row.
+    Returns False if the party is gone. Lineup changes must go through
+    upsert_party() to keep party_members in sync.
+    """
+    if any(key == "lineup" or (isinstance(key, tuple) and key[0] == "lineup") for key in changes):
+        raise ValueError("patch_party cannot change the lineup; use upsert_party().")
+    changes["last_updated"] = datetime.utcnow().isoformat()
     if use_json_stores():
-        data = _load_all()
-        if party_id not in data["parties"]:
+        party = local_store.get_doc(_LOCAL, party_id)
+        if party is None:
             return False
-        del data["parties"][party_id]
-        _save_all(data)
+        local_store.put_doc(_LOCAL, party_id, apply_patch(party, changes))
         return True
+
+    expr, params = jsonb_patch("data", changes)
+    columns = [column for column in _PARTY_COLUMNS if column in changes]
+    assignments = "".join(f", {column} = %s" for column in columns)
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"""
+                WITH patched AS (
+                  UPDATE queue_parties SET data = {expr}{assignments}, updated_at = NOW()
+                  WHERE party_id = %s
+                  RETURNING party_id
+                )
+                SELECT pg_notify(%s, %s) FROM patched
+                """,
+                (
+                    *params,
+                    *(changes[column] for column in columns),
+                    party_id,
+                    *_party_notify(party_id),
+                ),
+            )
+            return cursor.fetchone() is not None
+        finally:
+            cursor.close()
+
+
+def delete_party(party_id: str) -> bool:
+    if use_json_stores():
+        return local_store.delete_doc(_LOCAL, party_id)
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
-            cursor.execute("DELETE FROM queue_parties WHERE party_id = %s", (party_id,))
-            return cursor.rowcount > 0
+            # party_members rows go with it (ON DELETE CASCADE).
+            cursor.execute(
+                """
+                WITH deleted AS (
+                  DELETE FROM queue_parties WHERE party_id = %s RETURNING party_id
+                )
+                SELECT pg_notify(%s, %s) FROM deleted
+                """,
+                (party_id, *_party_notify(party_id)),
+            )
+            return cursor.fetchone() is not None
         finally:
             cursor.close()
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+async def achanged_party_ids(
+    since: Optional[datetime],
+    watched: Iterable[str] = (),
+) -> Tuple[Set[str], datetime]:
+    """
+    Gap-filling scan for the API event hub: parties written after `since` plus
+    watched ids that no longer exist. Returns (ids, new watermark); the first
+    call (since=None) only establishes the watermark.
+    """
+    if use_json_stores():
+        return set(), since or _EPOCH
+    watch = sorted(set(watched))
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            if since is None:
+                await cursor.execute("SELECT MAX(updated_at) FROM queue_parties")
+                row = await cursor.fetchone()
+                return set(), (row[0] if row else None) or _EPOCH
+            await cursor.execute(
+                """
+                SELECT party_id, updated_at FROM queue_parties
+                WHERE updated_at > %s OR party_id = ANY(%s)
+                """,
+                (since, watch),
+            )
+            rows = await cursor.fetchall()
+    found = {str(row[0]): row[1] for row in rows}
+    changed = {pid for pid, updated in found.items() if updated and updated > since}
+    changed.update(pid for pid in watch if pid not in found)
+    watermark = max([since, *(u for u in found.values() if u)])
+    return changed, watermark
@@ -8,7 +8,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import trueskill
 
-from utils.db import get_conn, use_json_stores
+from utils.db import current_unit_of_work, get_aconn, get_conn, multi_values, use_json_stores
 
 MU0 = 25.0
 SIGMA0 = 25.0 / 3.0
@@ -162,6 +162,54 @@ def get_player_ratings_for_ids(
     Batch lane ratings for many players on one track.
     Returns {discord_id: {"runner": rating, "bagger": rating}}.
     """
+    track, unique, result = _ratings_for_ids_scaffold(discord_ids, war_type)
+    if not unique:
+        return result
+
+    if use_json_stores():
+        for did in unique:
+            result[did]["runner"] = get_player_rating(did, war_type, role="runner")
+            result[did]["bagger"] = get_player_rating(did, war_type, bagger=True, role="bagger")
+        return result
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(_RATINGS_FOR_IDS_SQL, (unique, track))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    return _merge_rating_rows(result, rows)
+
+
+async def aget_player_ratings_for_ids(
+    discord_ids: List[int],
+    war_type: str,
+) -> Dict[int, Dict[str, Dict[str, Any]]]:
+    """get_player_ratings_for_ids() for async handlers."""
+    if use_json_stores():
+        return get_player_ratings_for_ids(discord_ids, war_type)
+    track, unique, result = _ratings_for_ids_scaffold(discord_ids, war_type)
+    if not unique:
+        return result
+    async with get_aconn() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(_RATINGS_FOR_IDS_SQL, (unique, track))
+            rows = await cursor.fetchall()
+    return _merge_rating_rows(result, rows)
+
+
+_RATINGS_FOR_IDS_SQL = """
+    SELECT discord_id, track, role, mu, sigma, placement_count, revealed, season_games
+    FROM player_ratings
+    WHERE discord_id = ANY(%s) AND track = %s
+"""
+
+
+def _ratings_for_ids_scaffold(
+    discord_ids: List[int],
+    war_type: str,
+) -> Tuple[str, List[int], Dict[int, Dict[str, Dict[str, Any]]]]:
     track = _normalize_track(war_type)
     unique: List[int] = []
     seen = set()
@@ -182,29 +230,13 @@ def get_player_ratings_for_ids(
         }
         for did in unique
     }
-    if not unique:
-        return result
+    return track, unique, result
 
-    if use_json_stores():
-        for did in unique:
-            result[did]["runner"] = get_player_rating(did, war_type, role="runner")
-            result[did]["bagger"] = get_player_rating(did, war_type, bagger=True, role="bagger")
-        return result
 
-    with get_conn() as conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                """
-                SELECT discord_id, track, role, mu, sigma, placement_count, revealed, season_games
-                FROM player_ratings
-                WHERE discord_id = ANY(%s) AND track = %s
-                """,
-                (unique, track),
-            )
-            rows = cursor.fetchall()
-        finally:
-            cursor.close()
+def _merge_rating_rows(
+    result: Dict[int, Dict[str, Dict[str, Any]]],
+    rows: List[tuple],
+) -> Dict[int, Dict[str, Dict[str, Any]]]:
     for row in rows:
         rating = _row_to_rating(row)
         did = int(rating["discord_id"])
@@ -256,17 +288,34 @@ def get_player_rating_uncached(
     return _row_to_rating(row)
 
 
-def _upsert_rating(rating: Dict[str, Any]) -> None:
-    if use_json_stores():
+def _upsert_ratings(ratings: List[Dict[str, Any]]) -> None:
+    """Write many lanes with one multi-row statement; a repeated lane keeps its last entry."""
+    if use_json_stores() or not ratings:
         return
+    # ON CONFLICT cannot touch the same row twice in one statement.
+    latest = {(int(rating["discord_id"]), rating["track"], rating["role"]): rating for rating in ratings}
+    params: List[Any] = []
+    for rating in latest.values():
+        params.extend(
+            (
+                int(rating["discord_id"]),
+                rating["track"],
+                rating["role"],
+                float(rating["mu"]),
+                float(rating["sigma"]),
+                int(rating["placement_count"]),
+                bool(rating["revealed"]),
+                int(rating["season_games"]),
+            )
+        )
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
             cursor.execute(
-                """
+                f"""
                 INSERT INTO player_ratings (
                   discord_id, track, role, mu, sigma, placement_count, revealed, season_games, updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                ) VALUES {multi_values("(%s, %s, %s, %s, %s, %s, %s, %s, NOW())", len(latest))}
                 ON CONFLICT (discord_id, track, role) DO UPDATE SET
                   mu = EXCLUDED.mu,
                   sigma = EXCLUDED.sigma,
@@ -275,21 +324,16 @@ def _upsert_rating(rating: Dict[str, Any]) -> None:
                   season_games = EXCLUDED.season_games,
                   updated_at = NOW()
                 """,
-                (
-                    int(rating["discord_id"]),
-                    rating["track"],
-                    rating["role"],
-                    float(rating["mu"]),
-                    float(rating["sigma"]),
-                    int(rating["placement_count"]),
-                    bool(rating["revealed"]),
-                    int(rating["season_games"]),
-                ),
+                tuple(params),
             )
         finally:
             cursor.close()
 
 
+def _upsert_rating(rating: Dict[str, Any]) -> None:
+    _upsert_ratings([rating])
+
+
 def _indiv_weight(score: Optional[float], mean_score: float) -> float:
     if score is None or mean_score <= 0:
         return 1.0
@@ -319,13 +363,17 @@ def apply_ranked_war_sr(
     if not winner_players or not loser_players:
         return {}, {}
 
+    lanes = get_player_ratings_for_ids(
+        [p["discord_id"] for p in winner_players + loser_players],
+        war_type,
+    )
+
     def rating_for(player: Dict[str, Any]) -> Dict[str, Any]:
-        return get_player_rating(
-            int(player["discord_id"]),
-            war_type,
+        role_key = _normalize_role(
             bagger=bool(player.get("bagger") or str(player.get("role") or "").lower() == "bagger"),
             role=player.get("role"),
         )
+        return lanes[int(player["discord_id"])][role_key]
 
     win_ratings = [rating_for(p) for p in winner_players]
     lose_ratings = [rating_for(p) for p in loser_players]
@@ -340,6 +388,8 @@ def apply_ranked_war_sr(
 
     win_deltas: Dict[str, int] = {}
     lose_deltas: Dict[str, int] = {}
+    updated_ratings: List[Dict[str, Any]] = []
+    legacy_deltas: List[Dict[str, Any]] = []
 
     for player, before, after in zip(winner_players, win_ratings, new_win):
         did = str(player["discord_id"])
@@ -374,26 +424,11 @@ def apply_ranked_war_sr(
             "season_games": int(before["season_games"]) + 1,
             "sr": display_sr(new_mu),
         }
-        _upsert_rating(updated)
-        # Mirror approximate integer into legacy mmr column path for bot embeds during transition
-        if update_legacy:
-            try:
-                from utils.player_store import apply_player_delta
-
-                delta_sr = display_sr(new_mu) - display_sr(before["mu"])
-                apply_player_delta(
-                    int(player["discord_id"]),
-                    delta_sr,
-                    won=True,
-                    war_type=war_type,
-                    bagger=role == "bagger",
-                    role=role,
-                )
-                win_deltas[did] = delta_sr
-            except Exception:
-                win_deltas[did] = display_sr(new_mu) - display_sr(before["mu"])
-        else:
-            win_deltas[did] = display_sr(new_mu) - display_sr(before["mu"])
+        updated_ratings.append(updated)
+        win_deltas[did] = display_sr(new_mu) - display_sr(before["mu"])
+        legacy_deltas.append(
+            {"discord_id": did, "delta": win_deltas[did], "won": True, "bagger": role == "bagger", "role": role}
+        )
 
     for player, before, after in zip(loser_players, lose_ratings, new_lose):
         did = str(player["discord_id"])
@@ -425,25 +460,24 @@ def apply_ranked_war_sr(
             "season_games": int(before["season_games"]) + 1,
             "sr": display_sr(new_mu),
         }
-        _upsert_rating(updated)
-        if update_legacy:
-            try:
-                from utils.player_store import apply_player_delta
-
-                delta_sr = display_sr(new_mu) - display_sr(before["mu"])
-                apply_player_delta(
-                    int(player["discord_id"]),
-                    delta_sr,
-                    won=False,
-                    war_type=war_type,
-                    bagger=role == "bagger",
-                    role=role,
-                )
-                lose_deltas[did] = delta_sr
-            except Exception:
-                lose_deltas[did] = display_sr(new_mu) - display_sr(before["mu"])
-        else:
-            lose_deltas[did] = display_sr(new_mu) - display_sr(before["mu"])
+        updated_ratings.append(updated)
+        lose_deltas[did] = display_sr(new_mu) - display_sr(before["mu"])
+        legacy_deltas.append(
+            {"discord_id": did, "delta": lose_deltas[did], "won": False, "bagger": role == "bagger", "role": role}
+        )
+
+    _upsert_ratings(updated_ratings)
+    # Mirror approximate integer into legacy mmr column path for bot embeds during transition
+    if update_legacy:
+        from utils.player_store import apply_player_deltas
+
+        try:
+            apply_player_deltas(legacy_deltas, war_type=war_type)
+        except Exception as exc:
+            print(f"❌ Legacy MMR mirror failed for {war_type} war: {exc}")
+            # Inside unit_of_work() the unit is already doomed; let it fail here.
+            if current_unit_of_work() is not None:
+                raise
 
     return win_deltas, lose_deltas
 
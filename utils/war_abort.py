@@ -2,6 +2,7 @@ from typing import Any, Dict, Optional
 
 import interactions
 
+from utils import discord_outbound as outbound
 from utils.billboard_refresh import remove_war_from_billboards
 from utils.billboard_store import delete_war, find_war_across_boards
 from utils.match_session_store import delete_session, get_session_by_war_id
@@ -28,7 +29,7 @@ async def _delete_lobby_message(bot: interactions.Client, party: Dict[str, Any])
     try:
         channel = await bot.fetch_channel(channel_id)
         message = await channel.fetch_message(message_id)
-        await message.delete()
+        await outbound.delete(message, priority=outbound.PRIORITY_BILLBOARD)
     except Exception:
         pass
 
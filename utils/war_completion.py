@@ -2,8 +2,10 @@ from typing import Any, Dict, Optional, Tuple
 
 import interactions
 
+from utils import discord_outbound as outbound
 from utils.billboard_refresh import remove_war_from_billboards
 from utils.billboard_store import delete_war, find_war_across_boards
+from utils.db import unit_of_work
 from utils.match_session_store import delete_session, get_session_by_channel, get_session_by_war_id
 from utils.mmr import apply_ranked_war_mmr
 from utils.queue_store import delete_party, get_party
@@ -31,7 +33,7 @@ async def _delete_lobby_message(bot: interactions.Client, party: Dict[str, Any])
     try:
         channel = await bot.fetch_channel(channel_id)
         message = await channel.fetch_message(message_id)
-        await message.delete()
+        await outbound.delete(message, priority=outbound.PRIORITY_BILLBOARD)
     except Exception:
         pass
 
@@ -59,64 +61,77 @@ async def finalize_war_completion(
 
     mmr_delta = 0
     per_player: Dict[str, int] = {}
-    if mode == MODE_RANKED:
-        mmr_delta, per_player = apply_ranked_war_mmr(
-            winner_lineup,
-            loser_lineup,
-            point_margin,
-            war_type=winner_war.get("war_type", "RT"),
+    table_reference = table_reference or {}
+    parties: list[Dict[str, Any]] = []
+
+    # Every DB write for this war commits together; Discord cleanup runs after.
+    with unit_of_work():
+        if mode == MODE_RANKED:
+            mmr_delta, per_player = apply_ranked_war_mmr(
+                winner_lineup,
+                loser_lineup,
+                point_margin,
+                war_type=winner_war.get("war_type", "RT"),
+            )
+
+        result = append_result(
+            {
+                "board": board,
+                "mode": mode,
+                "war_type": winner_war.get("war_type", "RT"),
+                "winner_war_id": winner_war.get("war_id"),
+                "loser_war_id": loser_war.get("war_id"),
+                "winner_team_name": winner_war.get("team_name"),
+                "loser_team_name": loser_war.get("team_name"),
+                "winner_guild_id": winner_war.get("origin_guild_id"),
+                "loser_guild_id": loser_war.get("origin_guild_id"),
+                "point_margin": point_margin,
+                "winner_lineup": winner_lineup,
+                "loser_lineup": loser_lineup,
+                "team_mmr_delta": mmr_delta,
+                "player_mmr_deltas": per_player,
+                "sync_method": table_reference.get("sync_method"),
+                "rxx": table_reference.get("rxx"),
+                "team_scores": table_reference.get("team_scores"),
+            }
         )
 
-    table_reference = table_reference or {}
-    result = append_result(
-        {
-            "board": board,
-            "mode": mode,
-            "war_type": winner_war.get("war_type", "RT"),
-            "winner_war_id": winner_war.get("war_id"),
-            "loser_war_id": loser_war.get("war_id"),
-            "winner_team_name": winner_war.get("team_name"),
-            "loser_team_name": loser_war.get("team_name"),
-            "winner_guild_id": winner_war.get("origin_guild_id"),
-            "loser_guild_id": loser_war.get("origin_guild_id"),
-            "point_margin": point_margin,
-            "winner_lineup": winner_lineup,
-            "loser_lineup": loser_lineup,
-            "team_mmr_delta": mmr_delta,
-            "player_mmr_deltas": per_player,
-            "sync_method": table_reference.get("sync_method"),
-            "rxx": table_reference.get("rxx"),
-            "team_scores": table_reference.get("team_scores"),
-        }
-    )
+        session = get_session_by_war_id(winner_war.get("war_id", ""))
+        if session:
+            delete_session(session["session_id"])
+
+        for war in (winner_war, loser_war):
+            war_id = war.get("war_id")
+            if war_id:
+                delete_war(board, war_id)
+
+        for war in (winner_war, loser_war):
+            party_id = war.get("party_id")
+            if not party_id:
+                continue
+            party = get_party(party_id)
+            if party:
+                parties.append(party)
+            delete_party(party_id)
 
     synced = await sync_war_result(result)
     if synced:
         result["table_bot_synced"] = True
 
-    session = get_session_by_war_id(winner_war.get("war_id", ""))
     if session:
         await _delete_channel(bot, session.get("channel_a_id"))
         await _delete_channel(bot, session.get("channel_b_id"))
-        delete_session(session["session_id"])
 
     for war in (winner_war, loser_war):
         war_id = war.get("war_id")
         if war_id:
-            delete_war(board, war_id)
             try:
                 await remove_war_from_billboards(bot, board, war_id)
             except Exception as exc:
                 print(f"⚠️ billboard cleanup skipped for {war_id}: {exc}")
 
-    for war in (winner_war, loser_war):
-        party_id = war.get("party_id")
-        if not party_id:
-            continue
-        party = get_party(party_id)
-        if party:
-            await _delete_lobby_message(bot, party)
-        delete_party(party_id)
+    for party in parties:
+        await _delete_lobby_message(bot, party)
 
     return result
 
@@ -151,8 +166,10 @@ async def notify_teams_for_score_collection(
             continue
         try:
             channel = await bot.fetch_channel(channel_id)
-            await channel.send(
-                f"<@{war.get('author_discord_id')}> — {header}"
+            await outbound.send(
+                channel,
+                priority=outbound.PRIORITY_MATCH,
+                content=f"<@{war.get('author_discord_id')}> — {header}"
                 f"{build_score_entry_instructions(war.get('lineup', []))}"
             )
         except Exception as exc:
@@ -191,7 +208,7 @@ async def broadcast_to_session_channels(
         seen.add(cid)
         try:
             channel = await bot.fetch_channel(cid)
-            await channel.send(content)
+            await outbound.send(channel, priority=outbound.PRIORITY_MATCH, content=content)
         except Exception as exc:
             print(f"❌ Failed to broadcast to war channel {cid}: {exc}")
 
@@ -239,7 +256,7 @@ async def notify_teams_for_confirmation(
             continue
         try:
             channel = await bot.fetch_channel(channel_id)
-            await channel.send(content=f"<@{captain_id}> — {body}")
+            await outbound.send(channel, priority=outbound.PRIORITY_MATCH, content=f"<@{captain_id}> — {body}")
         except Exception as exc:
             print(f"❌ Failed to notify captain {captain_id} in war channel {channel_id}: {exc}")
 
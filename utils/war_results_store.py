@@ -1,4 +1,4 @@
-"""War results — Postgres `war_results` or temp/war-results.json."""
+"""War results — Postgres `war_results` or the local store (utils.local_store)."""
 
 from __future__ import annotations
 
@@ -6,29 +6,15 @@ import json
 import os
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 
+from utils import local_store
 from utils.config import DATA_DIR
 from utils.db import get_conn, use_json_stores
 
 WAR_RESULTS_PATH = os.path.join(DATA_DIR, "war-results.json")
-
-
-def _load_all() -> Dict[str, Any]:
-    if not os.path.exists(WAR_RESULTS_PATH):
-        return {"results": []}
-    try:
-        with open(WAR_RESULTS_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if "results" in data else {"results": []}
-    except json.JSONDecodeError:
-        return {"results": []}
-
-
-def _save_all(data: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(WAR_RESULTS_PATH), exist_ok=True)
-    with open(WAR_RESULTS_PATH, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2, ensure_ascii=False)
+_LOCAL = "war_results"
+local_store.register_legacy_json(_LOCAL, WAR_RESULTS_PATH, "results", key_field="result_id")
 
 
 def _parse_payload(value: Any) -> Dict[str, Any]:
@@ -39,33 +25,112 @@ def _parse_payload(value: Any) -> Dict[str, Any]:
     return {}
 
 
+def _int_or_none(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _result_mode(result: Dict[str, Any]) -> str:
+    return str(result.get("mode") or "ranked").lower()
+
+
+def _result_war_type(result: Dict[str, Any]) -> str:
+    return str(result.get("war_type") or "RT").upper()
+
+
+def _result_players(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """war_result_players rows for one result (first appearance wins)."""
+    scores = result.get("player_scores") or {}
+    rows: Dict[int, Dict[str, Any]] = {}
+    for side, key in (("winner", "winner_lineup"), ("loser", "loser_lineup")):
+        for player in result.get(key) or []:
+            did = _int_or_none(player.get("discord_id"))
+            if did is None or did in rows:
+                continue
+            score = player.get("score")
+            if score is None and isinstance(scores, dict):
+                score = scores.get(str(did))
+            try:
+                score = float(score) if score is not None else None
+            except (TypeError, ValueError):
+                score = None
+            rows[did] = {
+                "discord_id": did,
+                "side": side,
+                "role": player.get("role"),
+                "ally": bool(player.get("ally")),
+                "score": score,
+            }
+    return list(rows.values())
+
+
 def append_result(result: Dict[str, Any]) -> Dict[str, Any]:
     result.setdefault("result_id", str(uuid.uuid4()))
     result.setdefault("completed_at", datetime.utcnow().isoformat())
     result.setdefault("table_bot_synced", False)
 
     if use_json_stores():
-        data = _load_all()
-        data["results"].append(result)
-        _save_all(data)
+        local_store.put_doc(_LOCAL, result["result_id"], result)
         return result
 
     completed_at = result.get("completed_at")
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
+            # Result row, typed columns and war_result_players in one statement.
             cursor.execute(
                 """
-                INSERT INTO war_results (result_id, completed_at, payload)
-                VALUES (%s, %s::timestamptz, %s::jsonb)
-                ON CONFLICT (result_id) DO UPDATE SET
-                  completed_at = EXCLUDED.completed_at,
-                  payload = EXCLUDED.payload
+                WITH result AS (
+                  INSERT INTO war_results (
+                    result_id, completed_at, payload, mode, war_type, board,
+                    winner_guild_id, loser_guild_id, point_margin
+                  ) VALUES (%s, %s::timestamptz, %s::jsonb, %s, %s, %s, %s, %s, %s)
+                  ON CONFLICT (result_id) DO UPDATE SET
+                    completed_at = EXCLUDED.completed_at,
+                    payload = EXCLUDED.payload,
+                    mode = EXCLUDED.mode,
+                    war_type = EXCLUDED.war_type,
+                    board = EXCLUDED.board,
+                    winner_guild_id = EXCLUDED.winner_guild_id,
+                    loser_guild_id = EXCLUDED.loser_guild_id,
+                    point_margin = EXCLUDED.point_margin
+                  RETURNING result_id
+                ),
+                players AS (
+                  SELECT *
+                  FROM jsonb_to_recordset(%s::jsonb) AS p(
+                    discord_id BIGINT, side TEXT, role TEXT, ally BOOLEAN, score DOUBLE PRECISION
+                  )
+                ),
+                gone AS (
+                  DELETE FROM war_result_players wrp
+                  WHERE wrp.result_id = %s
+                    AND wrp.discord_id NOT IN (SELECT discord_id FROM players)
+                )
+                INSERT INTO war_result_players (result_id, discord_id, side, role, ally, score)
+                SELECT result.result_id, players.discord_id, players.side, players.role,
+                  COALESCE(players.ally, FALSE), players.score
+                FROM result CROSS JOIN players
+                ON CONFLICT (result_id, discord_id) DO UPDATE SET
+                  side = EXCLUDED.side,
+                  role = EXCLUDED.role,
+                  ally = EXCLUDED.ally,
+                  score = EXCLUDED.score
                 """,
                 (
                     result["result_id"],
                     completed_at,
                     json.dumps(result),
+                    _result_mode(result),
+                    _result_war_type(result),
+                    result.get("board"),
+                    _int_or_none(result.get("winner_guild_id")),
+                    _int_or_none(result.get("loser_guild_id")),
+                    _int_or_none(result.get("point_margin")),
+                    json.dumps(_result_players(result)),
+                    result["result_id"],
                 ),
             )
         finally:
@@ -73,18 +138,60 @@ def append_result(result: Dict[str, Any]) -> Dict[str, Any]:
     return result
 
 
-def list_results() -> List[Dict[str, Any]]:
+def _matches(
+    result: Dict[str, Any],
+    mode: Optional[str],
+    war_type: Optional[str],
+    guild_id: Optional[int],
+) -> bool:
+    if mode and _result_mode(result) != mode.lower():
+        return False
+    if war_type and _result_war_type(result) != war_type.upper():
+        return False
+    if guild_id is not None and guild_id not in (
+        _int_or_none(result.get("winner_guild_id")),
+        _int_or_none(result.get("loser_guild_id")),
+    ):
+        return False
+    return True
+
+
+def list_results(
+    *,
+    mode: Optional[str] = None,
+    war_type: Optional[str] = None,
+    guild_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Results oldest-first; each filter is pushed into SQL when given."""
     if use_json_stores():
-        return _load_all()["results"]
+        return [
+            result
+            for result in local_store.list_docs(_LOCAL)
+            if _matches(result, mode, war_type, guild_id)
+        ]
 
+    clauses: List[str] = []
+    params: List[Any] = []
+    if mode:
+        clauses.append("mode = %s")
+        params.append(mode.lower())
+    if war_type:
+        clauses.append("war_type = %s")
+        params.append(war_type.upper())
+    if guild_id is not None:
+        clauses.append("(winner_guild_id = %s OR loser_guild_id = %s)")
+        params.extend([int(guild_id), int(guild_id)])
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
     with get_conn() as conn:
         cursor = conn.cursor()
         try:
             cursor.execute(
-                """
+                f"""
                 SELECT payload FROM war_results
+                {where}
                 ORDER BY completed_at ASC, id ASC
-                """
+                """,
+                tuple(params),
             )
             rows = cursor.fetchall()
         finally:
@@ -95,10 +202,7 @@ def list_results() -> List[Dict[str, Any]]:
 def get_result(result_id: str) -> Dict[str, Any] | None:
     rid = str(result_id)
     if use_json_stores():
-        for result in _load_all()["results"]:
-            if str(result.get("result_id")) == rid:
-                return result
-        return None
+        return local_store.get_doc(_LOCAL, rid)
 
     with get_conn() as conn:
         cursor = conn.cursor()
@@ -115,30 +219,90 @@ def get_result(result_id: str) -> Dict[str, Any] | None:
     return _parse_payload(row[0])
 
 
+def _with_player_outcome(result: Dict[str, Any], discord_id: int, side: str) -> Dict[str, Any]:
+    key = "winner_lineup" if side == "winner" else "loser_lineup"
+    entry = next(
+        (
+            player
+            for player in result.get(key) or []
+            if _int_or_none(player.get("discord_id")) == discord_id
+        ),
+        None,
+    )
+    return {
+        **result,
+        "player_outcome": "W" if side == "winner" else "L",
+        "player_entry": entry,
+    }
+
+
 def list_results_for_player(discord_id: int, *, limit: int = 5) -> List[Dict[str, Any]]:
     """Most recent completed wars involving this Discord user (newest first)."""
-    matches: List[Dict[str, Any]] = []
     target = int(discord_id)
-    for result in reversed(list_results()):
-        found_side = None
-        found_player = None
-        for side, key in (("winner", "winner_lineup"), ("loser", "loser_lineup")):
-            for player in result.get(key) or []:
-                if int(player.get("discord_id") or 0) == target:
-                    found_side = side
-                    found_player = player
-                    break
-            if found_side:
+    if use_json_stores():
+        matches: List[Dict[str, Any]] = []
+        for result in reversed(list_results()):
+            side = next(
+                (row["side"] for row in _result_players(result) if row["discord_id"] == target),
+                None,
+            )
+            if side is None:
+                continue
+            matches.append(_with_player_outcome(result, target, side))
+            if len(matches) >= limit:
                 break
-        if not found_side:
-            continue
-        matches.append(
-            {
-                **result,
-                "player_outcome": "W" if found_side == "winner" else "L",
-                "player_entry": found_player,
-            }
-        )
-        if len(matches) >= limit:
-            break
-    return matches
+        return matches
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT wr.payload, wrp.side
+                FROM war_result_players wrp
+                JOIN war_results wr ON wr.result_id = wrp.result_id
+                WHERE wrp.discord_id = %s
+                ORDER BY wr.completed_at DESC, wr.id DESC
+                LIMIT %s
+                """,
+                (target, int(limit)),
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    return [_with_player_outcome(_parse_payload(row[0]), target, row[1]) for row in rows]
+
+
+def list_guild_core_player_ids(guild_id: int) -> Set[int]:
+    """Non-ally players who appeared for this guild's side in any result."""
+    gid = int(guild_id)
+    if use_json_stores():
+        ids: Set[int] = set()
+        for result in list_results(guild_id=gid):
+            for row in _result_players(result):
+                if row["ally"]:
+                    continue
+                if _int_or_none(result.get(f"{row['side']}_guild_id")) == gid:
+                    ids.add(row["discord_id"])
+        return ids
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT DISTINCT wrp.discord_id
+                FROM war_results wr
+                JOIN war_result_players wrp ON wrp.result_id = wr.result_id
+                WHERE NOT wrp.ally
+                  AND (
+                    (wr.winner_guild_id = %s AND wrp.side = 'winner')
+                    OR (wr.loser_guild_id = %s AND wrp.side = 'loser')
+                  )
+                """,
+                (gid, gid),
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    return {int(row[0]) for row in rows}